@@ -58,7 +58,9 @@ def login_view(request):
 def logout_view(request):
     logout(request)
     messages.success(request, "Logout efetuado com sucesso!")
-    return redirect("accounts:login")
+    response = redirect("accounts:login")
+    response["Clear-Site-Data"] = '"cache"'
+    return response
 
 
 def register_view(request):
@@ -5,3 +5,6 @@ class ClassesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'classes'
     verbose_name = 'Aulas e Modalidades'
+
+    def ready(self):
+        from . import signals  # noqa: F401
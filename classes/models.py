@@ -143,7 +143,6 @@ class ClassSchedule(models.Model):
     location = models.CharField('Local', max_length=200, default='Tatame Principal')
     is_active = models.BooleanField('Ativo', default=True)
     max_capacity = models.PositiveIntegerField('Capacidade Máxima', default=20)
-    current_enrolled = models.PositiveIntegerField('Inscritos Atuais', default=0)
 
     class Meta:
         verbose_name = 'Horário de Aula'
@@ -154,9 +153,73 @@ class ClassSchedule(models.Model):
     def __str__(self):
         return f"{self.class_obj.name} - {self.get_day_of_week_display()} {self.start_time}"
 
+
+class ClassOccurrence(models.Model):
+    """
+    Aula em uma data concreta, gerada a partir de ``ClassSchedule``
+    (ver ``classes.occurrences``). Horário, instrutor e capacidade são
+    copiados do horário para que a grade e os painéis saiam de uma única
+    consulta; ``enrolled`` é mantido com ``F()`` a cada reserva.
+    """
+    schedule = models.ForeignKey(
+        ClassSchedule,
+        on_delete=models.CASCADE,
+        related_name='occurrences',
+        verbose_name='Horário'
+    )
+    class_obj = models.ForeignKey(
+        Class,
+        on_delete=models.CASCADE,
+        related_name='occurrences',
+        verbose_name='Aula'
+    )
+    instructor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='class_occurrences',
+        verbose_name='Instrutor'
+    )
+    date = models.DateField('Data')
+    start_time = models.TimeField('Horário de Início')
+    end_time = models.TimeField('Horário de Término')
+    starts_at = models.DateTimeField('Início')
+    location = models.CharField('Local', max_length=200)
+    capacity = models.PositiveIntegerField('Capacidade')
+    enrolled = models.PositiveIntegerField('Inscritos', default=0)
+    is_cancelled = models.BooleanField('Cancelada', default=False)
+
+    class Meta:
+        verbose_name = 'Ocorrência de Aula'
+        verbose_name_plural = 'Ocorrências de Aulas'
+        ordering = ['starts_at']
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'date'], name='occurrence_schedule_date_uniq'),
+            models.CheckConstraint(
+                condition=models.Q(enrolled__lte=models.F('capacity')),
+                name='occurrence_enrolled_lte_capacity',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['starts_at'], name='occurrence_starts_idx'),
+            models.Index(fields=['class_obj', 'starts_at'], name='occurrence_class_starts_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.class_obj.name} - {self.date:%d/%m/%Y} {self.start_time:%H:%M}"
+
+    @property
+    def day_name(self):
+        return dict(ClassSchedule.DAYS_OF_WEEK)[self.date.weekday()]
+
+    @property
+    def spots_left(self):
+        return max(self.capacity - self.enrolled, 0)
+
     @property
     def is_available(self):
-        return self.current_enrolled < self.max_capacity
+        return not self.is_cancelled and self.enrolled < self.capacity
 
 
 class ClassEquipment(models.Model):
@@ -0,0 +1,181 @@
+"""
+Geração e ocupação das ocorrências de aulas (``ClassOccurrence``).
+
+``generate_occurrences`` expande os horários ativos em aulas datadas para as
+próximas ``CLASS_OCCURRENCE_WEEKS`` semanas com um único ``bulk_create``
+(tarefa diária ``core.tasks.generate_class_occurrences``). A ocupação parte
+das matrículas regulares ativas e é ajustada com ``UPDATE ... SET enrolled =
+enrolled ± 1`` (``F()``) quando reservas e matrículas mudam; o incremento só
+acontece nas ocorrências com vaga, e as lotadas são registradas no log e
+devolvidas a quem chamou.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import timetable
+from .models import ClassOccurrence, ClassSchedule
+
+
+logger = logging.getLogger(__name__)
+
+
+def occurrence_dates(schedule, start, end):
+    """Datas entre ``start`` e ``end`` (inclusive) no dia da semana do horário"""
+    first = start + timedelta(days=(schedule.day_of_week - start.weekday()) % 7)
+    date = first
+    while date <= end:
+        yield date
+        date += timedelta(weeks=1)
+
+
+def _starts_at(date, time):
+    return timezone.make_aware(datetime.combine(date, time))
+
+
+def regular_enrollments():
+    """Matrículas regulares ativas: {class_id: [(início, fim), ...]}"""
+    from schedule.models import RegularBooking
+
+    enrollments = {}
+    bookings = RegularBooking.objects.filter(status='active').values_list('class_obj_id', 'start_date', 'end_date')
+    for class_id, start_date, end_date in bookings:
+        enrollments.setdefault(class_id, []).append((start_date, end_date))
+    return enrollments
+
+
+def _enrolled_on(periods, date):
+    return sum(1 for start, end in periods if start <= date and (end is None or date <= end))
+
+
+def generate_occurrences(weeks=None, start=None):
+    """Cria as ocorrências que faltam no período; retorna quantas foram criadas"""
+    weeks = weeks or getattr(settings, 'CLASS_OCCURRENCE_WEEKS', 4)
+    start = start or timezone.localdate()
+    end = start + timedelta(weeks=weeks) - timedelta(days=1)
+
+    existing = set(
+        ClassOccurrence.objects.filter(date__range=(start, end)).values_list('schedule_id', 'date')
+    )
+    enrollments = regular_enrollments()
+    schedules = ClassSchedule.objects.filter(is_active=True, class_obj__is_active=True)
+
+    occurrences = []
+    for schedule in schedules:
+        periods = enrollments.get(schedule.class_obj_id, [])
+        for date in occurrence_dates(schedule, start, end):
+            if (schedule.pk, date) in existing:
+                continue
+            occurrences.append(ClassOccurrence(
+                schedule=schedule,
+                class_obj_id=schedule.class_obj_id,
+                instructor_id=schedule.instructor_id,
+                date=date,
+                start_time=schedule.start_time,
+                end_time=schedule.end_time,
+                starts_at=_starts_at(date, schedule.start_time),
+                location=schedule.location,
+                capacity=schedule.max_capacity,
+                enrolled=min(_enrolled_on(periods, date), schedule.max_capacity),
+            ))
+    ClassOccurrence.objects.bulk_create(occurrences, batch_size=500, ignore_conflicts=True)
+    if occurrences:
+        timetable.invalidate()
+    return len(occurrences)
+
+
+def sync_schedule(schedule):
+    """Leva as alterações de um horário para as ocorrências futuras"""
+    future = ClassOccurrence.objects.filter(schedule=schedule, date__gte=timezone.localdate())
+    if not schedule.is_active:
+        future.update(is_cancelled=True)
+        return
+    # Dia da semana alterado: as datas antigas deixam de valer
+    stale = [pk for pk, date in future.values_list('pk', 'date') if date.weekday() != schedule.day_of_week]
+    ClassOccurrence.objects.filter(pk__in=stale).update(is_cancelled=True)
+    for occurrence in future.exclude(pk__in=stale).only('pk', 'date'):
+        ClassOccurrence.objects.filter(pk=occurrence.pk).update(
+            class_obj_id=schedule.class_obj_id,
+            instructor_id=schedule.instructor_id,
+            start_time=schedule.start_time,
+            end_time=schedule.end_time,
+            starts_at=_starts_at(occurrence.date, schedule.start_time),
+            location=schedule.location,
+            capacity=Greatest(schedule.max_capacity, F('enrolled')),
+            is_cancelled=False,
+        )
+    generate_occurrences()
+
+
+def increment(queryset):
+    """
+    Ocupa uma vaga em cada ocorrência com vaga. Retorna os ids das ocorrências
+    que já estavam lotadas (e ficaram sem o inscrito), registrados no log.
+    """
+    with transaction.atomic():
+        rows = queryset.select_for_update().order_by('pk').values_list('pk', 'enrolled', 'capacity')
+        full = []
+        available = []
+        for pk, enrolled, capacity in rows:
+            (available if enrolled < capacity else full).append(pk)
+        if available:
+            ClassOccurrence.objects.filter(pk__in=available).update(enrolled=F('enrolled') + 1)
+    if available:
+        timetable.invalidate()
+    if full:
+        logger.warning('Ocorrências lotadas ficaram sem o novo inscrito: %s', full)
+    return full
+
+
+def decrement(queryset):
+    updated = queryset.filter(enrolled__gt=0).update(enrolled=F('enrolled') - 1)
+    if updated:
+        timetable.invalidate()
+    return updated
+
+
+def regular_booking_occurrences(booking):
+    """Ocorrências futuras cobertas por uma matrícula regular"""
+    queryset = ClassOccurrence.objects.filter(
+        class_obj_id=booking.class_obj_id,
+        date__gte=max(booking.start_date, timezone.localdate()),
+    )
+    if booking.end_date:
+        queryset = queryset.filter(date__lte=booking.end_date)
+    return queryset
+
+
+def next_classes_for(user, limit=3, days=14):
+    """Próximas aulas das turmas em que o usuário está matriculado (ou da academia)"""
+    from schedule.models import RegularBooking
+
+    class_ids = list(
+        RegularBooking.objects.filter(user=user, status='active').values_list('class_obj_id', flat=True)
+    )
+    occurrences = upcoming(days, class_obj_id__in=class_ids) if class_ids else upcoming(days)
+    return [
+        {
+            'date': occurrence.date,
+            'time': occurrence.start_time.strftime('%H:%M'),
+            'instructor': occurrence.instructor.get_full_name() if occurrence.instructor else 'A definir',
+            'class_name': occurrence.class_obj.name,
+        }
+        for occurrence in occurrences[:limit]
+    ]
+
+
+def upcoming(days=7, **filters):
+    """Próximas ocorrências (uma consulta pelo índice de ``starts_at``)"""
+    now = timezone.now()
+    return ClassOccurrence.objects.filter(
+        starts_at__gte=now,
+        starts_at__lt=now + timedelta(days=days),
+        is_cancelled=False,
+        **filters,
+    ).select_related('class_obj', 'instructor').order_by('starts_at')
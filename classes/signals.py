@@ -0,0 +1,70 @@
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import timetable
+from .models import ClassOccurrence, ClassSchedule
+from .occurrences import decrement, increment, regular_booking_occurrences, sync_schedule
+
+
+def invalidate_schedules_cache(sender, update_fields=None, **kwargs):
+    """Aulas, horários ou instrutores mudaram: descarta os horários em cache"""
+    # O login só atualiza last_login: não afeta os horários
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    timetable.invalidate()
+
+
+for sender in ('classes.Class', 'classes.ClassSchedule', 'core.Instructor', settings.AUTH_USER_MODEL):
+    post_save.connect(invalidate_schedules_cache, sender=sender, dispatch_uid=f'schedules_cache_save_{sender}')
+    post_delete.connect(invalidate_schedules_cache, sender=sender, dispatch_uid=f'schedules_cache_delete_{sender}')
+
+
+@receiver(post_save, sender=ClassSchedule)
+def sync_schedule_occurrences(sender, instance, **kwargs):
+    """Horário alterado: atualiza as ocorrências futuras e gera as que faltam"""
+    sync_schedule(instance)
+
+
+def remember_booking_status(sender, instance, **kwargs):
+    """Guarda o status anterior da matrícula para ajustar a ocupação depois"""
+    if instance.pk:
+        instance._previous_status = sender.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+    else:
+        instance._previous_status = None
+
+
+def update_booking_occupancy(sender, instance, **kwargs):
+    """
+    Matrícula entrou ou saiu de 'active': ± 1 inscrito nas ocorrências futuras.
+    As ocorrências lotadas ficam em ``instance.full_occurrences``.
+    """
+    was_active = getattr(instance, '_previous_status', None) == 'active'
+    is_active = instance.status == 'active'
+    instance.full_occurrences = []
+    if is_active and not was_active:
+        instance.full_occurrences = increment(regular_booking_occurrences(instance))
+    elif was_active and not is_active:
+        decrement(regular_booking_occurrences(instance))
+
+
+def release_booking_occupancy(sender, instance, **kwargs):
+    if instance.status == 'active':
+        decrement(regular_booking_occurrences(instance))
+
+
+def release_trial_occupancy(sender, instance, created=False, **kwargs):
+    """Agendamento experimental cancelado (ex.: pelo admin): devolve a vaga"""
+    if created or not instance.occurrence_id:
+        return
+    if instance.status == 'cancelled' and getattr(instance, '_previous_status', None) != 'cancelled':
+        decrement(ClassOccurrence.objects.filter(pk=instance.occurrence_id))
+
+
+if apps.is_installed('schedule'):
+    pre_save.connect(remember_booking_status, sender='schedule.RegularBooking', dispatch_uid='regular_booking_status')
+    post_save.connect(update_booking_occupancy, sender='schedule.RegularBooking', dispatch_uid='regular_booking_occupancy')
+    post_delete.connect(release_booking_occupancy, sender='schedule.RegularBooking', dispatch_uid='regular_booking_release')
+    pre_save.connect(remember_booking_status, sender='schedule.TrialClassBooking', dispatch_uid='trial_booking_status')
+    post_save.connect(release_trial_occupancy, sender='schedule.TrialClassBooking', dispatch_uid='trial_booking_release')
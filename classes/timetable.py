@@ -0,0 +1,116 @@
+"""
+Horários das aulas em JSON, com cache e ETag.
+
+As respostas de ``get_available_schedules`` (por aula) e ``get_timetable``
+(grade completa) são lidas das ocorrências dos próximos 7 dias e ficam no
+cache já serializadas, junto com um ETag forte (hash do corpo). As chaves
+incluem um carimbo de versão trocado sempre que aulas, horários, instrutores
+ou a ocupação mudam, invalidando tudo de uma vez. Com ``Cache-Control`` e
+``ETag`` o navegador e o nginx revalidam com ``If-None-Match`` e recebem 304
+sem corpo.
+"""
+
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.http import parse_etags
+
+from .models import Class
+
+
+SCHEDULES_VERSION_KEY = 'classes:schedules:version'
+SCHEDULES_CACHE_PREFIX = 'classes:schedules'
+
+
+def occurrence_data(occurrence):
+    return {
+        'id': occurrence.schedule_id,
+        'occurrence_id': occurrence.id,
+        'date': occurrence.date.isoformat(),
+        'day': occurrence.day_name,
+        'day_number': occurrence.date.weekday(),
+        'start_time': occurrence.start_time.strftime('%H:%M'),
+        'end_time': occurrence.end_time.strftime('%H:%M'),
+        'instructor': occurrence.instructor.get_full_name() if occurrence.instructor else 'A definir',
+        'location': occurrence.location,
+        'available': occurrence.is_available,
+        'enrolled': occurrence.enrolled,
+        'max_capacity': occurrence.capacity,
+    }
+
+
+def upcoming_occurrences(**filters):
+    """Ocorrências dos próximos 7 dias em uma consulta (índice de ``starts_at``)"""
+    from .occurrences import upcoming
+
+    return upcoming(days=7, **filters)
+
+
+async def build_class_schedules(class_id):
+    """Próximas aulas de uma aula ativa (``None`` se a aula não existir)"""
+    if not await Class.objects.filter(id=class_id, is_active=True).aexists():
+        return None
+    occurrences = upcoming_occurrences(class_obj_id=class_id)
+    return {'schedules': [occurrence_data(occurrence) async for occurrence in occurrences]}
+
+
+async def build_timetable():
+    """Grade dos próximos 7 dias de todas as aulas ativas, agrupada por data"""
+    days = {}
+    async for occurrence in upcoming_occurrences(class_obj__is_active=True):
+        day = days.setdefault(occurrence.date, {
+            'date': occurrence.date.isoformat(),
+            'day_number': occurrence.date.weekday(),
+            'day': occurrence.day_name,
+            'schedules': [],
+        })
+        data = occurrence_data(occurrence)
+        data['class_id'] = occurrence.class_obj_id
+        data['class_name'] = occurrence.class_obj.name
+        day['schedules'].append(data)
+    return {'days': list(days.values())}
+
+
+def encode(data):
+    """Serializa uma vez; retorna (corpo, ETag forte)"""
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+    return body, '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+async def cached_payload(name, builder, *args):
+    """(corpo, ETag) do cache ou construído por ``builder`` (``None`` não é guardado)"""
+    await cache.aadd(SCHEDULES_VERSION_KEY, uuid.uuid4().hex, None)
+    version = await cache.aget(SCHEDULES_VERSION_KEY)
+    # A data entra na chave: a janela de 7 dias anda à meia-noite
+    key = f'{SCHEDULES_CACHE_PREFIX}:{version}:{timezone.localdate()}:{name}'
+    cached = await cache.aget(key)
+    if cached is None:
+        data = await builder(*args)
+        if data is None:
+            return None
+        cached = encode(data)
+        await cache.aset(key, cached, getattr(settings, 'SCHEDULES_CACHE_TIMEOUT', 60 * 60))
+    return cached
+
+
+def etag_response(request, payload):
+    """Resposta JSON com ETag/Cache-Control, ou 304 se o cliente já tem a versão"""
+    body, etag = payload
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    max_age = getattr(settings, 'SCHEDULES_API_MAX_AGE', 60)
+    response['Cache-Control'] = f'public, max-age={max_age}, must-revalidate'
+    return response
+
+
+def invalidate():
+    """Troca o carimbo de versão, invalidando todas as respostas em cache"""
+    cache.set(SCHEDULES_VERSION_KEY, uuid.uuid4().hex, None)
@@ -9,4 +9,6 @@ urlpatterns = [
     path('categoria/<slug:slug>/', views.ClassCategoryView.as_view(), name='category'),
     path('agendar/<int:class_id>/', views.TrialClassBookingView.as_view(), name='trial_booking'),
     path('agendamento/sucesso/', views.TrialBookingSuccessView.as_view(), name='trial_booking_success'),
+    path('api/horarios/', views.get_timetable, name='timetable'),
+    path('api/<int:class_id>/horarios/', views.get_available_schedules, name='available_schedules'),
 ]
@@ -3,14 +3,17 @@ from django.views.generic import ListView, DetailView, TemplateView
 from django.views.generic.edit import FormView
 from django.contrib import messages
 from django.urls import reverse_lazy
-from django.db.models import Q
 from django.http import JsonResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
+import uuid
 
-from .models import Class, ClassCategory, ClassSchedule
+from . import timetable
+from .occurrences import upcoming
+from .models import Class, ClassCategory, ClassOccurrence, ClassSchedule
 from core.forms import TrialClassBookingForm
-from schedule.models import TrialClassBooking
+from core.search import filter_queryset
+from schedule.reservations import ClassFull, reserve_trial_class
 
 
 class ClassListView(ListView):
@@ -28,14 +31,10 @@ class ClassListView(ListView):
         if category_slug:
             queryset = queryset.filter(category__slug=category_slug)
         
-        # Filtro por busca
+        # Filtro por busca (índice textual, mais relevantes primeiro)
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(short_description__icontains=search)
-            )
+            return filter_queryset(queryset, search)
         
         return queryset.order_by('category', 'name')
 
@@ -115,6 +114,10 @@ class TrialClassBookingView(FormView):
         class_id = self.kwargs.get('class_id')
         if class_id:
             initial['class_id'] = class_id
+        occurrence_id = self.request.GET.get('aula')
+        if occurrence_id and occurrence_id.isdigit():
+            initial['occurrence_id'] = occurrence_id
+        initial['idempotency_key'] = uuid.uuid4().hex
         return initial
 
     def get_context_data(self, **kwargs):
@@ -127,31 +130,46 @@ class TrialClassBookingView(FormView):
                 class_obj=context['class_obj'],
                 is_active=True
             ).select_related('instructor').order_by('day_of_week', 'start_time')
+            # Próximas aulas com vagas (para escolher a data da reserva)
+            context['occurrences'] = upcoming(days=14, class_obj=context['class_obj'])
         
         return context
 
     def form_valid(self, form):
-        # Criar agendamento
-        booking = TrialClassBooking.objects.create(
-            first_name=form.cleaned_data['first_name'],
-            last_name=form.cleaned_data['last_name'],
-            email=form.cleaned_data['email'],
-            phone=form.cleaned_data['phone'],
-            birth_date=form.cleaned_data.get('birth_date'),
-            class_obj_id=form.cleaned_data['class_id'],
-            preferred_date=form.cleaned_data['preferred_date'],
-            preferred_time=form.cleaned_data.get('preferred_time'),
-            notes=form.cleaned_data.get('notes', ''),
-            ip_address=self.get_client_ip(),
-            user_agent=self.request.META.get('HTTP_USER_AGENT', '')
-        )
+        # Aula escolhida na lista: data e horário preferidos são os dela
+        occurrence_id = form.cleaned_data.get('occurrence_id')
+        occurrence = {}
+        if occurrence_id:
+            occurrence = ClassOccurrence.objects.filter(pk=occurrence_id).values('date', 'start_time').first() or {}
 
-        # Enviar notificações
+        # Criar agendamento (ocupa a vaga da aula escolhida, se houver)
         try:
-            self.send_booking_notifications(booking)
-        except Exception as e:
-            # Log do erro, mas não falha o processo
-            pass
+            booking, created = reserve_trial_class(
+                occurrence_id=occurrence_id,
+                idempotency_key=form.cleaned_data.get('idempotency_key'),
+                first_name=form.cleaned_data['first_name'],
+                last_name=form.cleaned_data['last_name'],
+                email=form.cleaned_data['email'],
+                phone=form.cleaned_data['phone'],
+                birth_date=form.cleaned_data.get('birth_date'),
+                class_obj_id=form.cleaned_data['class_id'],
+                preferred_date=form.cleaned_data.get('preferred_date') or occurrence.get('date'),
+                preferred_time=form.cleaned_data.get('preferred_time') or occurrence.get('start_time'),
+                notes=form.cleaned_data.get('notes', ''),
+                ip_address=self.get_client_ip(),
+                user_agent=self.request.META.get('HTTP_USER_AGENT', '')
+            )
+        except ClassFull as e:
+            form.add_error(None, str(e))
+            return self.form_invalid(form)
+
+        # Reenvio do mesmo formulário: não notifica de novo
+        if created:
+            try:
+                self.send_booking_notifications(booking)
+            except Exception as e:
+                # Log do erro, mas não falha o processo
+                pass
 
         messages.success(
             self.request,
@@ -243,33 +261,19 @@ class TrialBookingSuccessView(TemplateView):
     template_name = 'classes/trial_booking_success.html'
 
 
-def get_available_schedules(request, class_id):
-    """API para obter horários disponíveis de uma aula"""
-    if request.method == 'GET':
-        try:
-            class_obj = get_object_or_404(Class, id=class_id, is_active=True)
-            schedules = ClassSchedule.objects.filter(
-                class_obj=class_obj,
-                is_active=True
-            ).select_related('instructor').order_by('day_of_week', 'start_time')
-            
-            data = []
-            for schedule in schedules:
-                data.append({
-                    'id': schedule.id,
-                    'day': schedule.get_day_of_week_display(),
-                    'day_number': schedule.day_of_week,
-                    'start_time': schedule.start_time.strftime('%H:%M'),
-                    'end_time': schedule.end_time.strftime('%H:%M'),
-                    'instructor': schedule.instructor.get_full_name() if schedule.instructor else 'A definir',
-                    'location': schedule.location,
-                    'available': schedule.is_available,
-                    'current_enrolled': schedule.current_enrolled,
-                    'max_capacity': schedule.max_capacity
-                })
-            
-            return JsonResponse({'schedules': data})
-        except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    
-    return JsonResponse({'error': 'Método não permitido'}, status=405)
+async def get_available_schedules(request, class_id):
+    """API para obter horários disponíveis de uma aula (em cache, com ETag)"""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método não permitido'}, status=405)
+    payload = await timetable.cached_payload(f'class:{class_id}', timetable.build_class_schedules, class_id)
+    if payload is None:
+        return JsonResponse({'error': 'Aula não encontrada'}, status=404)
+    return timetable.etag_response(request, payload)
+
+
+async def get_timetable(request):
+    """API com a grade semanal completa em uma única resposta (em cache, com ETag)"""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método não permitido'}, status=405)
+    payload = await timetable.cached_payload('timetable', timetable.build_timetable)
+    return timetable.etag_response(request, payload)
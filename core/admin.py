@@ -1,9 +1,40 @@
 from django.contrib import admin
 
-from .models import SiteSettings
+from .models import SiteSettings, OutboundEmail, ImageAsset
 
 
 @admin.register(SiteSettings)
 class SiteSettingsAdmin(admin.ModelAdmin):
 	list_display = ("site_name", "contact_email", "updated_at")
 	readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+	list_display = ("subject", "recipients", "status", "attempts", "next_attempt_at", "sent_at")
+	list_filter = ("status",)
+	search_fields = ("subject", "to")
+	readonly_fields = ("created_at", "sent_at", "locked_at", "last_error")
+	actions = ["requeue"]
+
+	@admin.display(description="Destinatários")
+	def recipients(self, obj):
+		return ", ".join(obj.to)
+
+	@admin.action(description="Reenviar e-mails selecionados")
+	def requeue(self, request, queryset):
+		for email in queryset.exclude(status="sent"):
+			email.requeue()
+
+
+@admin.register(ImageAsset)
+class ImageAssetAdmin(admin.ModelAdmin):
+	list_display = ("source", "status", "width", "height", "processed_at")
+	list_filter = ("status",)
+	search_fields = ("source", "digest")
+	readonly_fields = ("digest", "width", "height", "variants", "created_at", "processed_at", "locked_at", "last_error")
+	actions = ["reprocess"]
+
+	@admin.action(description="Processar novamente")
+	def reprocess(self, request, queryset):
+		queryset.update(status="pending", locked_at=None)
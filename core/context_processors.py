@@ -4,13 +4,8 @@ from .models import SiteSettings
 
 def site_settings(request):
     """Context processor para configurações do site"""
-    try:
-        site_config = SiteSettings.objects.first()
-    except SiteSettings.DoesNotExist:
-        site_config = None
-    
     return {
-        'site_config': site_config,
+        'site_config': SiteSettings.load(),
         'SITE_NAME': getattr(settings, 'SITE_NAME', 'ASBJJ'),
         'SITE_URL': getattr(settings, 'SITE_URL', 'https://asbjj.com.br'),
         'ADMIN_EMAIL': getattr(settings, 'ADMIN_EMAIL', 'admin@asbjj.com.br'),
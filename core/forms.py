@@ -30,8 +30,11 @@ class TrialClassBookingForm(forms.Form):
         widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
     )
     class_id = forms.IntegerField(widget=forms.HiddenInput())
+    occurrence_id = forms.IntegerField(required=False, widget=forms.HiddenInput())
+    # Gerada a cada exibição do formulário: reenvios do mesmo formulário são ignorados
+    idempotency_key = forms.CharField(required=False, max_length=64, widget=forms.HiddenInput())
     preferred_date = forms.DateField(
-        label='Data preferida',
+        label='Data preferida', required=False,
         widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
     )
     preferred_time = forms.TimeField(
@@ -43,6 +46,13 @@ class TrialClassBookingForm(forms.Form):
         widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 4, 'placeholder': 'Informações adicionais'})
     )
 
+    def clean(self):
+        cleaned_data = super().clean()
+        # Com uma aula escolhida, a data vem da própria aula
+        if not cleaned_data.get('occurrence_id') and not cleaned_data.get('preferred_date'):
+            self.add_error('preferred_date', 'Escolha uma das próximas aulas ou informe a data preferida.')
+        return cleaned_data
+
 
 class ContactForm(forms.ModelForm):
     """Formulário de contato melhorado"""
@@ -0,0 +1,134 @@
+"""
+Verificações de saúde para ``/healthz/live`` e ``/healthz/ready``.
+
+A prontidão testa banco (``SELECT 1``), cache (gravação e leitura), broker
+do Celery e gravação no armazenamento de mídia. Cada verificação roda em uma
+thread com tempo limite (``HEALTHCHECK_TIMEOUT``) e informa sua latência; o
+resultado fica guardado na memória do processo por ``HEALTHCHECK_CACHE_SECONDS``
+para que as sondas não virem carga (não usa o cache do Django, que também é
+verificado).
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+
+
+# Poucas threads: uma verificação travada não acumula novas execuções
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='healthcheck')
+_lock = threading.Lock()
+_last_result = {'checked_at': None, 'result': None}
+
+
+class CheckSkipped(Exception):
+    """A dependência não está configurada neste ambiente"""
+
+
+def check_database():
+    connection = connections['default']
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    finally:
+        # Roda em thread própria: não deixa conexões abertas para trás
+        connection.close()
+
+
+def check_cache():
+    key = f'healthcheck:{uuid.uuid4().hex}'
+    cache.set(key, 'ok', 10)
+    try:
+        if cache.get(key) != 'ok':
+            raise RuntimeError('valor gravado não foi lido de volta')
+    finally:
+        cache.delete(key)
+
+
+def check_broker():
+    url = getattr(settings, 'CELERY_BROKER_URL', '')
+    if not url:
+        raise CheckSkipped('CELERY_BROKER_URL não configurado')
+    timeout = getattr(settings, 'HEALTHCHECK_TIMEOUT', 2)
+    if url.startswith('redis'):
+        import redis
+
+        client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        try:
+            client.ping()
+        finally:
+            client.close()
+        return
+    from kombu import Connection
+
+    with Connection(url, connect_timeout=timeout) as broker:
+        broker.ensure_connection(max_retries=1)
+
+
+def check_storage():
+    name = default_storage.save(f'healthcheck/{uuid.uuid4().hex}.txt', ContentFile(b'ok'))
+    default_storage.delete(name)
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+    'broker': check_broker,
+    'storage': check_storage,
+}
+
+
+def _timed(check):
+    start = time.perf_counter()
+    check()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_checks(checks=None, timeout=None):
+    """Executa as verificações em paralelo; retorna (tudo ok, detalhes por dependência)"""
+    checks = checks or CHECKS
+    timeout = timeout or getattr(settings, 'HEALTHCHECK_TIMEOUT', 2)
+    started = time.perf_counter()
+    futures = {name: _executor.submit(_timed, check) for name, check in checks.items()}
+
+    results = {}
+    for name, future in futures.items():
+        remaining = max(timeout - (time.perf_counter() - started), 0)
+        try:
+            latency = future.result(timeout=remaining)
+            results[name] = {'status': 'ok', 'latency_ms': round(latency, 2)}
+        except CheckSkipped as e:
+            results[name] = {'status': 'skipped', 'detail': str(e)}
+        except TimeoutError:
+            results[name] = {'status': 'timeout', 'latency_ms': round(timeout * 1000, 2)}
+        except Exception as e:
+            results[name] = {'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+    healthy = all(result['status'] in ('ok', 'skipped') for result in results.values())
+    return healthy, results
+
+
+def readiness():
+    """
+    Resultado da prontidão, reaproveitado por ``HEALTHCHECK_CACHE_SECONDS``.
+    Retorna (tudo ok, detalhes, idade do resultado em segundos).
+    """
+    max_age = getattr(settings, 'HEALTHCHECK_CACHE_SECONDS', 5)
+    with _lock:
+        checked_at = _last_result['checked_at']
+        now = time.monotonic()
+        if checked_at is None or now - checked_at >= max_age:
+            _last_result['result'] = run_checks()
+            _last_result['checked_at'] = checked_at = now
+        healthy, results = _last_result['result']
+    return healthy, results, round(now - checked_at, 2)
+
+
+def reset():
+    _last_result.update(checked_at=None, result=None)
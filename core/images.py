@@ -0,0 +1,231 @@
+"""
+Versões responsivas das imagens enviadas (galeria, instrutores, blog, alunos
+e depoimentos).
+
+No upload, um sinal registra o arquivo em ``ImageAsset`` (um INSERT); a tarefa
+``core.tasks.process_image_derivatives`` processa a fila a cada minuto e grava,
+com Pillow, as larguras de ``IMAGE_PRESETS`` em WebP (e em AVIF com
+``IMAGE_DERIVATIVE_AVIF`` e suporte no Pillow). Os arquivos ficam em
+``images/<hash>/`` pelo SHA-256 do original, então uploads idênticos
+reaproveitam as versões. A tag ``{% responsive_image %}`` (``core_images``)
+monta o ``<picture>`` com ``srcset``/``sizes``; ``prefetch_image_assets``
+evita uma consulta por imagem nas listas.
+
+Na galeria, ``Gallery.save`` guarda no upload as dimensões e uma prévia
+minúscula (``placeholder``) para a primeira pintura e o feed JSON.
+"""
+
+import base64
+import hashlib
+import io
+import logging
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import ImageAsset
+
+try:
+    import pillow_avif  # noqa: F401  (registra o AVIF no Pillow < 11.2)
+except ImportError:
+    pass
+
+
+logger = logging.getLogger(__name__)
+
+# Campos de imagem processados, por modelo
+IMAGE_SOURCES = {
+    'core.Gallery': ('image',),
+    'core.Instructor': ('photo',),
+    'core.BlogPost': ('featured_image',),
+    'students.Student': ('photo',),
+    'testimonials.Testimonial': ('author_photo',),
+}
+
+# Larguras máximas das versões (px); imagens menores não são ampliadas
+IMAGE_PRESETS = {
+    'thumbnail': 320,
+    'card': 640,
+    'hero': 1280,
+}
+
+DERIVATIVES_DIR = 'images'
+# Largura da prévia borrada embutida no HTML (data URI de algumas centenas de bytes)
+PLACEHOLDER_WIDTH = 16
+IMAGE_LOCK_TIMEOUT = timedelta(minutes=10)
+ORIENTATION_TAG = 0x0112
+
+
+def installed_sources():
+    for label, fields in IMAGE_SOURCES.items():
+        if apps.is_installed(label.split('.')[0]):
+            yield apps.get_model(label), fields
+
+
+def output_formats():
+    """Formatos gerados: WebP sempre, AVIF se ativado e suportado pelo Pillow"""
+    formats = {'webp': 'WEBP'}
+    Image.init()
+    if getattr(settings, 'IMAGE_DERIVATIVE_AVIF', False) and 'AVIF' in Image.SAVE:
+        formats = {'avif': 'AVIF', **formats}
+    return formats
+
+
+def placeholder(file):
+    """
+    (largura, altura, data URI) de uma imagem: as dimensões já corrigidas pela
+    orientação EXIF e uma prévia WebP de ``PLACEHOLDER_WIDTH`` px. Em JPEGs o
+    ``draft`` decodifica em escala reduzida, sem abrir a imagem inteira.
+    """
+    committed = file._committed
+    file.open('rb')
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+            if image.getexif().get(ORIENTATION_TAG, 1) in (5, 6, 7, 8):
+                width, height = height, width
+            image.draft('RGB', (PLACEHOLDER_WIDTH * 8, PLACEHOLDER_WIDTH * 8))
+            preview = ImageOps.exif_transpose(image).convert('RGB')
+        preview.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+        buffer = io.BytesIO()
+        preview.save(buffer, format='WEBP', quality=40)
+    finally:
+        # Upload ainda não gravado: volta ao início para o storage ler o arquivo todo
+        if committed:
+            file.close()
+        else:
+            file.seek(0)
+    return width, height, 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+
+def fill_placeholders(queryset):
+    """Calcula dimensões e prévias que faltam (imagens enviadas antes delas existirem)"""
+    total = 0
+    for obj in queryset.filter(width__isnull=True):
+        obj.save(update_fields=['width', 'height', 'placeholder'])
+        total += 1
+    return total
+
+
+def enqueue(names):
+    """Registra arquivos para processamento (ignora os já registrados)"""
+    names = [name for name in names if name]
+    if names:
+        ImageAsset.objects.bulk_create([ImageAsset(source=name) for name in names], ignore_conflicts=True)
+
+
+def enqueue_instance(instance):
+    enqueue(getattr(instance, field).name for field in IMAGE_SOURCES[instance._meta.label])
+
+
+def enqueue_existing():
+    """Registra todas as imagens já enviadas (carga inicial)"""
+    total = 0
+    for model, fields in installed_sources():
+        for field in fields:
+            names = list(model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                         .values_list(field, flat=True))
+            enqueue(names)
+            total += len(names)
+    return total
+
+
+def claim(asset):
+    """Reserva o item para este worker (um UPDATE condicional)"""
+    now = timezone.now()
+    return ImageAsset.objects.filter(
+        Q(status='pending') | Q(status='processing', locked_at__lt=now - IMAGE_LOCK_TIMEOUT),
+        pk=asset.pk,
+    ).update(status='processing', locked_at=now)
+
+
+def render_variants(content, digest):
+    """Grava as versões de ``content`` e retorna ((largura, altura), variants)"""
+    with Image.open(io.BytesIO(content)) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    size = image.size
+
+    widths = []
+    for width in sorted(IMAGE_PRESETS.values()):
+        widths.append(min(width, size[0]))
+        if width >= size[0]:
+            break
+
+    variants = {}
+    for image_format, pil_format in output_formats().items():
+        variants[image_format] = []
+        for width in widths:
+            name = f'{DERIVATIVES_DIR}/{digest[:2]}/{digest}/{width}w.{image_format}'
+            if not default_storage.exists(name):
+                resized = image.copy()
+                resized.thumbnail((width, size[1]), Image.LANCZOS)
+                buffer = io.BytesIO()
+                resized.save(buffer, format=pil_format, quality=80)
+                name = default_storage.save(name, ContentFile(buffer.getvalue()))
+            variants[image_format].append([name, width])
+    return size, variants
+
+
+def process(asset):
+    """Gera (ou reaproveita pelo hash) as versões de um arquivo"""
+    with default_storage.open(asset.source, 'rb') as source:
+        content = source.read()
+    digest = hashlib.sha256(content).hexdigest()
+    same = ImageAsset.objects.filter(digest=digest, status='ready').exclude(pk=asset.pk).first()
+    if same is not None and same.variants.keys() == output_formats().keys():
+        size, variants = (same.width, same.height), same.variants
+    else:
+        size, variants = render_variants(content, digest)
+    asset.digest = digest
+    asset.width, asset.height = size
+    asset.variants = variants
+    asset.status = 'ready'
+    asset.last_error = ''
+    asset.processed_at = timezone.now()
+    asset.save(update_fields=['digest', 'width', 'height', 'variants', 'status', 'last_error', 'processed_at'])
+
+
+def process_pending(batch_size=20):
+    """Processa um lote da fila; retorna (processadas, falhas)"""
+    stale = timezone.now() - IMAGE_LOCK_TIMEOUT
+    assets = ImageAsset.objects.filter(
+        Q(status='pending') | Q(status='processing', locked_at__lt=stale)
+    ).order_by('created_at')[:batch_size]
+
+    processed = failed = 0
+    for asset in assets:
+        if not claim(asset):
+            continue
+        try:
+            process(asset)
+            processed += 1
+        except Exception as e:
+            logger.warning('Falha ao processar a imagem %s: %s', asset.source, e)
+            ImageAsset.objects.filter(pk=asset.pk).update(status='failed', last_error=str(e))
+            failed += 1
+    return processed, failed
+
+
+def prefetch_image_assets(objects, field):
+    """Anexa o ``ImageAsset`` pronto a cada arquivo (``objeto.<field>.asset``) com uma consulta"""
+    files = [getattr(obj, field) for obj in objects]
+    assets = (
+        ImageAsset.objects.filter(source__in=[f.name for f in files if f], status='ready')
+        .order_by().in_bulk(field_name='source')
+    )
+    for file in files:
+        file.asset = assets.get(file.name)
+    return objects
+
+
+def asset_for(file):
+    if not hasattr(file, 'asset'):
+        file.asset = ImageAsset.objects.filter(source=file.name, status='ready').first() if file else None
+    return file.asset
@@ -0,0 +1,111 @@
+"""
+Medições por requisição: consultas ao banco, tempo de SQL, tempo de
+renderização de templates e tamanho da resposta.
+
+``RequestMetricsMiddleware`` ativa um ``RequestStats`` (em uma contextvar)
+durante a requisição; o ``execute_wrapper`` das conexões e o wrapper de
+``Template.render`` somam nele. O resultado vai para o cabeçalho
+``Server-Timing`` e para uma linha de log JSON (logger ``core.requests``).
+
+Views podem declarar um orçamento de consultas com ``@query_budget(n)``:
+ao estourar, a requisição falha com ``QueryBudgetExceeded`` quando
+``QUERY_BUDGET_STRICT`` está ativo (testes/desenvolvimento) ou gera um aviso
+no log em produção.
+"""
+
+import contextvars
+import functools
+import time
+from dataclasses import dataclass, field
+
+from django.template import base as template_base
+
+
+_current_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    sql_time: float = 0.0
+    template_time: float = 0.0
+    template_depth: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'template_ms': round(self.template_time * 1000, 2),
+        }
+
+
+def get_current_stats():
+    return _current_stats.get()
+
+
+def start_request_stats():
+    """Ativa a coleta para o contexto atual; retorna (stats, token)"""
+    stats = RequestStats()
+    return stats, _current_stats.set(stats)
+
+
+def stop_request_stats(token):
+    _current_stats.reset(token)
+
+
+def count_queries(execute, sql, params, many, context):
+    """``execute_wrapper`` que soma consultas e tempo de SQL da requisição atual"""
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.sql_time += time.perf_counter() - start
+
+
+def _timed_render(render):
+    @functools.wraps(render)
+    def wrapper(self, context):
+        stats = _current_stats.get()
+        if stats is None:
+            return render(self, context)
+        # Apenas o template mais externo conta (includes/extends ficam dentro dele)
+        stats.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            stats.template_depth -= 1
+            if stats.template_depth == 0:
+                stats.template_time += time.perf_counter() - start
+    wrapper._request_stats_timed = True
+    return wrapper
+
+
+def install_template_timer():
+    """Envolve ``Template.render`` para medir o tempo de renderização (idempotente)"""
+    if not getattr(template_base.Template.render, '_request_stats_timed', False):
+        template_base.Template.render = _timed_render(template_base.Template.render)
+
+
+def query_budget(max_queries):
+    """Declara o máximo de consultas ao banco esperado para a view"""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def get_query_budget(view_func):
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(view_func, 'view_class', None), 'query_budget', None)
+    return budget
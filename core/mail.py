@@ -0,0 +1,157 @@
+"""
+Fila de e-mails de saída.
+
+``QueuedEmailBackend`` substitui o envio síncrono: ``send_mail`` nas views
+apenas grava os e-mails em ``OutboundEmail`` (um INSERT), e o tempo de
+resposta deixa de depender do servidor SMTP. ``dispatch_outbound_emails``
+(tarefa ``core.tasks.dispatch_outbound_emails`` ou o comando
+``dispatch_outbound_emails``) envia a fila em lotes pelo backend real
+(``OUTBOUND_EMAIL_BACKEND``).
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .metrics import record_emails
+from .models import OutboundEmail
+
+
+RATE_LIMIT_CACHE_PREFIX = 'outbound_email:rate'
+
+
+def get_delivery_connection(**kwargs):
+    """Conexão com o backend real de entrega (SMTP em produção)"""
+    backend = getattr(settings, 'OUTBOUND_EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+    return get_connection(backend=backend, **kwargs)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Backend que apenas enfileira os e-mails para envio posterior"""
+
+    def send_messages(self, email_messages):
+        queued = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            if message.attachments:
+                # Anexos não são persistidos na fila: envio direto
+                get_delivery_connection(fail_silently=self.fail_silently).send_messages([message])
+                continue
+            queued.append(OutboundEmail.from_message(message))
+        try:
+            OutboundEmail.objects.bulk_create(queued)
+        except Exception:
+            record_emails(self, failed=len(queued))
+            if not self.fail_silently:
+                raise
+            return 0
+        record_emails(self, sent=len(queued))
+        return len(queued)
+
+
+def _rate_limit_key(now):
+    return f"{RATE_LIMIT_CACHE_PREFIX}:{now:%Y%m%d%H%M}"
+
+
+def remaining_quota(now=None):
+    """Quantos e-mails ainda podem ser enviados no minuto atual"""
+    limit = getattr(settings, 'OUTBOUND_EMAIL_RATE_LIMIT', None)
+    if not limit:
+        return None
+    return max(limit - cache.get(_rate_limit_key(now or timezone.now()), 0), 0)
+
+
+def consume_quota(count, now=None):
+    if not count or not getattr(settings, 'OUTBOUND_EMAIL_RATE_LIMIT', None):
+        return
+    key = _rate_limit_key(now or timezone.now())
+    if not cache.add(key, count, 120):
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            cache.set(key, count, 120)
+
+
+def claim_batch(size):
+    """
+    Reserva um lote da fila (status ``sending``) e já conta a tentativa.
+
+    Itens presos em ``sending`` há mais de ``OUTBOUND_EMAIL_LOCK_TIMEOUT``
+    segundos (worker interrompido) voltam a ser elegíveis; os que já usaram
+    as ``OUTBOUND_EMAIL_MAX_ATTEMPTS`` tentativas vão para ``dead``.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, 'OUTBOUND_EMAIL_LOCK_TIMEOUT', 600))
+    max_attempts = getattr(settings, 'OUTBOUND_EMAIL_MAX_ATTEMPTS', 5)
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status='queued', next_attempt_at__lte=now)
+                | Q(status='sending', locked_at__lt=stale)
+            )
+            .order_by('next_attempt_at', 'pk')
+            .values_list('pk', flat=True)[:size]
+        )
+        if ids:
+            OutboundEmail.objects.filter(pk__in=ids, attempts__gte=max_attempts).update(
+                status='dead', locked_at=None, last_error='Envio interrompido após o limite de tentativas',
+            )
+            OutboundEmail.objects.filter(pk__in=ids, attempts__lt=max_attempts).update(
+                status='sending', locked_at=now, attempts=F('attempts') + 1,
+            )
+    return list(OutboundEmail.objects.filter(pk__in=ids, status='sending').order_by('next_attempt_at', 'pk'))
+
+
+def dispatch_outbound_emails(batch_size=None):
+    """
+    Envia um lote da fila por uma única conexão e retorna (enviados, falhas).
+
+    O tamanho do lote é limitado pela cota restante do minuto
+    (``OUTBOUND_EMAIL_RATE_LIMIT``, e-mails por minuto no provedor).
+    """
+    batch_size = batch_size or getattr(settings, 'OUTBOUND_EMAIL_BATCH_SIZE', 50)
+    quota = remaining_quota()
+    if quota is not None:
+        batch_size = min(batch_size, quota)
+    if batch_size <= 0:
+        return 0, 0
+
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_delivery_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            email.mark_failed(e)
+        record_emails(connection, failed=len(emails))
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            try:
+                if connection.send_messages([email.to_message(connection)]):
+                    email.mark_sent()
+                    sent += 1
+                else:
+                    email.mark_failed('Envio recusado pelo backend')
+                    failed += 1
+            except Exception as e:
+                email.mark_failed(e)
+                failed += 1
+    finally:
+        connection.close()
+        consume_quota(sent + failed)
+        record_emails(connection, sent, failed)
+    return sent, failed
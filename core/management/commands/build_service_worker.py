@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.service_worker import build_service_worker, load_manifest, service_worker_path
+
+
+class Command(BaseCommand):
+    help = 'Gera o service worker com o pré-cache dos arquivos do collectstatic (rodar depois dele)'
+
+    def handle(self, *args, **options):
+        manifest = load_manifest()
+        if manifest is None:
+            self.stdout.write(self.style.WARNING('staticfiles.json não encontrado: usando os arquivos originais'))
+        path = service_worker_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(build_service_worker(manifest))
+        self.stdout.write(self.style.SUCCESS(f'Service worker gravado em {path}'))
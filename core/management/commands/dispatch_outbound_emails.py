@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import dispatch_outbound_emails
+
+
+class Command(BaseCommand):
+    help = 'Envia os e-mails da fila de saída (uma vez ou em laço contínuo)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Continua rodando e verificando a fila')
+        parser.add_argument('--interval', type=float, default=5, help='Segundos de espera quando a fila está vazia')
+        parser.add_argument('--batch-size', type=int, default=None, help='E-mails por lote')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = dispatch_outbound_emails(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'{sent} enviados, {failed} falhas')
+            if not options['loop']:
+                break
+            if not (sent or failed):
+                time.sleep(options['interval'])
@@ -0,0 +1,80 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+
+def process_rss_kb(pid):
+    """Memória residente (KB) do processo e de seus filhos (workers do gunicorn)"""
+    total = 0
+    pending = [str(pid)]
+    while pending:
+        current = pending.pop()
+        proc = Path('/proc') / current
+        try:
+            for line in (proc / 'status').read_text().splitlines():
+                if line.startswith('VmRSS:'):
+                    total += int(line.split()[1])
+            for task in (proc / 'task').iterdir():
+                pending.extend((task / 'children').read_text().split())
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga simples de um endpoint: vazão, latências e memória do servidor. '
+        'Rode contra o modo WSGI e o ASGI com o mesmo nº de workers para comparar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='URL completa, ex.: http://127.0.0.1:8000/aulas/api/1/horarios/')
+        parser.add_argument('--requests', type=int, default=500, help='Total de requisições')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requisições simultâneas')
+        parser.add_argument('--timeout', type=float, default=30, help='Tempo limite por requisição (s)')
+        parser.add_argument('--server-pid', type=int, help='PID do master do gunicorn, para medir a memória')
+
+    def fetch(self, url, timeout):
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                response.read()
+                ok = response.status < 500
+        except urllib.error.HTTPError as e:
+            ok = e.code < 500
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        url = options['url']
+        pid = options['server_pid']
+        rss_before = process_rss_kb(pid) if pid else None
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(
+                lambda _: self.fetch(url, options['timeout']),
+                range(options['requests']),
+            ))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(duration for _, duration in results)
+        errors = sum(1 for ok, _ in results if not ok)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+        self.stdout.write(f'Requisições: {len(results)} (concorrência {options["concurrency"]}), erros: {errors}')
+        self.stdout.write(f'Vazão: {len(results) / elapsed:.1f} req/s em {elapsed:.2f}s')
+        self.stdout.write(
+            'Latência (ms): '
+            f'p50={quantiles[49] * 1000:.1f} p95={quantiles[94] * 1000:.1f} '
+            f'p99={quantiles[98] * 1000:.1f} máx={latencies[-1] * 1000:.1f}'
+        )
+        if pid:
+            rss_after = process_rss_kb(pid)
+            self.stdout.write(f'Memória do servidor (RSS): {rss_before / 1024:.1f} MB -> {rss_after / 1024:.1f} MB')
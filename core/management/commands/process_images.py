@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core.images import enqueue_existing, fill_placeholders, process_pending
+from core.models import Gallery
+
+
+class Command(BaseCommand):
+    help = 'Gera as versões responsivas (WebP/AVIF) das imagens pendentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--existing',
+            action='store_true',
+            help='Registra antes todas as imagens já enviadas e calcula as prévias da galeria',
+        )
+        parser.add_argument('--batch-size', type=int, default=20, help='Imagens por lote')
+
+    def handle(self, *args, **options):
+        if options['existing']:
+            self.stdout.write(f'{enqueue_existing()} imagens registradas')
+            self.stdout.write(f'{fill_placeholders(Gallery.objects.all())} prévias da galeria calculadas')
+        total = 0
+        while True:
+            processed, failed = process_pending(options['batch_size'])
+            total += processed
+            if failed:
+                self.stdout.write(self.style.WARNING(f'{failed} falhas'))
+            if not (processed or failed):
+                break
+        self.stdout.write(self.style.SUCCESS(f'{total} imagens processadas'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.search import SEARCH_SOURCES, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca (posts, aulas e depoimentos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=list(SEARCH_SOURCES),
+            help='Tipo a reconstruir (pode repetir); padrão: todos',
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild(options['kind'])
+        self.stdout.write(self.style.SUCCESS(f'{total} entradas indexadas.'))
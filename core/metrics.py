@@ -0,0 +1,189 @@
+"""
+Métricas no formato Prometheus (endpoint ``/metrics``).
+
+As métricas ficam em um registro em memória do próprio processo
+(``prometheus_client``). Com vários workers do gunicorn e do Celery, defina
+``PROMETHEUS_MULTIPROC_DIR`` (diretório compartilhado e vazio, ver
+``gunicorn.conf.py``) antes de iniciar os processos: cada um grava seus
+valores em arquivos e ``/metrics`` soma todos eles.
+
+- requisições: latência e nº de consultas por view (``RequestMetricsMiddleware``);
+- cache: acertos/faltas por área (taxa de acerto = hit / (hit + miss));
+- Celery: duração e falhas por tarefa (sinais conectados em ``projeto/celery.py``);
+- e-mails enviados/com falha por backend;
+- gauges de pagamentos pendentes e das filas, calculados a cada coleta.
+
+Sem ``prometheus_client`` instalado as funções de registro não fazem nada e
+``/metrics`` responde 503.
+"""
+
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db.models import Count, Sum
+
+try:
+    import prometheus_client
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # pragma: no cover - dependência opcional
+    prometheus_client = None
+    CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+logger = logging.getLogger(__name__)
+
+ENABLED = prometheus_client is not None
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+TASK_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 1800)
+
+
+if ENABLED:
+    REQUESTS = Counter(
+        'asbjj_http_requests_total', 'Requisições HTTP', ['view', 'method', 'status'],
+    )
+    REQUEST_LATENCY = Histogram(
+        'asbjj_http_request_duration_seconds', 'Latência das requisições por view',
+        ['view', 'method'], buckets=LATENCY_BUCKETS,
+    )
+    REQUEST_QUERIES = Histogram(
+        'asbjj_http_request_db_queries', 'Consultas ao banco por requisição',
+        ['view'], buckets=QUERY_BUCKETS,
+    )
+    CACHE_REQUESTS = Counter(
+        'asbjj_cache_requests_total', 'Leituras de cache (hit/miss)', ['cache', 'result'],
+    )
+    TASK_DURATION = Histogram(
+        'asbjj_celery_task_duration_seconds', 'Duração das tarefas do Celery',
+        ['task', 'state'], buckets=TASK_BUCKETS,
+    )
+    TASK_FAILURES = Counter(
+        'asbjj_celery_task_failures_total', 'Falhas das tarefas do Celery', ['task', 'exception'],
+    )
+    EMAILS = Counter(
+        'asbjj_emails_total', 'E-mails enviados/com falha por backend', ['backend', 'result'],
+    )
+
+
+def observe_request(metrics, duration):
+    """Registra uma requisição a partir de ``request.request_metrics``"""
+    if not ENABLED:
+        return
+    view = metrics['view']
+    REQUESTS.labels(view, metrics['method'], str(metrics['status'])).inc()
+    REQUEST_LATENCY.labels(view, metrics['method']).observe(duration)
+    REQUEST_QUERIES.labels(view).observe(metrics['queries'])
+
+
+def record_cache(cache_name, hit):
+    if ENABLED:
+        CACHE_REQUESTS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+def backend_label(connection):
+    return f'{type(connection).__module__}.{type(connection).__name__}'
+
+
+def record_emails(backend, sent=0, failed=0):
+    """Soma e-mails enviados/com falha; ``backend`` é um caminho ou uma conexão"""
+    if not ENABLED:
+        return
+    if not isinstance(backend, str):
+        backend = backend_label(backend)
+    if sent:
+        EMAILS.labels(backend, 'sent').inc(sent)
+    if failed:
+        EMAILS.labels(backend, 'failed').inc(failed)
+
+
+# Tarefas do Celery ---------------------------------------------------------
+
+_task_started = {}
+
+
+def task_started(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+def task_finished(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if ENABLED and started is not None and task is not None:
+        TASK_DURATION.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+
+def task_failed(sender=None, exception=None, **kwargs):
+    if ENABLED and sender is not None:
+        TASK_FAILURES.labels(sender.name, type(exception).__name__).inc()
+
+
+# Gauges calculados na coleta -----------------------------------------------
+
+class DatabaseCollector:
+    """Gauges de pagamentos pendentes e profundidade das filas"""
+
+    def collect(self):
+        from students.models import Payment
+        from .models import OutboundEmail
+
+        pending = Payment.objects.filter(payment_status='pending').aggregate(
+            count=Count('id'), amount=Sum('final_amount'),
+        )
+        yield GaugeMetricFamily('asbjj_pending_payments', 'Pagamentos pendentes', value=pending['count'])
+        yield GaugeMetricFamily(
+            'asbjj_pending_payments_amount', 'Valor total dos pagamentos pendentes',
+            value=float(pending['amount'] or 0),
+        )
+
+        queue = GaugeMetricFamily('asbjj_outbound_email_queue', 'E-mails na fila por status', labels=['status'])
+        counts = dict(OutboundEmail.objects.values_list('status').annotate(total=Count('id')).order_by())
+        for status, _ in OutboundEmail.STATUS_CHOICES:
+            queue.add_metric([status], counts.get(status, 0))
+        yield queue
+
+        lengths = broker_queue_lengths()
+        if lengths:
+            broker = GaugeMetricFamily('asbjj_celery_queue_length', 'Mensagens aguardando no broker', labels=['queue'])
+            for name, length in lengths.items():
+                broker.add_metric([name], length)
+            yield broker
+
+
+def broker_queue_lengths():
+    """Tamanho das filas do Celery quando o broker é Redis (falhas são ignoradas)"""
+    url = getattr(settings, 'CELERY_BROKER_URL', '')
+    if not url.startswith('redis'):
+        return {}
+    try:
+        import redis
+
+        client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return {name: client.llen(name) for name in getattr(settings, 'METRICS_CELERY_QUEUES', ['celery'])}
+    except Exception as e:
+        logger.warning(f'Não foi possível ler as filas do broker: {e}')
+        return {}
+
+
+def generate_latest():
+    """Texto de exposição com as métricas de todos os processos e os gauges do banco"""
+    registry = CollectorRegistry()
+    if multiprocess_enabled():
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(_ProcessRegistry())
+    registry.register(DatabaseCollector())
+    return prometheus_client.generate_latest(registry)
+
+
+def multiprocess_enabled():
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+class _ProcessRegistry:
+    """Expõe o registro padrão do processo dentro de um registro de coleta"""
+
+    def collect(self):
+        return prometheus_client.REGISTRY.collect()
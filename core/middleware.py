@@ -0,0 +1,225 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.exceptions import DisallowedHost
+from django.db import connections
+from django.http import HttpResponse
+
+from . import metrics
+from .instrumentation import (
+    QueryBudgetExceeded, count_queries, get_query_budget, install_template_timer,
+    start_request_stats, stop_request_stats,
+)
+from .page_cache import get_cache_key, get_page_cache_timeout
+
+
+request_logger = logging.getLogger('core.requests')
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serve páginas públicas do cache para visitantes anônimos.
+
+    Deve ficar antes de SessionMiddleware/CsrfViewMiddleware: um acerto no
+    cache devolve os bytes armazenados sem carregar sessão, usuário ou CSRF.
+    Requisições com cookie de sessão ou de mensagens nunca usam o cache.
+    Funciona tanto sob WSGI quanto sob ASGI (cache assíncrono).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        cache_key = self.get_request_cache_key(request)
+        if cache_key is None:
+            return self.get_response(request)
+
+        cached = cache.get(cache_key)
+        metrics.record_cache('page', cached is not None)
+        if cached is not None:
+            return self.cached_response(cached)
+
+        request._page_cache_key = cache_key
+        response = self.get_response(request)
+
+        timeout = getattr(request, '_page_cache_timeout', None)
+        if timeout and self.is_cacheable_response(request, response):
+            cache.set(cache_key, self.cache_entry(response), timeout)
+            response['X-Page-Cache'] = 'MISS'
+        return response
+
+    async def __acall__(self, request):
+        cache_key = self.get_request_cache_key(request)
+        if cache_key is None:
+            return await self.get_response(request)
+
+        cached = await cache.aget(cache_key)
+        metrics.record_cache('page', cached is not None)
+        if cached is not None:
+            return self.cached_response(cached)
+
+        request._page_cache_key = cache_key
+        response = await self.get_response(request)
+
+        timeout = getattr(request, '_page_cache_timeout', None)
+        if timeout and self.is_cacheable_response(request, response):
+            await cache.aset(cache_key, self.cache_entry(response), timeout)
+            response['X-Page-Cache'] = 'MISS'
+        return response
+
+    def get_request_cache_key(self, request):
+        if not self.is_cacheable_request(request):
+            return None
+        try:
+            cache_key = get_cache_key(request)
+        except DisallowedHost:
+            return None
+        return cache_key
+
+    def cached_response(self, cached):
+        status, headers, content = cached
+        response = HttpResponse(content, status=status)
+        for header, value in headers:
+            response[header] = value
+        response['X-Page-Cache'] = 'HIT'
+        return response
+
+    def cache_entry(self, response):
+        headers = [(k, v) for k, v in response.items()]
+        return (response.status_code, headers, response.content)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, '_page_cache_key'):
+            request._page_cache_timeout = get_page_cache_timeout(view_func)
+        return None
+
+    def is_cacheable_request(self, request):
+        if not getattr(settings, 'PAGE_CACHE_ENABLED', False):
+            return False
+        if request.method != 'GET':
+            return False
+        cookies = request.COOKIES
+        return settings.SESSION_COOKIE_NAME not in cookies and CookieStorage.cookie_name not in cookies
+
+    def is_cacheable_response(self, request, response):
+        if response.status_code != 200 or response.streaming:
+            return False
+        # Resposta personalizada (cookie, sessão ou token CSRF) não pode ser compartilhada
+        if response.cookies or request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+            return False
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return False
+        return 'private' not in response.get('Cache-Control', '')
+
+
+class RequestMetricsMiddleware:
+    """
+    Mede consultas, tempo de SQL, templates e tamanho da resposta por view.
+
+    Deve ser o primeiro middleware da lista para cobrir toda a requisição.
+    Publica ``Server-Timing`` (só em desenvolvimento ou para os IPs de
+    ``METRICS_ALLOWED_IPS``), registra uma linha JSON no logger
+    ``core.requests`` e aplica os orçamentos de ``@query_budget``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install_template_timer()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        stats, token = start_request_stats()
+        try:
+            with self.count_queries():
+                response = self.get_response(request)
+        finally:
+            stop_request_stats(token)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            return await self.get_response(request)
+
+        # A contextvar e os execute_wrappers acompanham o ORM assíncrono
+        # (sync_to_async copia o contexto para a thread do banco)
+        stats, token = start_request_stats()
+        try:
+            with self.count_queries():
+                response = await self.get_response(request)
+        finally:
+            stop_request_stats(token)
+        return self.finish(request, response, stats)
+
+    @staticmethod
+    def show_server_timing(request):
+        """Server-Timing com DEBUG/SERVER_TIMING_HEADER ou para os IPs liberados das métricas"""
+        if getattr(settings, 'SERVER_TIMING_HEADER', settings.DEBUG):
+            return True
+        return request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', [])
+
+    def count_queries(self):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(count_queries))
+        return stack
+
+    def finish(self, request, response, stats):
+        total = time.perf_counter() - stats.started_at
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name if match else None) or 'unresolved'
+        size = None if response.streaming else len(response.content)
+        request.request_metrics = dict(
+            stats.as_dict(),
+            view=view_name,
+            method=request.method,
+            status=response.status_code,
+            total_ms=round(total * 1000, 2),
+            size=size,
+        )
+
+        if self.show_server_timing(request):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={stats.sql_time * 1000:.2f};desc="{stats.queries} queries"',
+                f'tpl;dur={stats.template_time * 1000:.2f}',
+                f'total;dur={total * 1000:.2f}',
+            ])
+        request_logger.info(json.dumps(request.request_metrics))
+        metrics.observe_request(request.request_metrics, total)
+
+        budget = getattr(request, '_query_budget', None)
+        if budget is not None and stats.queries > budget:
+            message = f'{view_name}: {stats.queries} consultas (orçamento: {budget})'
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            request_logger.warning(f'Orçamento de consultas excedido - {message}')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = get_query_budget(view_func)
+        return None
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_sitesettings_google_maps_url_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', '-published_at'], name='blogpost_status_pub_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_email', models.CharField(max_length=254, verbose_name='Remetente')),
+                ('to', models.JSONField(default=list, verbose_name='Para')),
+                ('cc', models.JSONField(blank=True, default=list, verbose_name='Cópia')),
+                ('bcc', models.JSONField(blank=True, default=list, verbose_name='Cópia Oculta')),
+                ('reply_to', models.JSONField(blank=True, default=list, verbose_name='Responder para')),
+                ('subject', models.CharField(max_length=998, verbose_name='Assunto')),
+                ('body', models.TextField(blank=True, verbose_name='Corpo')),
+                ('alternatives', models.JSONField(blank=True, default=list, verbose_name='Alternativas')),
+                ('headers', models.JSONField(blank=True, default=dict, verbose_name='Cabeçalhos')),
+                ('status', models.CharField(choices=[('queued', 'Na fila'), ('sending', 'Enviando'), ('sent', 'Enviado'), ('dead', 'Descartado')], default='queued', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próxima Tentativa')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Reservado em')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último Erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Enviado em')),
+            ],
+            options={
+                'verbose_name': 'E-mail de Saída',
+                'verbose_name_plural': 'E-mails de Saída',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbound_status_next_idx')],
+            },
+        ),
+    ]
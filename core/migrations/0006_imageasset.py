@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_searchentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageAsset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255, unique=True, verbose_name='Arquivo Original')),
+                ('digest', models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Hash do Conteúdo')),
+                ('width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Largura')),
+                ('height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Altura')),
+                ('variants', models.JSONField(blank=True, default=dict, verbose_name='Versões')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('processing', 'Processando'), ('ready', 'Pronta'), ('failed', 'Falhou')], default='pending', max_length=20, verbose_name='Status')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Reservado em')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último Erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Processado em')),
+            ],
+            options={
+                'verbose_name': 'Imagem Processada',
+                'verbose_name_plural': 'Imagens Processadas',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='imageasset_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_imageasset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gallery',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Altura'),
+        ),
+        migrations.AddField(
+            model_name='gallery',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Prévia (LQIP)'),
+        ),
+        migrations.AddField(
+            model_name='gallery',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Largura'),
+        ),
+        migrations.AddIndex(
+            model_name='gallery',
+            index=models.Index(fields=['category', 'order', '-created_at', '-id'], name='gallery_feed_idx'),
+        ),
+    ]
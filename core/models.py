@@ -1,8 +1,18 @@
 from django.db import models
 from django.conf import settings
+from django.core.cache import cache
 from django.core.validators import RegexValidator
+from django.utils import timezone
+from datetime import timedelta
+import time
 import uuid
 
+from .metrics import record_cache
+
+
+SITE_SETTINGS_CACHE_KEY = 'core:site_settings'
+SITE_SETTINGS_VERSION_KEY = 'core:site_settings:version'
+
 
 class SiteSettings(models.Model):
     """Configurações gerais do site"""
@@ -59,6 +69,53 @@ class SiteSettings(models.Model):
             raise ValueError('Apenas uma instância de SiteSettings é permitida')
         super().save(*args, **kwargs)
 
+    # Cópia em memória do processo: {'version': ..., 'instance': ..., 'checked_at': ...}
+    _local_cache = {'version': None, 'instance': None, 'checked_at': None}
+
+    @classmethod
+    def load(cls):
+        """
+        Retorna a instância única das configurações (ou None).
+
+        Usa dois níveis de cache: uma cópia em memória por processo e a
+        própria instância serializada no cache compartilhado (Redis em
+        produção). Por ``SITE_SETTINGS_LOCAL_TTL`` segundos a cópia local é
+        usada sem consultar nada; depois disso, uma leitura do carimbo de
+        versão no cache compartilhado confirma a cópia. O banco só é
+        consultado quando a versão muda.
+        """
+        local = cls._local_cache
+        now = time.monotonic()
+        ttl = getattr(settings, 'SITE_SETTINGS_LOCAL_TTL', 5)
+        if local['checked_at'] is not None and now - local['checked_at'] < ttl:
+            return local['instance']
+
+        version = cache.get(SITE_SETTINGS_VERSION_KEY)
+        if version is None:
+            cache.add(SITE_SETTINGS_VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(SITE_SETTINGS_VERSION_KEY)
+
+        if version is not None and local['version'] == version:
+            local['checked_at'] = now
+            return local['instance']
+
+        key = f'{SITE_SETTINGS_CACHE_KEY}:{version}'
+        cached = cache.get(key)
+        record_cache('site_settings', cached is not None)
+        if cached is None:
+            # Tupla para diferenciar "sem configurações" de cache vazio
+            cached = (cls.objects.first(),)
+            cache.set(key, cached, getattr(settings, 'SITE_SETTINGS_CACHE_TIMEOUT', 60 * 60 * 24))
+
+        cls._local_cache = {'version': version, 'instance': cached[0], 'checked_at': now}
+        return cached[0]
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Troca o carimbo de versão, invalidando as cópias de todos os processos"""
+        cache.set(SITE_SETTINGS_VERSION_KEY, uuid.uuid4().hex, None)
+        cls._local_cache = {'version': None, 'instance': None, 'checked_at': None}
+
 
 class ContactMessage(models.Model):
     """Mensagens de contato recebidas"""
@@ -192,16 +249,35 @@ class Gallery(models.Model):
     )
     is_featured = models.BooleanField('Destaque', default=False)
     order = models.PositiveIntegerField('Ordem', default=0)
+    # Calculados no upload: reservam o espaço da imagem e mostram uma prévia borrada
+    width = models.PositiveIntegerField('Largura', null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField('Altura', null=True, blank=True, editable=False)
+    placeholder = models.TextField('Prévia (LQIP)', blank=True, editable=False)
     created_at = models.DateTimeField('Criado em', auto_now_add=True)
 
     class Meta:
         verbose_name = 'Imagem da Galeria'
         verbose_name_plural = 'Galeria de Imagens'
         ordering = ['category', 'order', '-created_at']
+        indexes = [
+            models.Index(fields=['category', 'order', '-created_at', '-id'], name='gallery_feed_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Novo upload (arquivo ainda não gravado) ou imagem sem dimensões
+        if self.image and (not self.image._committed or self.width is None):
+            from .images import placeholder
+
+            try:
+                self.width, self.height, self.placeholder = placeholder(self.image)
+            except (OSError, ValueError):
+                self.width = self.height = None
+                self.placeholder = ''
+        super().save(*args, **kwargs)
+
 
 class BlogPost(models.Model):
     """Posts do blog"""
@@ -259,6 +335,9 @@ class BlogPost(models.Model):
         verbose_name = 'Post do Blog'
         verbose_name_plural = 'Posts do Blog'
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            models.Index(fields=['status', '-published_at'], name='blogpost_status_pub_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -266,3 +345,192 @@ class BlogPost(models.Model):
     def get_absolute_url(self):
         from django.urls import reverse
         return reverse('core:blog_detail', kwargs={'slug': self.slug})
+
+
+class OutboundEmail(models.Model):
+    """
+    Fila persistente de e-mails de saída.
+
+    Preenchida pelo ``core.mail.QueuedEmailBackend`` (um INSERT por envio) e
+    esvaziada em lotes por ``core.mail.dispatch_outbound_emails``, que reaproveita
+    uma conexão SMTP, respeita o limite do provedor e reagenda falhas com
+    espera exponencial até ``OUTBOUND_EMAIL_MAX_ATTEMPTS`` (depois vira ``dead``).
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Na fila'),
+        ('sending', 'Enviando'),
+        ('sent', 'Enviado'),
+        ('dead', 'Descartado'),
+    ]
+
+    from_email = models.CharField('Remetente', max_length=254)
+    to = models.JSONField('Para', default=list)
+    cc = models.JSONField('Cópia', default=list, blank=True)
+    bcc = models.JSONField('Cópia Oculta', default=list, blank=True)
+    reply_to = models.JSONField('Responder para', default=list, blank=True)
+    subject = models.CharField('Assunto', max_length=998)
+    body = models.TextField('Corpo', blank=True)
+    alternatives = models.JSONField('Alternativas', default=list, blank=True)
+    headers = models.JSONField('Cabeçalhos', default=dict, blank=True)
+
+    status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField('Tentativas', default=0)
+    next_attempt_at = models.DateTimeField('Próxima Tentativa', default=timezone.now)
+    locked_at = models.DateTimeField('Reservado em', null=True, blank=True)
+    last_error = models.TextField('Último Erro', blank=True)
+
+    created_at = models.DateTimeField('Criado em', auto_now_add=True)
+    sent_at = models.DateTimeField('Enviado em', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'E-mail de Saída'
+        verbose_name_plural = 'E-mails de Saída'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"{', '.join(self.to)} - {self.subject} ({self.get_status_display()})"
+
+    @classmethod
+    def from_message(cls, message):
+        """Cria (sem salvar) um item da fila a partir de um EmailMessage"""
+        return cls(
+            from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+            to=list(message.to),
+            cc=list(message.cc),
+            bcc=list(message.bcc),
+            reply_to=list(message.reply_to),
+            subject=message.subject,
+            body=message.body,
+            alternatives=[[content, mimetype] for content, mimetype in getattr(message, 'alternatives', [])],
+            headers=dict(message.extra_headers),
+        )
+
+    def to_message(self, connection=None):
+        from django.core.mail import EmailMultiAlternatives
+
+        message = EmailMultiAlternatives(
+            self.subject,
+            self.body,
+            self.from_email,
+            self.to,
+            bcc=self.bcc,
+            connection=connection,
+            headers=self.headers,
+            cc=self.cc,
+            reply_to=self.reply_to,
+        )
+        for content, mimetype in self.alternatives:
+            message.attach_alternative(content, mimetype)
+        return message
+
+    def mark_sent(self):
+        self.status = 'sent'
+        self.sent_at = timezone.now()
+        self.locked_at = None
+        self.last_error = ''
+        self.save(update_fields=['status', 'sent_at', 'locked_at', 'last_error'])
+
+    def mark_failed(self, error):
+        """
+        Reagenda com espera exponencial ou descarta após o limite de tentativas
+        (a tentativa já foi contada ao reservar o lote).
+        """
+        self.locked_at = None
+        self.last_error = str(error)
+        max_attempts = getattr(settings, 'OUTBOUND_EMAIL_MAX_ATTEMPTS', 5)
+        if self.attempts >= max_attempts:
+            self.status = 'dead'
+        else:
+            self.status = 'queued'
+            base = getattr(settings, 'OUTBOUND_EMAIL_RETRY_DELAY', 60)
+            self.next_attempt_at = timezone.now() + timedelta(seconds=base * 2 ** (self.attempts - 1))
+        self.save(update_fields=['status', 'locked_at', 'last_error', 'next_attempt_at'])
+
+    def requeue(self):
+        """Devolve um e-mail descartado para a fila"""
+        self.status = 'queued'
+        self.attempts = 0
+        self.next_attempt_at = timezone.now()
+        self.locked_at = None
+        self.save(update_fields=['status', 'attempts', 'next_attempt_at', 'locked_at'])
+
+
+class SearchEntry(models.Model):
+    """
+    Documento do índice de busca (um por post, aula ou depoimento visível).
+
+    Mantido por sinais a partir dos modelos de origem (``core.search``). O
+    vetor de busca não é um campo do modelo: no PostgreSQL é uma coluna
+    ``tsvector`` gerada (português + unaccent) com índice GIN; no SQLite é a
+    tabela virtual FTS5 ``core_searchentry_fts``, sincronizada por triggers.
+    """
+    KIND_CHOICES = [
+        ('blog', 'Post do Blog'),
+        ('class', 'Aula'),
+        ('testimonial', 'Depoimento'),
+    ]
+
+    kind = models.CharField('Tipo', max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField('ID do Objeto')
+    title = models.CharField('Título', max_length=300)
+    body = models.TextField('Conteúdo', blank=True)
+    url = models.CharField('URL', max_length=300, blank=True)
+    updated_at = models.DateTimeField('Atualizado em', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Entrada de Busca'
+        verbose_name_plural = 'Entradas de Busca'
+        unique_together = ['kind', 'object_id']
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
+
+
+class ImageAsset(models.Model):
+    """
+    Versões redimensionadas (WebP e, se disponível, AVIF) de uma imagem enviada.
+
+    Uma linha por arquivo original (``source`` é o nome no storage), criada
+    como ``pending`` por sinal no upload e processada em lote por
+    ``core.images.process_pending``. As versões são gravadas com o hash do
+    conteúdo no nome, então o mesmo arquivo enviado duas vezes reaproveita as
+    versões. ``variants`` guarda ``{formato: [[nome, largura], ...]}``.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pendente'),
+        ('processing', 'Processando'),
+        ('ready', 'Pronta'),
+        ('failed', 'Falhou'),
+    ]
+
+    source = models.CharField('Arquivo Original', max_length=255, unique=True)
+    digest = models.CharField('Hash do Conteúdo', max_length=64, blank=True, db_index=True)
+    width = models.PositiveIntegerField('Largura', null=True, blank=True)
+    height = models.PositiveIntegerField('Altura', null=True, blank=True)
+    variants = models.JSONField('Versões', default=dict, blank=True)
+    status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='pending')
+    locked_at = models.DateTimeField('Reservado em', null=True, blank=True)
+    last_error = models.TextField('Último Erro', blank=True)
+    created_at = models.DateTimeField('Criado em', auto_now_add=True)
+    processed_at = models.DateTimeField('Processado em', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Imagem Processada'
+        verbose_name_plural = 'Imagens Processadas'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='imageasset_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.get_status_display()})"
+
+    def srcset(self, image_format='webp'):
+        from django.core.files.storage import default_storage
+
+        return ', '.join(
+            f'{default_storage.url(name)} {width}w' for name, width in self.variants.get(image_format, [])
+        )
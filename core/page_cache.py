@@ -0,0 +1,94 @@
+"""
+Cache de páginas completas para visitantes anônimos.
+
+As views públicas que herdam de ``PublicPageCacheMixin`` têm a resposta
+armazenada no cache padrão (Redis em produção, locmem em desenvolvimento)
+pelo ``core.middleware.AnonymousPageCacheMiddleware``. A chave considera
+host, caminho, querystring e idioma; cada caminho tem um número de geração
+que é incrementado para invalidar todas as variações de querystring de uma só vez.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import NoReverseMatch, reverse
+from django.utils import translation
+
+
+PAGE_CACHE_PREFIX = 'pagecache'
+
+# Páginas públicas em cache (nomes de URL)
+CACHED_PAGES = [
+    'core:index',
+    'core:about',
+    'core:services',
+    'core:gallery',
+    'core:calendar',
+    'core:shop',
+]
+
+# Modelo -> páginas afetadas quando ele é salvo/excluído
+PAGE_CACHE_DEPENDENCIES = {
+    'core.SiteSettings': CACHED_PAGES,
+    'core.Instructor': ['core:index', 'core:about'],
+    'core.Gallery': ['core:index', 'core:gallery'],
+    'core.BlogPost': ['core:index'],
+    # Versões responsivas prontas mudam o HTML das imagens
+    'core.ImageAsset': ['core:index', 'core:gallery'],
+    'testimonials.Testimonial': ['core:index'],
+    'classes.Class': ['core:index', 'core:services'],
+}
+
+
+class PublicPageCacheMixin:
+    """Marca uma view como cacheável para visitantes anônimos"""
+    page_cache = True
+    page_cache_timeout = None  # None = settings.PAGE_CACHE_TIMEOUT
+
+
+def get_page_cache_timeout(view_func):
+    """Retorna o timeout de cache da view, ou None se ela não for cacheável"""
+    view_class = getattr(view_func, 'view_class', view_func)
+    if not getattr(view_class, 'page_cache', False):
+        return None
+    timeout = getattr(view_class, 'page_cache_timeout', None)
+    if timeout is None:
+        timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 10)
+    return timeout
+
+
+def _generation_key(path):
+    return f'{PAGE_CACHE_PREFIX}:gen:{path}'
+
+
+def get_cache_key(request):
+    """Monta a chave de cache da requisição, incluindo a geração do caminho"""
+    path = request.path
+    generation = cache.get(_generation_key(path), 0)
+    query = hashlib.md5(request.META.get('QUERY_STRING', '').encode()).hexdigest()
+    host = request.get_host()
+    language = translation.get_language() or settings.LANGUAGE_CODE
+    return f'{PAGE_CACHE_PREFIX}:{request.scheme}://{host}{path}:{generation}:{query}:{language}'
+
+
+def purge_paths(paths):
+    """Invalida todas as variações em cache dos caminhos informados"""
+    for path in paths:
+        key = _generation_key(path)
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+
+
+def purge_url_names(url_names):
+    """Invalida as páginas em cache a partir dos nomes de URL"""
+    paths = []
+    for name in url_names:
+        try:
+            paths.append(reverse(name))
+        except NoReverseMatch:
+            continue
+    purge_paths(paths)
@@ -0,0 +1,157 @@
+"""
+Paginação por chave (keyset/cursor).
+
+Em vez de ``OFFSET``, cada página continua a partir dos valores de ordenação
+do último item da página anterior (``WHERE (created_at, id) < (...)``), então
+a página N custa o mesmo que a primeira. Não há ``COUNT(*)``: ``has_next``
+vem da busca de ``per_page + 1`` registros. Os cursores são tokens assinados
+e opacos (``django.core.signing``).
+
+A ordenação precisa terminar em um campo único (normalmente ``id``) e os
+campos usados não podem ser nulos.
+"""
+
+import datetime
+import uuid
+from decimal import Decimal
+
+from django.core import signing
+from django.db.models import Q
+
+
+CURSOR_SALT = 'core.pagination.cursor'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _dump_value(value):
+    # isoformat() mantém os microssegundos (o DjangoJSONEncoder os trunca)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+class KeysetPage:
+    """Página de resultados com cursores para a próxima e a anterior"""
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Paginador por chave.
+
+    ``ordering`` é a lista de campos (``['-created_at', '-id']``); a última
+    posição deve identificar o registro de forma única.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [_dump_value(getattr(obj, field)) for field in self.fields]
+        return signing.dumps({'v': values, 'd': direction}, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, token):
+        try:
+            data = signing.loads(token, salt=CURSOR_SALT)
+            values, direction = data['v'], data['d']
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise InvalidCursor(token)
+        if direction not in ('n', 'p') or len(values) != len(self.fields):
+            raise InvalidCursor(token)
+        opts = self.queryset.model._meta
+        try:
+            values = [opts.get_field(field).to_python(value) for field, value in zip(self.fields, values)]
+        except Exception:
+            raise InvalidCursor(token)
+        return values, direction
+
+    def _after(self, values, reverse=False):
+        """Condição "vem depois de ``values``" na ordenação (ou antes, se ``reverse``)"""
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            descending = self.descending[index] != reverse
+            step = Q(**{f'{field}__lt' if descending else f'{field}__gt': values[index]})
+            for previous in range(index):
+                step &= Q(**{self.fields[previous]: values[previous]})
+            condition |= step
+        return condition
+
+    def get_page(self, cursor=None):
+        """Retorna a página do cursor (ou a primeira, se o cursor for inválido)"""
+        values = direction = None
+        if cursor:
+            try:
+                values, direction = self.decode_cursor(cursor)
+            except InvalidCursor:
+                values = direction = None
+
+        if direction == 'p':
+            reversed_ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+            rows = list(
+                self.queryset.filter(self._after(values, reverse=True))
+                .order_by(*reversed_ordering)[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            object_list = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset.order_by(*self.ordering)
+            if values is not None:
+                queryset = queryset.filter(self._after(values))
+            rows = list(queryset[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            object_list = rows[:self.per_page]
+            has_previous = values is not None
+
+        next_cursor = previous_cursor = None
+        if object_list:
+            if has_next:
+                next_cursor = self.encode_cursor(object_list[-1], 'n')
+            if has_previous:
+                previous_cursor = self.encode_cursor(object_list[0], 'p')
+        return KeysetPage(object_list, has_next, has_previous, next_cursor, previous_cursor)
+
+
+class KeysetPaginationMixin:
+    """
+    Troca a paginação por OFFSET das ListViews pela paginação por chave.
+
+    O cursor vem do parâmetro GET ``cursor``; ``page_obj`` no contexto é um
+    ``KeysetPage`` (``next_cursor``/``previous_cursor``).
+    """
+    keyset_ordering = ['-created_at', '-id']
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, self.keyset_ordering, page_size)
+        page = paginator.get_page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+def paginate_keyset(request, queryset, ordering, per_page, cursor_kwarg='cursor'):
+    """Atalho para views funcionais: retorna o ``KeysetPage`` da requisição"""
+    return KeysetPaginator(queryset, ordering, per_page).get_page(request.GET.get(cursor_kwarg))
@@ -0,0 +1,53 @@
+"""
+Conteúdo com marcadores ``%%NOME%%`` pré-compilado.
+
+O texto é dividido uma única vez em trechos fixos e posições variáveis; cada
+montagem só junta os trechos com os valores, sem motor de templates. Apenas
+os marcadores informados na compilação viram posições variáveis: qualquer
+outro ``%%ALGO%%`` fica no texto exatamente como foi escrito.
+"""
+
+import re
+
+
+TOKEN_RE = re.compile(r'%%([A-Z_]+)%%')
+
+
+def token(name):
+    """Marcador no formato usado no conteúdo (``%%NOME%%``)"""
+    return f'%%{name}%%'
+
+
+class CompiledTemplate:
+    """
+    Conteúdo dividido em trechos fixos e marcadores conhecidos.
+
+    ``segments`` tem sempre um item a mais que ``slots``: o texto final é
+    segments[0] + valor(slots[0]) + segments[1] + ... + segments[-1].
+    """
+
+    def __init__(self, content, names):
+        names = frozenset(names)
+        segments = ['']
+        slots = []
+        position = 0
+        for match in TOKEN_RE.finditer(content):
+            segments[-1] += content[position:match.start()]
+            if match.group(1) in names:
+                slots.append(match.group(1))
+                segments.append('')
+            else:
+                segments[-1] += match.group(0)
+            position = match.end()
+        segments[-1] += content[position:]
+        self.segments = tuple(segments)
+        self.slots = tuple(slots)
+
+    def render(self, values):
+        """Monta o texto; ``values`` precisa ter todos os marcadores compilados"""
+        segments = self.segments
+        out = [segments[0]]
+        for index, slot in enumerate(self.slots, start=1):
+            out.append(values[slot])
+            out.append(segments[index])
+        return ''.join(out)
@@ -0,0 +1,209 @@
+"""
+Busca textual de posts, aulas e depoimentos.
+
+Os conteúdos visíveis são copiados para ``SearchEntry`` por sinais
+(``index_instance``/``unindex_instance``) e consultados pelo índice do banco:
+``tsvector`` + GIN no PostgreSQL (português, sem acentos) e FTS5 no SQLite.
+Em outros bancos a busca recai em ``icontains``.
+
+``search(query, kinds=[...])`` retorna os resultados ordenados por relevância;
+``filter_queryset`` aplica a busca a um queryset de um dos modelos de origem
+(sem o limite de ``search``, para não perder resultados filtrados depois).
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.urls import NoReverseMatch
+from django.utils.html import strip_tags
+
+from .models import SearchEntry
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    """Modelo de origem de um tipo de resultado"""
+    kind: str
+    model: str
+    title_field: str
+    body_fields: tuple
+    visible: dict
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def is_visible(self, instance):
+        return all(getattr(instance, field) == value for field, value in self.visible.items())
+
+    def document(self, instance):
+        body = '\n'.join(strip_tags(getattr(instance, field) or '') for field in self.body_fields)
+        try:
+            url = instance.get_absolute_url()
+        except NoReverseMatch:
+            url = ''
+        return {'title': getattr(instance, self.title_field), 'body': body, 'url': url}
+
+
+SEARCH_SOURCES = {
+    'blog': SearchSource('blog', 'core.BlogPost', 'title', ('excerpt', 'content'), {'status': 'published'}),
+    'class': SearchSource('class', 'classes.Class', 'name', ('short_description', 'description'), {'is_active': True}),
+    'testimonial': SearchSource(
+        'testimonial', 'testimonials.Testimonial', 'title', ('content', 'author_name'), {'status': 'approved'}
+    ),
+}
+
+
+def installed_sources():
+    return [
+        source for source in SEARCH_SOURCES.values()
+        if apps.is_installed(source.model.split('.')[0])
+    ]
+
+
+def source_for_model(model):
+    label = model._meta.label
+    for source in SEARCH_SOURCES.values():
+        if source.model == label:
+            return source
+    return None
+
+
+def index_instance(instance):
+    """Atualiza (ou remove, se não estiver visível) a entrada de busca do objeto"""
+    source = source_for_model(type(instance))
+    if source is None:
+        return
+    if not source.is_visible(instance):
+        unindex_instance(instance)
+        return
+    SearchEntry.objects.update_or_create(
+        kind=source.kind,
+        object_id=instance.pk,
+        defaults=source.document(instance),
+    )
+
+
+def unindex_instance(instance):
+    source = source_for_model(type(instance))
+    if source is not None:
+        SearchEntry.objects.filter(kind=source.kind, object_id=instance.pk).delete()
+
+
+def rebuild(kinds=None):
+    """Reconstrói o índice dos tipos informados; retorna o número de entradas"""
+    total = 0
+    for source in installed_sources():
+        if kinds and source.kind not in kinds:
+            continue
+        SearchEntry.objects.filter(kind=source.kind).delete()
+        entries = [
+            SearchEntry(kind=source.kind, object_id=instance.pk, **source.document(instance))
+            for instance in source.get_model().objects.filter(**source.visible).iterator()
+        ]
+        SearchEntry.objects.bulk_create(entries, batch_size=500)
+        total += len(entries)
+    return total
+
+
+def _fts5_query(query):
+    """Converte o texto digitado em uma consulta FTS5 segura (termos com prefixo)"""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _match(query, kinds):
+    """
+    Trecho ``FROM ... WHERE`` das entradas que casam com a busca (tabela ``e``),
+    a expressão de relevância e os parâmetros; None sem índice (outros bancos).
+    """
+    kinds = list(kinds)
+    placeholders = ', '.join(['%s'] * len(kinds))
+
+    if connection.vendor == 'postgresql':
+        from_where = f"""
+            FROM core_searchentry e, websearch_to_tsquery('pt_unaccent', %s) q
+            WHERE e.search_vector @@ q AND e.kind IN ({placeholders})
+        """
+        return from_where, 'ts_rank(e.search_vector, q)', [query, *kinds]
+    if connection.vendor == 'sqlite':
+        # bm25: valores menores são mais relevantes; título pesa 10x
+        from_where = f"""
+            FROM core_searchentry_fts
+            JOIN core_searchentry e ON e.id = core_searchentry_fts.rowid
+            WHERE core_searchentry_fts MATCH %s AND e.kind IN ({placeholders})
+        """
+        return from_where, '-bm25(core_searchentry_fts, 10.0, 1.0)', [_fts5_query(query), *kinds]
+    return None
+
+
+def _icontains(query, kinds):
+    return SearchEntry.objects.filter(Q(title__icontains=query) | Q(body__icontains=query), kind__in=kinds)
+
+
+def _search_ids(query, kinds, limit):
+    """Lista de (id, kind, object_id, rank) ordenada por relevância"""
+    match = _match(query, kinds)
+    if match is None:
+        rows = _icontains(query, kinds).values_list('id', 'kind', 'object_id')[:limit]
+        return [(pk, kind, object_id, 0.0) for pk, kind, object_id in rows]
+    from_where, rank, params = match
+    if connection.vendor == 'sqlite' and not params[0]:
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT e.id, e.kind, e.object_id, {rank} AS rank {from_where} ORDER BY rank DESC, e.id LIMIT %s',
+            [*params, limit],
+        )
+        return cursor.fetchall()
+
+
+def search(query, kinds=None, limit=20):
+    """
+    Busca unificada: retorna as ``SearchEntry`` encontradas, ordenadas por
+    relevância e anotadas com ``rank``.
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+    kinds = kinds or list(SEARCH_SOURCES)
+    rows = _search_ids(query, kinds, limit)
+    entries = SearchEntry.objects.in_bulk([pk for pk, _, _, _ in rows])
+    results = []
+    for pk, _, _, rank in rows:
+        entry = entries.get(pk)
+        if entry is not None:
+            entry.rank = rank
+            results.append(entry)
+    return results
+
+
+def filter_queryset(queryset, query, order_by_rank=True):
+    """
+    Restringe um queryset de origem aos resultados da busca (mais relevantes
+    primeiro). Sem limite: os filtros do próprio queryset (publicado, categoria,
+    ...) valem sobre todos os resultados, por subconsulta ao índice.
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+    source = source_for_model(queryset.model)
+    match = _match(query, [source.kind])
+    if match is None:
+        return queryset.filter(pk__in=_icontains(query, [source.kind]).values('object_id'))
+    from_where, rank, params = match
+    if connection.vendor == 'sqlite' and not params[0]:
+        return queryset.none()
+
+    queryset = queryset.filter(pk__in=RawSQL(f'SELECT e.object_id {from_where}', params))
+    if order_by_rank:
+        meta = queryset.model._meta
+        outer = f'{connection.ops.quote_name(meta.db_table)}.{connection.ops.quote_name(meta.pk.column)}'
+        queryset = queryset.annotate(
+            search_rank=RawSQL(f'SELECT {rank} {from_where} AND e.object_id = {outer}', params)
+        ).order_by('-search_rank', '-pk')
+    return queryset
@@ -0,0 +1,82 @@
+"""
+Service worker gerado a partir do manifest do ``collectstatic``.
+
+``build_service_worker`` lê o ``staticfiles.json`` e renderiza
+``core/sw.js`` com a lista de pré-cache do app shell já com os nomes com hash
+e uma versão derivada do manifest: cada deploy com estáticos novos instala um
+service worker novo, que descarta os caches da versão anterior. Estratégias:
+
+* arquivos com hash no nome: cache-first (nunca mudam);
+* páginas públicas: stale-while-revalidate, guardando só as respostas do cache
+  de páginas anônimas (``X-Page-Cache``), que não têm dados de usuário;
+* demais páginas (painel do aluno, pagamentos): sempre da rede, nunca
+  guardadas; sem conexão, a página genérica ``core:offline``.
+
+O comando ``build_service_worker`` grava o resultado em ``STATIC_ROOT/sw.js``
+(rodar depois do ``collectstatic``); ``service_worker_view`` serve esse
+arquivo em ``/sw.js`` para que o escopo seja o site inteiro.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.templatetags.static import static
+from django.urls import reverse
+
+from .staticfiles import BUNDLE_DIR, STATIC_BUNDLES
+
+
+SERVICE_WORKER_NAME = 'sw.js'
+MANIFEST_NAME = 'staticfiles.json'
+
+# App shell: baixado na instalação do service worker
+APP_SHELL = [
+    f'{BUNDLE_DIR}/site.css',
+    f'{BUNDLE_DIR}/site.js',
+    'img/logo.png',
+    'manifest.webmanifest',
+]
+
+PUBLIC_PAGES = ['core:index', 'core:about', 'core:services', 'core:gallery', 'core:calendar', 'core:shop']
+
+
+def service_worker_path():
+    return Path(settings.STATIC_ROOT) / SERVICE_WORKER_NAME
+
+
+def load_manifest():
+    """Caminhos do manifest do collectstatic ({original: com hash}), ou None sem ele"""
+    path = Path(settings.STATIC_ROOT) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())['paths']
+
+
+def app_shell_urls(manifest):
+    if manifest is not None:
+        return [settings.STATIC_URL + manifest.get(name, name) for name in APP_SHELL]
+    # Sem collectstatic (desenvolvimento): arquivos originais dos pacotes
+    urls = []
+    for name in APP_SHELL:
+        sources = STATIC_BUNDLES.get(name[len(BUNDLE_DIR) + 1:], [name]) if name.startswith(BUNDLE_DIR) else [name]
+        urls.extend(static(source) for source in sources)
+    return urls
+
+
+def build_service_worker(manifest=None):
+    """Código do service worker para o manifest informado (ou o do STATIC_ROOT)"""
+    if manifest is None:
+        manifest = load_manifest()
+    precache = [reverse('core:offline')] + app_shell_urls(manifest)
+    version_source = json.dumps([manifest or {}, precache], sort_keys=True)
+    context = {
+        'version': hashlib.sha256(version_source.encode()).hexdigest()[:12],
+        'precache': json.dumps(precache),
+        'static_url': json.dumps(settings.STATIC_URL),
+        'public_pages': json.dumps([reverse(name) for name in PUBLIC_PAGES]),
+        'offline_page': json.dumps(reverse('core:offline')),
+    }
+    return render_to_string('core/sw.js', context)
@@ -0,0 +1,57 @@
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .images import enqueue_instance, installed_sources as image_sources
+from .models import SiteSettings
+from .page_cache import PAGE_CACHE_DEPENDENCIES, purge_url_names
+from .search import index_instance, installed_sources, unindex_instance
+
+
+@receiver([post_save, post_delete], sender=SiteSettings)
+def invalidate_site_settings_cache(sender, **kwargs):
+    """
+    Invalida o cache das configurações do site ao salvar/excluir no admin,
+    depois do commit (antes dele, outro processo recarregaria a linha antiga)
+    """
+    transaction.on_commit(SiteSettings.invalidate_cache)
+
+
+def purge_page_cache(sender, **kwargs):
+    """
+    Remove do cache apenas as páginas que exibem o modelo alterado, depois do
+    commit (antes dele, uma requisição guardaria o HTML antigo na nova geração)
+    """
+    transaction.on_commit(partial(purge_url_names, PAGE_CACHE_DEPENDENCIES.get(sender._meta.label, [])))
+
+
+for label in PAGE_CACHE_DEPENDENCIES:
+    if apps.is_installed(label.split('.')[0]):
+        post_save.connect(purge_page_cache, sender=label, dispatch_uid=f'purge_page_cache_save_{label}')
+        post_delete.connect(purge_page_cache, sender=label, dispatch_uid=f'purge_page_cache_delete_{label}')
+
+
+def update_search_index(sender, instance, **kwargs):
+    """Mantém a entrada de busca em dia com o conteúdo publicado"""
+    index_instance(instance)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_instance(instance)
+
+
+for source in installed_sources():
+    post_save.connect(update_search_index, sender=source.model, dispatch_uid=f'search_index_save_{source.model}')
+    post_delete.connect(remove_from_search_index, sender=source.model, dispatch_uid=f'search_index_delete_{source.model}')
+
+
+def enqueue_image_derivatives(sender, instance, **kwargs):
+    """Registra as imagens enviadas para gerar as versões responsivas"""
+    enqueue_instance(instance)
+
+
+for model, fields in image_sources():
+    post_save.connect(enqueue_image_derivatives, sender=model, dispatch_uid=f'image_derivatives_{model._meta.label}')
@@ -0,0 +1,120 @@
+/**
+ * Galeria: rolagem infinita pelo feed JSON e modal da imagem ampliada.
+ *
+ * Cada item chega com largura, altura e uma prévia borrada (data URI), então o
+ * espaço é reservado antes de a imagem carregar; as imagens usam
+ * loading="lazy" e o navegador escolhe a versão pelo srcset/sizes.
+ */
+(function () {
+    const grid = document.getElementById('gallery-grid');
+    const more = document.getElementById('gallery-more');
+    const SIZES = '(max-width: 767px) 50vw, (max-width: 991px) 33vw, 25vw';
+
+    function buildItem(item) {
+        const col = document.createElement('div');
+        col.className = 'col-6 col-md-4 col-lg-3';
+
+        const wrapper = document.createElement('div');
+        wrapper.className = 'gallery-item';
+
+        const picture = document.createElement('picture');
+        Object.entries(item.srcset).forEach(([format, srcset]) => {
+            const source = document.createElement('source');
+            source.type = `image/${format}`;
+            source.srcset = srcset;
+            source.sizes = SIZES;
+            picture.appendChild(source);
+        });
+
+        const img = document.createElement('img');
+        img.src = item.src;
+        img.alt = item.title;
+        img.loading = 'lazy';
+        img.decoding = 'async';
+        if (item.width && item.height) {
+            img.width = item.width;
+            img.height = item.height;
+        }
+        if (item.placeholder) {
+            img.style.background = `url(${item.placeholder}) center / cover no-repeat`;
+        }
+        img.dataset.bsToggle = 'modal';
+        img.dataset.bsTarget = '#galleryModal';
+        img.dataset.bsSrc = item.large;
+        img.dataset.bsTitle = item.title;
+        picture.appendChild(img);
+
+        const overlay = document.createElement('div');
+        overlay.className = 'gallery-overlay';
+        overlay.innerHTML = '<i class="fas fa-search-plus"></i>';
+
+        wrapper.append(picture, overlay);
+        col.appendChild(wrapper);
+        return col;
+    }
+
+    function setupInfiniteScroll() {
+        if (!grid || !more || !('IntersectionObserver' in window)) {
+            return;
+        }
+        let loading = false;
+
+        async function loadNext() {
+            const cursor = more.dataset.cursor;
+            if (loading || !cursor) {
+                return;
+            }
+            loading = true;
+            const params = new URLSearchParams({ cursor });
+            if (more.dataset.category) {
+                params.set('categoria', more.dataset.category);
+            }
+            try {
+                const response = await fetch(`${more.dataset.feedUrl}?${params}`, {
+                    headers: { Accept: 'application/json' },
+                });
+                if (!response.ok) {
+                    return;
+                }
+                const data = await response.json();
+                data.results.forEach(item => grid.appendChild(buildItem(item)));
+                more.dataset.cursor = data.next_cursor || '';
+                if (!data.next_cursor) {
+                    observer.disconnect();
+                    more.remove();
+                }
+            } finally {
+                loading = false;
+            }
+        }
+
+        const observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadNext();
+            }
+        }, { rootMargin: '600px 0px' });
+        observer.observe(more);
+
+        more.querySelector('a').addEventListener('click', event => {
+            event.preventDefault();
+            loadNext();
+        });
+    }
+
+    function setupModal() {
+        const modal = document.getElementById('galleryModal');
+        if (!modal) {
+            return;
+        }
+        modal.addEventListener('show.bs.modal', event => {
+            const trigger = event.relatedTarget;
+            const image = modal.querySelector('#galleryModalImage');
+            image.src = trigger.dataset.bsSrc;
+            image.alt = trigger.dataset.bsTitle || '';
+            modal.querySelector('.modal-title').textContent = trigger.dataset.bsTitle || '';
+        });
+    }
+
+    setupInfiniteScroll();
+    setupModal();
+})();
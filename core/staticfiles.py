@@ -0,0 +1,143 @@
+"""
+Pipeline dos arquivos estáticos no ``collectstatic``.
+
+``OptimizedStaticFilesStorage`` estende o storage do WhiteNoise
+(``CompressedManifestStaticFilesStorage``, nomes com hash do conteúdo e
+irmãos ``.gz``/``.br``) com uma etapa anterior ao hash:
+
+* CSS e JS são minificados (``rcssmin``/``rjsmin``, se instalados);
+* os pacotes de ``STATIC_BUNDLES`` são montados (um CSS/JS por grupo de
+  páginas, em ``bundles/``) e passam pelo mesmo hash e compressão;
+* PNGs são otimizados sem perdas com Pillow e JPEGs com ``jpegtran``
+  (``-optimize -progressive -copy none``), quando disponível, mantendo só o
+  que ficar menor.
+
+Como tudo é gerado no build, nem o WhiteNoise nem o nginx comprimem nada por
+requisição: servem os ``.br``/``.gz`` prontos com cache imutável.
+A tag ``{% bundle %}`` (``core_static``) aponta para o pacote ou, sem o
+pipeline (DEBUG, testes), para os arquivos originais.
+"""
+
+import io
+import logging
+import shutil
+import subprocess
+
+from django.core.files.base import ContentFile
+from PIL import Image
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_DIR = 'bundles'
+
+# Pacotes por grupo de páginas: nome -> arquivos, na ordem de inclusão
+STATIC_BUNDLES = {
+    'site.css': ['css/style.css'],
+    'site.js': ['js/main.js'],
+    'about.css': ['css/sobre.css'],
+    'gallery.js': ['js/galeria.js'],
+}
+
+
+def minify(name, content):
+    """Minifica CSS/JS; outros tipos (ou sem o minificador) voltam intactos"""
+    if name.endswith('.css') and rcssmin is not None:
+        return rcssmin.cssmin(content)
+    if name.endswith('.js') and rjsmin is not None:
+        return rjsmin.jsmin(content)
+    return content
+
+
+def optimize_png(content):
+    with Image.open(io.BytesIO(content)) as image:
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def optimize_jpeg(content):
+    jpegtran = shutil.which('jpegtran')
+    if jpegtran is None:
+        return content
+    result = subprocess.run(
+        [jpegtran, '-copy', 'none', '-optimize', '-progressive'],
+        input=content, capture_output=True, check=True, timeout=60,
+    )
+    return result.stdout
+
+
+IMAGE_OPTIMIZERS = {
+    '.png': optimize_png,
+    '.jpg': optimize_jpeg,
+    '.jpeg': optimize_jpeg,
+}
+
+
+def optimize_image(name, content):
+    """Versão sem perdas menor da imagem, ou o conteúdo original"""
+    optimizer = IMAGE_OPTIMIZERS.get(name[name.rfind('.'):].lower())
+    if optimizer is None:
+        return content
+    try:
+        optimized = optimizer(content)
+    except Exception as e:
+        logger.warning('Falha ao otimizar %s: %s', name, e)
+        return content
+    return optimized if optimized and len(optimized) < len(content) else content
+
+
+class OptimizedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Minifica, empacota e otimiza antes do hash e da compressão do WhiteNoise"""
+
+    bundles_enabled = True
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for name, (storage, path) in list(paths.items()):
+                if self.optimize(name, storage, path):
+                    # O hash e a compressão passam a ler a cópia otimizada
+                    paths[name] = (self, name)
+            for name in self.build_bundles():
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def optimize(self, name, storage, path):
+        """Grava a versão minificada/otimizada por cima da cópia coletada"""
+        with storage.open(path) as source:
+            content = source.read()
+        if name.endswith(('.css', '.js')):
+            optimized = minify(name, content.decode('utf-8')).encode('utf-8')
+        else:
+            optimized = optimize_image(name, content)
+        if optimized == content:
+            return False
+        self.delete(name)
+        self._save(name, ContentFile(optimized))
+        return True
+
+    def build_bundles(self):
+        for bundle, sources in STATIC_BUNDLES.items():
+            name = f'{BUNDLE_DIR}/{bundle}'
+            parts = []
+            for source in sources:
+                with self.open(source) as f:
+                    parts.append(f.read().decode('utf-8'))
+            # ';' separa scripts que não terminam em ponto e vírgula
+            separator = '\n' if bundle.endswith('.css') else ';\n'
+            if self.exists(name):
+                self.delete(name)
+            self._save(name, ContentFile(separator.join(parts).encode('utf-8')))
+            yield name
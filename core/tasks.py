@@ -5,6 +5,7 @@ from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
 
+
 @shared_task
 def send_contact_notification(contact_message_id):
     """Enviar notificação de nova mensagem de contato"""
@@ -52,6 +53,7 @@ IP: {contact_message.ip_address}
     except Exception as e:
         return f'Erro ao enviar notificação: {str(e)}'
 
+
 @shared_task
 def send_auto_response(contact_message_id, response_template):
     """Enviar resposta automática baseada em palavras-chave"""
@@ -91,6 +93,7 @@ Equipe ASBJJ - Alexandre Salgado Brazilian Jiu-Jitsu
     except Exception as e:
         return f'Erro ao enviar resposta automática: {str(e)}'
 
+
 @shared_task
 def send_trial_booking_notification(booking_id):
     """Enviar notificação de novo agendamento experimental"""
@@ -140,6 +143,7 @@ IP: {booking.ip_address}
     except Exception as e:
         return f'Erro ao enviar notificação de agendamento: {str(e)}'
 
+
 @shared_task
 def send_trial_booking_confirmation(booking_id):
     """Enviar confirmação de agendamento experimental"""
@@ -193,6 +197,7 @@ Equipe ASBJJ - Alexandre Salgado Brazilian Jiu-Jitsu
     except Exception as e:
         return f'Erro ao enviar confirmação de agendamento: {str(e)}'
 
+
 @shared_task
 def send_newsletter_confirmation(subscriber_id):
     """Enviar e-mail de confirmação da newsletter"""
@@ -246,6 +251,7 @@ Equipe ASBJJ - Alexandre Salgado Brazilian Jiu-Jitsu
     except Exception as e:
         return f'Erro ao enviar confirmação de newsletter: {str(e)}'
 
+
 @shared_task
 def send_testimonial_notification(testimonial_id):
     """Enviar notificação de novo depoimento"""
@@ -292,6 +298,7 @@ IP: {testimonial.ip_address}
     except Exception as e:
         return f'Erro ao enviar notificação de depoimento: {str(e)}'
 
+
 @shared_task
 def cleanup_old_sessions():
     """Limpar sessões antigas"""
@@ -305,62 +312,127 @@ def cleanup_old_sessions():
     
     return f'{count} sessões expiradas removidas'
 
+
 @shared_task
 def send_weekly_newsletter():
-    """Enviar newsletter semanal"""
-    from newsletter.models import NewsletterSubscriber
-    from core.models import BlogPost
+    """Enviar newsletter semanal (distribui os assinantes em lotes)"""
+    from newsletter.mailing import build_weekly_campaign, iter_recipient_batches, weekly_recipients
     
     try:
-        # Buscar posts da semana
-        week_ago = timezone.now() - timedelta(days=7)
-        recent_posts = BlogPost.objects.filter(
-            status='published',
-            published_at__gte=week_ago
-        ).order_by('-published_at')[:3]
-        
-        # Assinantes ativos
-        subscribers = NewsletterSubscriber.objects.filter(
-            is_active=True,
-            is_verified=True,
-            frequency__in=['weekly', 'monthly']
-        )
+        # Conteúdo renderizado uma única vez para toda a campanha
+        campaign = build_weekly_campaign()
         
-        subject = 'Newsletter Semanal ASBJJ - Novidades e Dicas'
-        
-        for subscriber in subscribers:
-            html_content = render_to_string('emails/weekly_newsletter.html', {
-                'subscriber': subscriber,
-                'posts': recent_posts,
-                'site_url': settings.SITE_URL,
-                'unsubscribe_url': f"{settings.SITE_URL}/newsletter/descadastrar/{subscriber.unsubscribe_token}/",
-            })
-            
-            text_content = f"""
-Olá {subscriber.full_name or 'Prezado(a)'},
+        total = batches = 0
+        for subscriber_ids in iter_recipient_batches(weekly_recipients()):
+            send_newsletter_batch.delay(campaign, subscriber_ids)
+            total += len(subscriber_ids)
+            batches += 1
+        
+        return f'Newsletter semanal distribuída para {total} assinantes em {batches} lotes'
+    except Exception as e:
+        return f'Erro ao enviar newsletter semanal: {str(e)}'
 
-Confira as novidades desta semana na ASBJJ:
 
-"""
-            for post in recent_posts:
-                text_content += f"- {post.title}\n  {post.excerpt}\n  Leia mais: {settings.SITE_URL}{post.get_absolute_url()}\n\n"
-            
-            text_content += f"""
-Para se descadastrar, acesse: {settings.SITE_URL}/newsletter/descadastrar/{subscriber.unsubscribe_token}/
+@shared_task
+def send_scheduled_campaigns():
+    """Enviar as campanhas de newsletter agendadas (distribui os assinantes em lotes)"""
+    from functools import partial
+    from newsletter.mailing import dispatch_campaign, due_campaigns, is_segmented
+    
+    started = skipped = failed = 0
+    for campaign in due_campaigns():
+        if is_segmented(campaign):
+            skipped += 1
+            continue
+        try:
+            if dispatch_campaign(campaign, partial(send_newsletter_batch.delay, campaign_id=campaign.pk)):
+                started += 1
+        except Exception:
+            # A campanha continua agendada e é tentada de novo na próxima execução
+            failed += 1
+    
+    return (
+        f'{started} campanhas de newsletter distribuídas, '
+        f'{skipped} segmentadas ignoradas, {failed} com erro'
+    )
 
-Atenciosamente,
-Equipe ASBJJ
-            """
-            
-            msg = EmailMultiAlternatives(
-                subject,
-                text_content,
-                settings.DEFAULT_FROM_EMAIL,
-                [subscriber.email]
-            )
-            msg.attach_alternative(html_content, "text/html")
-            msg.send()
-        
-        return f'Newsletter semanal enviada para {subscribers.count()} assinantes'
+
+@shared_task
+def send_newsletter_batch(campaign, subscriber_ids, campaign_id=None):
+    """Enviar a newsletter para um lote de assinantes (uma conexão SMTP por lote)"""
+    from newsletter.mailing import record_campaign_sent, send_batch
+    
+    try:
+        sent = send_batch(campaign, subscriber_ids)
+        if campaign_id is not None:
+            record_campaign_sent(campaign_id, sent)
+        return f'Newsletter enviada para {sent} de {len(subscriber_ids)} assinantes do lote'
     except Exception as e:
-        return f'Erro ao enviar newsletter semanal: {str(e)}'
+        return f'Erro ao enviar lote da newsletter: {str(e)}'
+
+
+@shared_task
+def update_daily_finance_rollup(full=False):
+    """Atualizar o consolidado financeiro diário (apenas dias alterados)"""
+    from students.dashboard_stats import DashboardStats
+    from students.payment_models import DailyFinanceRollup
+    
+    days = DailyFinanceRollup.refresh(full=full)
+    if days:
+        # A receita do mês no painel vem do consolidado
+        DashboardStats.invalidate()
+    return f'{days} dias recalculados no consolidado financeiro'
+
+
+@shared_task
+def check_dashboard_snapshots():
+    """Conferir os snapshots do painel do aluno com os dados reais e refazer os divergentes"""
+    from students.models import StudentDashboardSnapshot
+    
+    drift = StudentDashboardSnapshot.find_drift(fix=True)
+    return f'{len(drift)} snapshots do painel do aluno refeitos'
+
+
+@shared_task
+def dispatch_outbound_emails():
+    """Enviar os e-mails da fila de saída (em lotes, respeitando o limite do provedor)"""
+    from core.mail import dispatch_outbound_emails as dispatch
+    
+    sent, failed = dispatch()
+    return f'{sent} e-mails enviados, {failed} falhas reagendadas ou descartadas'
+
+
+@shared_task
+def generate_class_occurrences(weeks=None):
+    """Gerar as ocorrências das aulas das próximas semanas (uma inserção em lote)"""
+    from classes.occurrences import generate_occurrences
+    
+    created = generate_occurrences(weeks)
+    return f'{created} ocorrências de aulas geradas'
+
+
+@shared_task
+def generate_pix_qr_codes():
+    """Gerar em lote os QR Codes das cobranças PIX pendentes que ainda não têm imagem"""
+    from students.pix import generate_qr_codes
+    
+    generated = generate_qr_codes()
+    return f'{generated} QR Codes PIX gerados'
+
+
+@shared_task
+def prepare_monthly_pix_charges():
+    """Criar as cobranças PIX do mês e os QR Codes delas de uma vez"""
+    from students.pix import prepare_monthly_charges
+    
+    created, generated = prepare_monthly_charges()
+    return f'{created} cobranças PIX criadas, {generated} QR Codes gerados'
+
+
+@shared_task
+def process_image_derivatives():
+    """Gerar as versões responsivas (WebP/AVIF) das imagens enviadas"""
+    from core.images import process_pending
+    
+    processed, failed = process_pending()
+    return f'{processed} imagens processadas, {failed} falhas'
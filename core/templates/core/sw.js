@@ -0,0 +1,93 @@
+/* Gerado por "manage.py build_service_worker" (core.service_worker) — não editar */
+const VERSION = '{{ version }}';
+const PRECACHE = `asbjj-shell-${VERSION}`;
+const ASSETS = `asbjj-assets-${VERSION}`;
+const PAGES = `asbjj-pages-${VERSION}`;
+
+const PRECACHE_URLS = {{ precache|safe }};
+const STATIC_URL = {{ static_url|safe }};
+const PUBLIC_PAGES = {{ public_pages|safe }};
+const OFFLINE_PAGE = {{ offline_page|safe }};
+// Nomes do collectstatic com hash do conteúdo (ex.: site.3f2a9c1b7d4e.css)
+const HASHED = /\.[0-9a-f]{12}\.[a-z0-9]+$/i;
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(
+    caches.open(PRECACHE)
+      .then((cache) => cache.addAll(PRECACHE_URLS))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener('activate', (event) => {
+  const current = [PRECACHE, ASSETS, PAGES];
+  event.waitUntil(
+    caches.keys()
+      .then((keys) => Promise.all(keys.filter((key) => !current.includes(key)).map((key) => caches.delete(key))))
+      .then(() => self.clients.claim())
+  );
+});
+
+function cacheable(response) {
+  return response && response.ok && response.type === 'basic';
+}
+
+async function cacheFirst(request) {
+  const cached = await caches.match(request);
+  if (cached) {
+    return cached;
+  }
+  const response = await fetch(request);
+  if (cacheable(response)) {
+    const cache = await caches.open(ASSETS);
+    cache.put(request, response.clone());
+  }
+  return response;
+}
+
+// Só a versão anônima da página (cache de páginas do servidor) é guardada:
+// a de um usuário logado traz o nome dele no menu
+function anonymousPage(response) {
+  return cacheable(response) && response.headers.has('X-Page-Cache');
+}
+
+async function staleWhileRevalidate(event) {
+  const cache = await caches.open(PAGES);
+  const cached = await cache.match(event.request);
+  const network = fetch(event.request).then((response) => {
+    if (anonymousPage(response)) {
+      cache.put(event.request, response.clone());
+    }
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => {}));
+    return cached;
+  }
+  return network.catch(() => caches.match(OFFLINE_PAGE));
+}
+
+// Páginas com dados do usuário nunca vão para o Cache Storage
+async function networkOnly(request) {
+  try {
+    return await fetch(request);
+  } catch (error) {
+    return caches.match(OFFLINE_PAGE);
+  }
+}
+
+self.addEventListener('fetch', (event) => {
+  const { request } = event;
+  const url = new URL(request.url);
+  if (request.method !== 'GET' || url.origin !== self.location.origin) {
+    return;
+  }
+
+  if (url.pathname.startsWith(STATIC_URL) && HASHED.test(url.pathname)) {
+    event.respondWith(cacheFirst(request));
+  } else if (request.mode === 'navigate' && PUBLIC_PAGES.includes(url.pathname)) {
+    event.respondWith(staleWhileRevalidate(event));
+  } else if (request.mode === 'navigate') {
+    event.respondWith(networkOnly(request));
+  }
+});
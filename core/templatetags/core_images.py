@@ -0,0 +1,54 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from core.images import asset_for
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(file, sizes='100vw', alt='', css_class='', loading='lazy', placeholder='', **attrs):
+    """
+    ``<picture>`` com as versões AVIF/WebP da imagem em ``srcset`` e o original
+    como fallback. Sem versões prontas, emite apenas o ``<img>`` original.
+    ``placeholder`` (data URI) vira o fundo do ``<img>`` até a imagem carregar.
+    Atributos extras viram atributos do ``<img>`` (``data_bs_src`` -> ``data-bs-src``).
+
+    Uso: ``{% responsive_image img.image sizes="(max-width: 576px) 50vw, 25vw" alt=img.title %}``
+    """
+    if not file:
+        return ''
+    asset = asset_for(file)
+    img_attrs = {'src': file.url, 'alt': alt, 'class': css_class, 'loading': loading, 'decoding': 'async'}
+    if asset is not None:
+        img_attrs.update(width=asset.width, height=asset.height)
+    if placeholder:
+        img_attrs['style'] = f'background: url({placeholder}) center / cover no-repeat'
+    img_attrs.update((key.replace('_', '-'), value) for key, value in attrs.items() if value is not None)
+    img = format_html(
+        '<img {}>',
+        format_html_join(' ', '{}="{}"', ((key, value) for key, value in img_attrs.items() if value not in ('', None))),
+    )
+    if asset is None:
+        return img
+    sources = format_html_join(
+        '',
+        '<source type="image/{}" srcset="{}" sizes="{}">',
+        ((image_format, asset.srcset(image_format), sizes) for image_format in asset.variants),
+    )
+    return format_html('<picture>{}{}</picture>', sources, img)
+
+
+@register.filter
+def image_variant(file, max_width=1280):
+    """URL da maior versão WebP até ``max_width`` (ou do original, sem versões)"""
+    if not file:
+        return ''
+    asset = asset_for(file)
+    if asset is not None:
+        fitting = [(width, name) for name, width in asset.variants.get('webp', []) if width <= int(max_width)]
+        if fitting:
+            return default_storage.url(max(fitting)[1])
+    return file.url
@@ -0,0 +1,32 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from core.staticfiles import BUNDLE_DIR, STATIC_BUNDLES
+
+
+register = template.Library()
+
+
+def bundle_urls(name):
+    """URL do pacote (com hash) ou, sem o pipeline/em DEBUG, dos arquivos originais"""
+    if getattr(staticfiles_storage, 'bundles_enabled', False) and not settings.DEBUG:
+        return [static(f'{BUNDLE_DIR}/{name}')]
+    return [static(source) for source in STATIC_BUNDLES[name]]
+
+
+@register.simple_tag
+def bundle(name, defer=True):
+    """
+    ``<link>``/``<script>`` de um pacote de ``core.staticfiles.STATIC_BUNDLES``.
+
+    Uso: ``{% bundle 'site.css' %}`` ou ``{% bundle 'gallery.js' %}``
+    """
+    urls = ((url,) for url in bundle_urls(name))
+    if name.endswith('.css'):
+        return format_html_join('\n', '<link rel="stylesheet" href="{}">', urls)
+    if defer:
+        return format_html_join('\n', '<script src="{}" defer></script>', urls)
+    return format_html_join('\n', '<script src="{}"></script>', urls)
@@ -1,11 +1,30 @@
-from django.test import TestCase, Client
-from django.urls import reverse
+from django.apps import apps
+from django.test import TestCase, Client, override_settings
+from django.urls import path, reverse
+from django.http import HttpResponse
 from django.contrib.auth.models import User
 from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.base import BaseEmailBackend
 from django.utils import timezone
 from datetime import date, timedelta
+from io import StringIO
+import smtplib
+import tempfile
+import time
+from unittest.mock import patch
+from unittest import skipIf, skipUnless
 
-from .models import SiteSettings, ContactMessage, Instructor, Gallery, BlogPost
+from . import health, metrics
+from .images import process_pending
+from .instrumentation import QueryBudgetExceeded, query_budget
+from .mail import claim_batch, dispatch_outbound_emails
+from .pagination import KeysetPaginator
+from .placeholders import CompiledTemplate
+from .search import filter_queryset, rebuild, search
+from .models import (
+    SiteSettings, ContactMessage, Instructor, Gallery, BlogPost, OutboundEmail, SearchEntry, ImageAsset,
+)
 from .forms import ContactForm
 
 
@@ -431,13 +450,14 @@ class IntegrationTestCase(TestCase):
     
     def test_site_settings_integration(self):
         """Teste de integração das configurações do site"""
-        # Criar configurações sem logo para evitar erro
-        settings = SiteSettings.objects.create(
-            site_name='ASBJJ Test',
-            contact_email='contato@asbjj.com',
-            contact_phone='+5511999999999',
-            site_description='Academia de Jiu-Jitsu'
-        )
+        # Criar configurações sem logo para evitar erro (o cache é invalidado no commit)
+        with self.captureOnCommitCallbacks(execute=True):
+            settings = SiteSettings.objects.create(
+                site_name='ASBJJ Test',
+                contact_email='contato@asbjj.com',
+                contact_phone='+5511999999999',
+                site_description='Academia de Jiu-Jitsu'
+            )
         
         # Verificar se aparecem nas páginas
         response = self.client.get(reverse('core:index'))
@@ -447,6 +467,484 @@ class IntegrationTestCase(TestCase):
         self.assertContains(response, 'contato@asbjj.com')
 
 
+class SiteSettingsCacheTestCase(TestCase):
+    """Testes para o cache das configurações do site"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        SiteSettings.invalidate_cache()
+        self.client = Client()
+        self.site_settings = SiteSettings.objects.create(
+            site_name='ASBJJ Cache',
+            contact_email='cache@asbjj.com',
+            contact_phone='+5511999999999'
+        )
+    
+    def test_load_returns_instance(self):
+        """Teste do acesso às configurações via load()"""
+        self.assertEqual(SiteSettings.load().pk, self.site_settings.pk)
+    
+    def test_load_uses_cache(self):
+        """Teste de que chamadas repetidas não consultam o banco"""
+        SiteSettings.load()
+        with self.assertNumQueries(0):
+            SiteSettings.load()
+    
+    def test_page_render_without_settings_queries(self):
+        """Teste de que a renderização não consulta SiteSettings"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        SiteSettings.load()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('core:services'))
+        self.assertEqual(response.status_code, 200)
+        table = SiteSettings._meta.db_table
+        self.assertFalse([q for q in ctx.captured_queries if table in q['sql']])
+    
+    def test_save_invalidates_cache(self):
+        """Teste de invalidação ao salvar"""
+        SiteSettings.load()
+        self.site_settings.site_name = 'ASBJJ Atualizado'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.site_settings.save()
+        self.assertEqual(SiteSettings.load().site_name, 'ASBJJ Atualizado')
+    
+    def test_delete_invalidates_cache(self):
+        """Teste de invalidação ao excluir"""
+        SiteSettings.load()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.site_settings.delete()
+        self.assertIsNone(SiteSettings.load())
+    
+    def test_invalidation_waits_for_commit(self):
+        """Teste de que a versão só muda depois do commit"""
+        from django.core.cache import cache
+        from core.models import SITE_SETTINGS_VERSION_KEY
+        
+        SiteSettings.load()
+        version = cache.get(SITE_SETTINGS_VERSION_KEY)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.site_settings.save()
+            self.assertEqual(cache.get(SITE_SETTINGS_VERSION_KEY), version)
+        self.assertIn(SiteSettings.invalidate_cache, callbacks)
+    
+    @override_settings(SITE_SETTINGS_LOCAL_TTL=5)
+    def test_local_copy_skips_shared_cache(self):
+        """Teste de que dentro do TTL local o cache compartilhado não é consultado"""
+        SiteSettings.load()
+        with patch('core.models.cache') as shared_cache:
+            SiteSettings.load()
+        self.assertFalse(shared_cache.method_calls)
+    
+    def test_version_change_refreshes_local_copy(self):
+        """Teste de que outro processo invalidando o cache é percebido"""
+        from django.core.cache import cache
+        from core.models import SITE_SETTINGS_VERSION_KEY
+        
+        SiteSettings.load()
+        SiteSettings.objects.filter(pk=self.site_settings.pk).update(site_name='Outro Processo')
+        cache.set(SITE_SETTINGS_VERSION_KEY, 'nova-versao', None)
+        self.assertEqual(SiteSettings.load().site_name, 'Outro Processo')
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTestCase(TestCase):
+    """Testes para o cache de páginas públicas"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.client = Client()
+    
+    def test_second_request_is_served_from_cache(self):
+        """Teste de acerto no cache sem consultas ao banco"""
+        response = self.client.get(reverse('core:index'))
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('core:index'))
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+        self.assertContains(response, 'ASBJJ')
+    
+    async def test_async_cache_hit(self):
+        """Teste do cache de páginas sob ASGI"""
+        response = await self.async_client.get(reverse('core:about'))
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        response = await self.async_client.get(reverse('core:about'))
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+    
+    def test_querystring_is_part_of_key(self):
+        """Teste de que querystrings diferentes geram entradas diferentes"""
+        self.client.get(reverse('core:gallery'))
+        response = self.client.get(reverse('core:gallery') + '?categoria=events')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+    
+    def test_authenticated_user_bypasses_cache(self):
+        """Teste de que usuários logados não recebem páginas em cache"""
+        User.objects.create_user(username='testuser', password='testpass123')
+        self.client.get(reverse('core:about'))
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('core:about'))
+        self.assertFalse(response.has_header('X-Page-Cache'))
+    
+    def test_uncacheable_view_is_not_stored(self):
+        """Teste de que páginas com formulário (CSRF) não são armazenadas"""
+        self.client.get(reverse('core:contact'))
+        response = self.client.get(reverse('core:contact'))
+        self.assertFalse(response.has_header('X-Page-Cache'))
+    
+    def test_model_save_purges_only_affected_pages(self):
+        """Teste de invalidação direcionada ao salvar um modelo"""
+        self.client.get(reverse('core:gallery'))
+        self.client.get(reverse('core:services'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Gallery.objects.create(title='Nova foto', category='events', image='gallery/images/foto.jpg')
+        self.assertEqual(self.client.get(reverse('core:gallery'))['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(reverse('core:services'))['X-Page-Cache'], 'HIT')
+    
+    def test_purge_waits_for_commit(self):
+        """Teste de que as páginas só são invalidadas depois do commit"""
+        self.client.get(reverse('core:gallery'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Gallery.objects.create(title='Nova foto', category='events', image='gallery/images/foto.jpg')
+            # Ainda dentro da transação: a versão em cache continua valendo
+            self.assertEqual(self.client.get(reverse('core:gallery'))['X-Page-Cache'], 'HIT')
+        self.assertEqual(self.client.get(reverse('core:gallery'))['X-Page-Cache'], 'MISS')
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Testes da paginação por chave (cursor)"""
+    
+    def setUp(self):
+        now = timezone.now()
+        for i in range(25):
+            message = ContactMessage.objects.create(
+                name=f'Pessoa {i}',
+                email=f'pessoa{i}@example.com',
+                message='Mensagem',
+            )
+        # Metade com o mesmo created_at para exercitar o desempate por id
+        ContactMessage.objects.filter(pk__lte=message.pk - 12).update(created_at=now)
+        self.paginator = KeysetPaginator(ContactMessage.objects.all(), ['-created_at', '-id'], 10)
+        self.expected = list(ContactMessage.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+    
+    def ids(self, page):
+        return [obj.pk for obj in page]
+    
+    def test_walks_all_pages_in_order(self):
+        """Teste de navegação pelas páginas sem repetições nem lacunas"""
+        first = self.paginator.get_page()
+        self.assertTrue(first.has_next)
+        self.assertFalse(first.has_previous)
+        second = self.paginator.get_page(first.next_cursor)
+        third = self.paginator.get_page(second.next_cursor)
+        self.assertFalse(third.has_next)
+        self.assertEqual(self.ids(first) + self.ids(second) + self.ids(third), self.expected)
+    
+    def test_previous_cursor(self):
+        """Teste de volta para a página anterior"""
+        first = self.paginator.get_page()
+        second = self.paginator.get_page(first.next_cursor)
+        third = self.paginator.get_page(second.next_cursor)
+        back = self.paginator.get_page(third.previous_cursor)
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertTrue(back.has_next)
+        self.assertTrue(back.has_previous)
+    
+    def test_single_query_without_count(self):
+        """Teste de que cada página faz uma única consulta (sem COUNT)"""
+        cursor = self.paginator.get_page().next_cursor
+        with self.assertNumQueries(1):
+            page = self.paginator.get_page(cursor)
+            list(page)
+    
+    def test_invalid_cursor_returns_first_page(self):
+        """Teste de que cursores adulterados voltam para a primeira página"""
+        page = self.paginator.get_page('cursor-invalido')
+        self.assertEqual(self.ids(page), self.expected[:10])
+
+
+class SearchTestCase(TestCase):
+    """Testes da busca textual (FTS5 no SQLite)"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='autor', password='testpass123')
+    
+    def create_post(self, slug, title, content, status='published'):
+        return BlogPost.objects.create(
+            title=title,
+            slug=slug,
+            excerpt='Resumo',
+            content=content,
+            author=self.user,
+            status=status,
+            published_at=timezone.now(),
+        )
+    
+    def test_published_post_is_indexed_on_save(self):
+        """Teste de indexação por sinal ao salvar"""
+        post = self.create_post('guarda', 'Passagem de guarda', 'Detalhes da técnica')
+        results = search('guarda')
+        self.assertEqual([(r.kind, r.object_id) for r in results], [('blog', post.pk)])
+        self.assertEqual(results[0].title, 'Passagem de guarda')
+    
+    def test_accent_insensitive_and_prefix(self):
+        """Teste de busca sem acentos e por prefixo"""
+        post = self.create_post('tecnica', 'Treino', 'Uma técnica de raspagem')
+        self.assertEqual([r.object_id for r in search('tecnicas')], [])
+        self.assertEqual([r.object_id for r in search('tecnic')], [post.pk])
+    
+    def test_title_match_ranks_first(self):
+        """Teste de que ocorrências no título pesam mais"""
+        body = self.create_post('corpo', 'Aula de sábado', 'Falamos sobre finalização no treino')
+        title = self.create_post('titulo', 'Finalização do dia', 'Conteúdo geral')
+        self.assertEqual([r.object_id for r in search('finalizacao')], [title.pk, body.pk])
+    
+    def test_unpublish_and_delete_remove_entry(self):
+        """Teste de remoção do índice ao despublicar ou excluir"""
+        post = self.create_post('raspagem', 'Raspagem', 'Conteúdo')
+        post.status = 'draft'
+        post.save()
+        self.assertEqual(search('raspagem'), [])
+        post.status = 'published'
+        post.save()
+        post.delete()
+        self.assertEqual(search('raspagem'), [])
+        self.assertFalse(SearchEntry.objects.exists())
+    
+    def test_filter_queryset(self):
+        """Teste da busca aplicada a um queryset (usada nas listagens)"""
+        self.create_post('joelho', 'Chave de joelho', 'Conteúdo')
+        self.create_post('braco', 'Chave de braço', 'Conteúdo')
+        queryset = filter_queryset(BlogPost.objects.filter(status='published'), 'joelho')
+        self.assertEqual([p.slug for p in queryset], ['joelho'])
+        
+        # Ordenação por relevância (título pesa mais)
+        self.create_post('corpo', 'Aula de sábado', 'Treino de chave de joelho')
+        queryset = filter_queryset(BlogPost.objects.filter(status='published'), 'joelho')
+        self.assertEqual([p.slug for p in queryset], ['joelho', 'corpo'])
+    
+    def test_filter_queryset_is_not_truncated(self):
+        """Teste de que os filtros do queryset valem sobre todos os resultados, não só os primeiros"""
+        other = User.objects.create_user(username='outro', password='testpass123')
+        BlogPost.objects.bulk_create([
+            BlogPost(title=f'Guarda {i}', slug=f'guarda-{i}', excerpt='Resumo', content='Guarda',
+                     author=self.user, status='published', published_at=timezone.now())
+            for i in range(250)
+        ])
+        rebuild(['blog'])
+        for i in range(3):
+            post = self.create_post(f'outro-{i}', 'Treino', 'Guarda fechada')
+            BlogPost.objects.filter(pk=post.pk).update(author=other)
+        queryset = filter_queryset(BlogPost.objects.filter(author=other), 'guarda')
+        self.assertEqual(queryset.count(), 3)
+    
+    def test_rebuild(self):
+        """Teste da reconstrução do índice"""
+        self.create_post('omoplata', 'Omoplata', 'Conteúdo')
+        SearchEntry.objects.all().delete()
+        self.assertEqual(rebuild(['blog']), 1)
+        self.assertEqual(len(search('omoplata')), 1)
+
+
+@query_budget(1)
+def over_budget_view(request):
+    """View de teste que excede o orçamento de consultas"""
+    list(User.objects.all())
+    list(ContactMessage.objects.all())
+    return HttpResponse('ok')
+
+
+urlpatterns = [
+    path('over-budget/', over_budget_view, name='over_budget'),
+]
+
+
+@override_settings(SERVER_TIMING_HEADER=True)
+class RequestMetricsTestCase(TestCase):
+    """Testes das medições por requisição e dos orçamentos de consultas"""
+    
+    @override_settings(SERVER_TIMING_HEADER=False, METRICS_ALLOWED_IPS=[])
+    def test_server_timing_hidden_by_default(self):
+        """Teste de que respostas públicas em produção não expõem consultas e tempos"""
+        response = self.client.get(reverse('core:about'))
+        self.assertFalse(response.has_header('Server-Timing'))
+    
+    @override_settings(SERVER_TIMING_HEADER=False, METRICS_ALLOWED_IPS=['10.0.0.5'])
+    def test_server_timing_for_allowed_ip(self):
+        """Teste do Server-Timing para os IPs liberados das métricas"""
+        self.assertFalse(self.client.get(reverse('core:about')).has_header('Server-Timing'))
+        response = self.client.get(reverse('core:about'), REMOTE_ADDR='10.0.0.5')
+        self.assertIn('total;dur=', response['Server-Timing'])
+    
+    def test_server_timing_header(self):
+        """Teste do cabeçalho Server-Timing com consultas e templates"""
+        response = self.client.get(reverse('core:about'))
+        header = response['Server-Timing']
+        self.assertIn('db;dur=', header)
+        self.assertIn('queries"', header)
+        self.assertIn('tpl;dur=', header)
+        self.assertIn('total;dur=', header)
+    
+    def test_structured_log_line(self):
+        """Teste da linha de log JSON por requisição"""
+        import json
+        with self.assertLogs('core.requests', 'INFO') as logs:
+            self.client.get(reverse('core:about'))
+        data = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(data['view'], 'core:about')
+        self.assertEqual(data['status'], 200)
+        self.assertGreater(data['size'], 0)
+        self.assertGreater(data['template_ms'], 0)
+    
+    @override_settings(ROOT_URLCONF='core.tests', QUERY_BUDGET_STRICT=True)
+    def test_budget_raises_in_strict_mode(self):
+        """Teste de erro ao exceder o orçamento (testes/desenvolvimento)"""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/over-budget/')
+    
+    @override_settings(ROOT_URLCONF='core.tests', QUERY_BUDGET_STRICT=False)
+    def test_budget_warns_in_production(self):
+        """Teste de aviso no log ao exceder o orçamento em produção"""
+        with self.assertLogs('core.requests', 'WARNING') as logs:
+            response = self.client.get('/over-budget/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('over_budget: 2 consultas', logs.output[-1])
+    
+    async def test_async_request(self):
+        """Teste das medições sob ASGI (middleware assíncrono)"""
+        response = await self.async_client.get(reverse('core:healthz_live'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ReadinessTestCase(TestCase):
+    """Testes de /healthz/live e /healthz/ready"""
+    
+    def setUp(self):
+        health.reset()
+    
+    def test_live(self):
+        """Teste da vivacidade"""
+        response = self.client.get(reverse('core:healthz_live'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+    
+    def test_ready(self):
+        """Teste da prontidão com latência por dependência"""
+        response = self.client.get(reverse('core:healthz_ready'))
+        self.assertEqual(response.status_code, 200)
+        checks = response.json()['checks']
+        for name in ('database', 'cache', 'storage'):
+            self.assertEqual(checks[name]['status'], 'ok')
+            self.assertIn('latency_ms', checks[name])
+        self.assertEqual(checks['broker']['status'], 'skipped')
+    
+    def test_failures_and_timeouts(self):
+        """Teste de dependência com erro e com tempo esgotado"""
+        def broken():
+            raise ConnectionError('recusada')
+        
+        healthy, results = health.run_checks(
+            {'ok': lambda: None, 'broken': broken, 'slow': lambda: time.sleep(0.5)},
+            timeout=0.1,
+        )
+        self.assertFalse(healthy)
+        self.assertEqual(results['ok']['status'], 'ok')
+        self.assertEqual(results['broken']['error'], 'ConnectionError: recusada')
+        self.assertEqual(results['slow']['status'], 'timeout')
+    
+    def test_ready_returns_503(self):
+        """Teste do status 503 quando uma dependência falha"""
+        def broken():
+            raise ConnectionError('recusada')
+        
+        with patch.dict(health.CHECKS, {'database': broken}):
+            response = self.client.get(reverse('core:healthz_ready'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['checks']['database']['status'], 'error')
+    
+    @override_settings(HEALTHCHECK_CACHE_SECONDS=60)
+    def test_results_are_cached(self):
+        """Teste da reutilização do resultado dentro da validade"""
+        calls = []
+        with patch.dict(health.CHECKS, {'database': lambda: calls.append(1)}):
+            health.readiness()
+            healthy, _, age = health.readiness()
+        self.assertTrue(healthy)
+        self.assertEqual(len(calls), 1)
+        self.assertGreaterEqual(age, 0)
+
+
+@override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'])
+class MetricsTestCase(TestCase):
+    """Testes do endpoint /metrics"""
+    
+    @skipUnless(metrics.ENABLED, 'prometheus_client não instalado')
+    @override_settings(OUTBOUND_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_metrics_endpoint(self):
+        """Teste das métricas de requisições, cache, e-mails e gauges"""
+        self.client.get(reverse('core:about'))
+        OutboundEmail.objects.create(to=['a@example.com'], subject='Oi', body='Olá')
+        dispatch_outbound_emails()
+        SiteSettings.load()
+        
+        response = self.client.get(reverse('core:metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        content = response.content.decode()
+        self.assertIn('asbjj_http_request_duration_seconds_bucket{', content)
+        self.assertIn('view="core:about"', content)
+        self.assertIn('asbjj_http_request_db_queries_bucket{', content)
+        self.assertIn('asbjj_cache_requests_total{cache="site_settings"', content)
+        self.assertIn('asbjj_emails_total{backend="django.core.mail.backends.locmem.EmailBackend",result="sent"}', content)
+        self.assertIn('asbjj_pending_payments 0.0', content)
+        self.assertIn('asbjj_outbound_email_queue{status="sent"} 1.0', content)
+    
+    @skipUnless(metrics.ENABLED, 'prometheus_client não instalado')
+    def test_celery_task_metrics(self):
+        """Teste da duração e das falhas das tarefas"""
+        class FakeTask:
+            name = 'core.tasks.dispatch_outbound_emails'
+        
+        metrics.task_started(task_id='1', task=FakeTask())
+        metrics.task_finished(task_id='1', task=FakeTask(), state='SUCCESS')
+        metrics.task_failed(sender=FakeTask(), exception=ValueError())
+        content = self.client.get(reverse('core:metrics')).content.decode()
+        self.assertIn(
+            'asbjj_celery_task_duration_seconds_count{state="SUCCESS",task="core.tasks.dispatch_outbound_emails"}',
+            content,
+        )
+        self.assertIn(
+            'asbjj_celery_task_failures_total{exception="ValueError",task="core.tasks.dispatch_outbound_emails"}',
+            content,
+        )
+    
+    @skipIf(metrics.ENABLED, 'prometheus_client instalado')
+    def test_metrics_unavailable(self):
+        """Teste da resposta sem a dependência instalada"""
+        response = self.client.get(reverse('core:metrics'))
+        self.assertEqual(response.status_code, 503)
+    
+    @override_settings(METRICS_TOKEN='segredo')
+    def test_metrics_token(self):
+        """Teste do token de acesso às métricas"""
+        response = self.client.get(reverse('core:metrics'))
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get(reverse('core:metrics'), HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertNotEqual(response.status_code, 401)
+    
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_metrics_closed_by_default(self):
+        """Teste de que, sem token nem IP liberado, /metrics não é exposto"""
+        response = self.client.get(reverse('core:metrics'))
+        self.assertEqual(response.status_code, 404)
+        with override_settings(DEBUG=True):
+            self.assertNotEqual(self.client.get(reverse('core:metrics')).status_code, 404)
+
+
 class HealthCheckTestCase(TestCase):
     """Testes para o endpoint de health check"""
     
@@ -490,4 +988,441 @@ class HealthCheckTestCase(TestCase):
         
         # POST deve retornar 405 (Method Not Allowed)
         response = self.client.post(reverse('core:healthz'))
-        self.assertEqual(response.status_code, 405)
\ No newline at end of file
+        self.assertEqual(response.status_code, 405)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    """Backend de teste que sempre falha no envio"""
+    
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPServerDisconnected('Conexão perdida')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    OUTBOUND_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    OUTBOUND_EMAIL_RATE_LIMIT=None,
+)
+class OutboundEmailQueueTestCase(TestCase):
+    """Testes para a fila de e-mails de saída"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+    
+    def queue_email(self, subject='Assunto'):
+        msg = EmailMultiAlternatives(subject, 'Texto', 'noreply@asbjj.com.br', ['aluno@example.com'])
+        msg.attach_alternative('<p>Texto</p>', 'text/html')
+        msg.send()
+    
+    def test_send_mail_only_enqueues(self):
+        """Teste de que o envio na requisição é apenas um INSERT"""
+        with self.assertNumQueries(1):
+            mail.send_mail('Assunto', 'Mensagem', 'noreply@asbjj.com.br', ['aluno@example.com'])
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, 'queued')
+        self.assertEqual(email.to, ['aluno@example.com'])
+    
+    def test_dispatch_sends_queued_emails(self):
+        """Teste do envio da fila pelo backend real"""
+        self.queue_email()
+        self.assertEqual(dispatch_outbound_emails(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, 'sent')
+        self.assertIsNotNone(email.sent_at)
+        self.assertEqual(dispatch_outbound_emails(), (0, 0))
+    
+    @override_settings(OUTBOUND_EMAIL_BACKEND='core.tests.FailingEmailBackend', OUTBOUND_EMAIL_MAX_ATTEMPTS=2)
+    def test_failure_retries_with_backoff_then_dead_letters(self):
+        """Teste de reagendamento com espera e descarte após o limite"""
+        self.queue_email()
+        self.assertEqual(dispatch_outbound_emails(), (0, 1))
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, 'queued')
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn('Conexão perdida', email.last_error)
+        
+        # Ainda em espera: nada é reenviado
+        self.assertEqual(dispatch_outbound_emails(), (0, 0))
+        
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        dispatch_outbound_emails()
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'dead')
+        self.assertEqual(email.attempts, 2)
+    
+    @override_settings(OUTBOUND_EMAIL_MAX_ATTEMPTS=2)
+    def test_stale_claims_count_attempts(self):
+        """Teste de que itens presos em 'sending' contam tentativas e acabam descartados"""
+        self.queue_email()
+        stale = timezone.now() - timedelta(hours=1)
+        
+        for attempts in (1, 2):
+            # Worker interrompido depois de reservar o lote
+            self.assertEqual(len(claim_batch(10)), 1)
+            OutboundEmail.objects.update(locked_at=stale)
+            self.assertEqual(OutboundEmail.objects.get().attempts, attempts)
+        
+        self.assertEqual(claim_batch(10), [])
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, 'dead')
+        self.assertEqual(email.attempts, 2)
+        self.assertEqual(dispatch_outbound_emails(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+    
+    @override_settings(OUTBOUND_EMAIL_RATE_LIMIT=2)
+    def test_rate_limit_per_minute(self):
+        """Teste do limite de envios por minuto"""
+        for i in range(3):
+            self.queue_email(f'Assunto {i}')
+        self.assertEqual(dispatch_outbound_emails(), (2, 0))
+        self.assertEqual(dispatch_outbound_emails(), (0, 0))
+        self.assertEqual(OutboundEmail.objects.filter(status='queued').count(), 1)
+
+
+def jpeg_upload(name='foto.jpg', size=(2000, 1500), color=(200, 30, 30), orientation=None):
+    """Arquivo JPEG de teste gerado com Pillow"""
+    import io
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from PIL import Image
+    
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    Image.new('RGB', size, color).save(buffer, format='JPEG', exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ImageDerivativesTestCase(TestCase):
+    """Testes das versões responsivas das imagens enviadas"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+    
+    def test_upload_is_queued_and_processed(self):
+        """Teste da fila: o upload registra a imagem e o lote gera as versões WebP"""
+        item = Gallery.objects.create(title='Treino', image=jpeg_upload())
+        asset = ImageAsset.objects.get(source=item.image.name)
+        self.assertEqual(asset.status, 'pending')
+        
+        self.assertEqual(process_pending(), (1, 0))
+        asset.refresh_from_db()
+        self.assertEqual(asset.status, 'ready')
+        self.assertEqual((asset.width, asset.height), (2000, 1500))
+        self.assertEqual([width for _, width in asset.variants['webp']], [320, 640, 1280])
+        self.assertTrue(all(name.endswith('.webp') for name, _ in asset.variants['webp']))
+        self.assertIn(asset.digest, asset.variants['webp'][0][0])
+    
+    def test_identical_upload_reuses_variants(self):
+        """Teste dos nomes pelo hash do conteúdo: mesmo arquivo, mesmas versões"""
+        first = Gallery.objects.create(title='A', image=jpeg_upload('a.jpg'))
+        second = Gallery.objects.create(title='B', image=jpeg_upload('b.jpg'))
+        self.assertNotEqual(first.image.name, second.image.name)
+        process_pending()
+        assets = ImageAsset.objects.filter(status='ready')
+        self.assertEqual(len({asset.digest for asset in assets}), 1)
+        self.assertEqual(assets[0].variants, assets[1].variants)
+    
+    def test_small_image_is_not_upscaled(self):
+        """Teste de que imagens pequenas geram só a própria largura"""
+        item = Gallery.objects.create(title='Pequena', image=jpeg_upload(size=(200, 100)))
+        process_pending()
+        self.assertEqual(ImageAsset.objects.get(source=item.image.name).variants['webp'][0][1], 200)
+    
+    def test_invalid_image_is_marked_failed(self):
+        """Teste de que arquivos inválidos não travam a fila"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        Gallery.objects.create(title='Quebrada', image=SimpleUploadedFile('x.jpg', b'nao e imagem'))
+        self.assertEqual(process_pending(), (0, 1))
+        self.assertEqual(ImageAsset.objects.get().status, 'failed')
+    
+    def test_gallery_renders_srcset(self):
+        """Teste da galeria com <picture>, srcset e sizes, sem uma consulta por imagem"""
+        for i in range(3):
+            Gallery.objects.create(title=f'Foto {i}', image=jpeg_upload(f'{i}.jpg', color=(i, 0, 0)))
+        Gallery.objects.create(title='Sem versões', image='gallery/images/antiga.jpg')
+        process_pending()
+        # Página (paginação por cursor, sem COUNT), versões (uma consulta para todas) e configurações do site
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('core:gallery'))
+        self.assertContains(response, '<picture>', count=3)
+        self.assertContains(response, 'type="image/webp"', count=3)
+        self.assertContains(response, ' 640w')
+        self.assertContains(response, 'sizes="(max-width: 767px) 50vw')
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(response, 'width="2000" height="1500"')
+        self.assertContains(response, 'data-bs-src="/media/images/')
+        self.assertContains(response, 'src="/media/gallery/images/antiga.jpg"')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class GalleryFeedTestCase(TestCase):
+    """Testes das prévias da galeria e do feed JSON paginado por cursor"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+    
+    def test_upload_computes_dimensions_and_placeholder(self):
+        """Teste das dimensões (com orientação EXIF) e da prévia calculadas no upload"""
+        item = Gallery.objects.create(title='Retrato', image=jpeg_upload(size=(400, 200), orientation=6))
+        self.assertEqual((item.width, item.height), (200, 400))
+        self.assertTrue(item.placeholder.startswith('data:image/webp;base64,'))
+        self.assertLess(len(item.placeholder), 1000)
+        # O arquivo gravado continua completo
+        item.refresh_from_db()
+        self.assertEqual((item.image.width, item.image.height), (400, 200))
+    
+    def test_feed_is_paginated_by_category(self):
+        """Teste do feed por categoria: 24 itens por página e cursor para a próxima"""
+        for i in range(26):
+            Gallery.objects.create(title=f'Evento {i}', category='events', order=i,
+                                   image=jpeg_upload(f'e{i}.jpg', size=(40, 30)))
+        Gallery.objects.create(title='Equipe', category='team', image=jpeg_upload('t.jpg', size=(40, 30)))
+        
+        url = reverse('core:gallery_feed')
+        with self.assertNumQueries(2):
+            data = self.client.get(url, {'categoria': 'events'}).json()
+        self.assertEqual(len(data['results']), 24)
+        self.assertEqual(data['results'][0]['title'], 'Evento 0')
+        first = data['results'][0]
+        self.assertEqual((first['width'], first['height']), (40, 30))
+        self.assertTrue(first['placeholder'].startswith('data:image/webp'))
+        
+        data = self.client.get(url, {'categoria': 'events', 'cursor': data['next_cursor']}).json()
+        self.assertEqual([item['title'] for item in data['results']], ['Evento 24', 'Evento 25'])
+        self.assertIsNone(data['next_cursor'])
+    
+    def test_gallery_page_ships_placeholders(self):
+        """Teste da primeira página com prévias, dimensões e o cursor do feed"""
+        for i in range(25):
+            Gallery.objects.create(title=f'Foto {i}', order=i, image=jpeg_upload(f'{i}.jpg', size=(40, 30)))
+        response = self.client.get(reverse('core:gallery'))
+        self.assertContains(response, 'background: url(data:image/webp;base64,', count=24)
+        self.assertContains(response, 'width="40" height="30"', count=24)
+        self.assertContains(response, 'id="gallery-more"')
+        self.assertContains(response, reverse('core:gallery_feed'))
+
+
+class StaticPipelineTestCase(TestCase):
+    """Testes do pipeline de estáticos no collectstatic (minificação, pacotes, hash e .br/.gz)"""
+    
+    PIPELINE_STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'core.staticfiles.OptimizedStaticFilesStorage'},
+    }
+    
+    def test_pages_use_original_files_without_pipeline(self):
+        """Teste de que, sem o pipeline (testes/DEBUG), as páginas usam os arquivos originais"""
+        response = self.client.get(reverse('core:about'))
+        self.assertContains(response, '/static/css/style.css')
+        self.assertContains(response, '/static/css/sobre.css')
+        self.assertContains(response, '/static/js/main.js')
+    
+    def test_collectstatic_builds_hashed_compressed_bundles(self):
+        """Teste do collectstatic: pacotes minificados, com hash e irmãos .br/.gz"""
+        import json
+        from pathlib import Path
+        from django.core.management import call_command
+        from django.template import Context, Template
+        from .staticfiles import STATIC_BUNDLES
+        
+        static_root = Path(tempfile.mkdtemp())
+        with override_settings(STATIC_ROOT=static_root, STORAGES=self.PIPELINE_STORAGES, STATICFILES_DIRS=[]):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            manifest = json.loads((static_root / 'staticfiles.json').read_text())['paths']
+            
+            for bundle, sources in STATIC_BUNDLES.items():
+                hashed = manifest[f'bundles/{bundle}']
+                self.assertRegex(hashed, r'\.[0-9a-f]{12}\.(css|js)$')
+                for suffix in ('', '.br', '.gz'):
+                    self.assertTrue((static_root / (hashed + suffix)).exists(), hashed + suffix)
+            
+            original = (Path(__file__).parent / 'static/css/style.css').stat().st_size
+            self.assertLess((static_root / manifest['bundles/site.css']).stat().st_size, original)
+            
+            with override_settings(DEBUG=False):
+                html = Template("{% load core_static %}{% bundle 'site.css' %}").render(Context())
+            self.assertEqual(html, f'<link rel="stylesheet" href="/static/{manifest["bundles/site.css"]}">')
+
+
+class ServiceWorkerTestCase(TestCase):
+    """Testes do service worker gerado a partir do manifest do collectstatic"""
+    
+    def setUp(self):
+        from pathlib import Path
+        self.static_root = Path(tempfile.mkdtemp())
+    
+    def write_manifest(self, paths):
+        import json
+        (self.static_root / 'staticfiles.json').write_text(json.dumps({'paths': paths, 'version': '1.1', 'hash': 'x'}))
+    
+    def test_command_precaches_hashed_app_shell(self):
+        """Teste de que o comando grava o pré-cache com os nomes com hash e versiona pelo manifest"""
+        from django.core.management import call_command
+        
+        paths = {
+            'bundles/site.css': 'bundles/site.0123456789ab.css',
+            'bundles/site.js': 'bundles/site.ba9876543210.js',
+            'img/logo.png': 'img/logo.aaaaaaaaaaaa.png',
+            'manifest.webmanifest': 'manifest.bbbbbbbbbbbb.webmanifest',
+        }
+        with override_settings(STATIC_ROOT=self.static_root):
+            self.write_manifest(paths)
+            call_command('build_service_worker', stdout=StringIO())
+            first = (self.static_root / 'sw.js').read_text()
+            
+            paths['bundles/site.css'] = 'bundles/site.cccccccccccc.css'
+            self.write_manifest(paths)
+            call_command('build_service_worker', stdout=StringIO())
+            second = (self.static_root / 'sw.js').read_text()
+        
+        self.assertIn('"/static/bundles/site.0123456789ab.css"', first)
+        self.assertIn('"/static/img/logo.aaaaaaaaaaaa.png"', first)
+        self.assertIn(f'"{reverse("core:gallery")}"', first)
+        self.assertIn(f'const OFFLINE_PAGE = "{reverse("core:offline")}"', first)
+        # Páginas com dados do aluno não são listadas nem guardadas
+        self.assertNotIn(reverse('student_dashboard'), first)
+        self.assertNotIn('{{', first)
+        version = [line for line in first.splitlines() if line.startswith('const VERSION')]
+        self.assertNotIn(version[0], second)
+    
+    def test_view_serves_root_scoped_worker(self):
+        """Teste de que /sw.js é servido com escopo na raiz e sem cache longo"""
+        with override_settings(STATIC_ROOT=self.static_root):
+            response = self.client.get(reverse('core:service_worker'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(reverse('core:service_worker'), '/sw.js')
+        self.assertEqual(response['Service-Worker-Allowed'], '/')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertIn('javascript', response['Content-Type'])
+        # Sem collectstatic: pré-cache com os arquivos originais
+        self.assertContains(response, '"/static/css/style.css"')
+    
+    def test_offline_page_has_no_user_data(self):
+        """Teste de que a página offline (pré-cache) não mostra dados do usuário logado"""
+        user = User.objects.create_user(username='fulano', first_name='Fulano', password='testpass123')
+        self.client.force_login(user)
+        response = self.client.get(reverse('core:offline'))
+        self.assertContains(response, 'Sem conexão')
+        self.assertNotContains(response, 'Fulano')
+        self.assertNotContains(response, 'fulano')
+    
+    def test_logout_clears_cached_pages(self):
+        """Teste de que o logout pede ao navegador para limpar o cache"""
+        response = self.client.get(reverse('logout'))
+        self.assertEqual(response['Clear-Site-Data'], '"cache"')
+
+
+class PlaceholderTemplateTestCase(TestCase):
+    """Testes do conteúdo com marcadores pré-compilado"""
+    
+    def test_render_replaces_known_tokens(self):
+        """Teste de que os marcadores conhecidos viram posições e são substituídos"""
+        compiled = CompiledTemplate('Olá %%NAME%%, <a href="%%URL%%">sair</a> %%NAME%%', ['NAME', 'URL'])
+        
+        self.assertEqual(compiled.slots, ('NAME', 'URL', 'NAME'))
+        self.assertEqual(len(compiled.segments), len(compiled.slots) + 1)
+        self.assertEqual(
+            compiled.render({'NAME': 'Ana', 'URL': '/x/'}),
+            'Olá Ana, <a href="/x/">sair</a> Ana',
+        )
+    
+    def test_unknown_tokens_are_kept_verbatim(self):
+        """Teste de que marcadores desconhecidos ficam no texto como foram escritos"""
+        content = 'Cupom %%PROMO_CODE%% para %%NAME%% (100%% grátis)'
+        compiled = CompiledTemplate(content, ['NAME'])
+        
+        self.assertEqual(compiled.slots, ('NAME',))
+        self.assertEqual(compiled.render({'NAME': 'Ana'}), 'Cupom %%PROMO_CODE%% para Ana (100%% grátis)')
+    
+    def test_content_without_tokens(self):
+        """Teste de conteúdo sem marcadores (ou vazio)"""
+        self.assertEqual(CompiledTemplate('', ['NAME']).render({}), '')
+        self.assertEqual(CompiledTemplate('sem marcadores', ['NAME']).render({}), 'sem marcadores')
+    
+    @skipUnless(apps.is_installed('newsletter'), 'App de newsletter inativo')
+    def test_campaign_message(self):
+        """Teste de que a campanha renderizada uma vez gera o e-mail de cada assinante"""
+        from newsletter.mailing import CompiledCampaign, render_campaign
+        from newsletter.models import NewsletterCampaign, NewsletterSubscriber
+        
+        campaign = NewsletterCampaign(
+            title='Promo', subject='Oi %%FIRST_NAME%%',
+            content='<p>{{ subscriber_name }} %%PROMO%%</p><a href="{{ unsubscribe_url }}">sair</a>',
+            plain_content='{{ first_name }} %%PROMO%%',
+        )
+        subscriber = NewsletterSubscriber(email='ana@example.com', first_name='Ana', last_name='<b>')
+        message = CompiledCampaign.from_dict(render_campaign(campaign)).build_message(subscriber)
+        
+        self.assertEqual(message.subject, 'Oi Ana')
+        self.assertEqual(message.body, 'Ana %%PROMO%%')
+        html = message.alternatives[0][0]
+        self.assertIn('<p>Ana &lt;b&gt; %%PROMO%%</p>', html)
+        self.assertIn(f'/newsletter/descadastrar/{subscriber.unsubscribe_token}/', html)
+
+
+@skipUnless(apps.is_installed('newsletter'), 'App de newsletter inativo')
+class NewsletterCampaignDispatchTestCase(TestCase):
+    """Testes da distribuição das campanhas de newsletter agendadas"""
+    
+    def setUp(self):
+        from newsletter.models import NewsletterCampaign, NewsletterSubscriber
+        
+        for i in range(3):
+            NewsletterSubscriber.objects.create(email=f'assinante{i}@example.com', is_verified=True)
+        self.campaign = NewsletterCampaign.objects.create(
+            title='Promo', subject='Promoção', content='<p>Oi {{ first_name }}</p>',
+            status='scheduled', scheduled_date=timezone.now() - timedelta(minutes=1),
+        )
+        self.batches = []
+    
+    def enqueue(self, data, subscriber_ids):
+        self.batches.append(subscriber_ids)
+    
+    def test_dispatch_enqueues_batches_after_commit(self):
+        """Teste de que a campanha é reservada uma vez e os lotes saem só depois do commit"""
+        from newsletter.mailing import dispatch_campaign, due_campaigns
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(dispatch_campaign(self.campaign, self.enqueue))
+            self.assertEqual(self.batches, [])
+        self.assertEqual(sum(len(ids) for ids in self.batches), 3)
+        self.assertFalse(dispatch_campaign(self.campaign, self.enqueue))
+        self.assertFalse(due_campaigns().exists())
+    
+    def test_render_failure_keeps_campaign_scheduled(self):
+        """Teste de que um erro na renderização não deixa a campanha presa nem envia lotes"""
+        from newsletter.mailing import dispatch_campaign
+        
+        with patch('newsletter.mailing.render_campaign', side_effect=ValueError('template')):
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(ValueError):
+                    dispatch_campaign(self.campaign, self.enqueue)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'scheduled')
+        self.assertEqual(self.batches, [])
+    
+    def test_sent_total_counts_delivered_messages(self):
+        """Teste de que total_sent soma os envios de cada lote"""
+        from newsletter.mailing import record_campaign_sent
+        
+        record_campaign_sent(self.campaign.pk, 2)
+        record_campaign_sent(self.campaign.pk, 1)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.total_sent, 3)
+    
+    def test_segmented_campaigns_are_not_sent(self):
+        """Teste de que campanhas com segmentação não são tratadas como envio para todos"""
+        from newsletter.mailing import is_segmented
+        
+        self.assertFalse(is_segmented(self.campaign))
+        self.campaign.target_segments = ['alunos']
+        self.assertTrue(is_segmented(self.campaign))
@@ -10,11 +10,17 @@ urlpatterns = [
     path('servicos/', views.ServicesView.as_view(), name='services'),
     path('contato/', views.ContactView.as_view(), name='contact'),
     path('galeria/', views.GalleryListView.as_view(), name='gallery'),
+    path('galeria/feed/', views.gallery_feed, name='gallery_feed'),
     # Blog removido
     path('inscricao/', views.EnrollmentApplicationView.as_view(), name='enrollment'),
     path('calendario/', views.CalendarView.as_view(), name='calendar'),
     path('loja/', views.ShopView.as_view(), name='shop'),
     path('healthz', views.healthz, name='healthz'),
+    path('healthz/live', views.healthz_live, name='healthz_live'),
+    path('healthz/ready', views.healthz_ready, name='healthz_ready'),
+    path('metrics', views.metrics_view, name='metrics'),
+    path('sw.js', views.service_worker_view, name='service_worker'),
+    path('offline/', views.offline_view, name='offline'),
     
     # URLs antigas para compatibilidade
     path('sobre/', views.sobre, name='sobre'),
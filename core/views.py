@@ -5,18 +5,25 @@ from django.db import IntegrityError
 from django.views.generic import TemplateView, ListView, DetailView, FormView
 from django.contrib import messages
 from django.urls import reverse_lazy
-from django.db.models import Q
 from django.utils import timezone
 from django.conf import settings
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
 from django.views.decorators.http import require_http_methods
 
 from .models import SiteSettings, ContactMessage, Instructor, Gallery, BlogPost
 from .forms import ContactForm, TrialClassBookingForm
+from . import health, metrics, service_worker
+from .images import prefetch_image_assets
+from .instrumentation import query_budget
+from .pagination import KeysetPaginationMixin, paginate_keyset
+from .page_cache import PublicPageCacheMixin
+from .search import filter_queryset
+from .templatetags.core_images import image_variant
 from students.models import Student
 
 
-class HomeView(TemplateView):
+@query_budget(8)
+class HomeView(PublicPageCacheMixin, TemplateView):
     """Página inicial"""
     template_name = 'core/index.html'
 
@@ -24,10 +31,7 @@ class HomeView(TemplateView):
         context = super().get_context_data(**kwargs)
         
         # Configurações do site
-        try:
-            context['site_settings'] = SiteSettings.objects.first()
-        except:
-            context['site_settings'] = None
+        context['site_settings'] = SiteSettings.load()
         
         # Instrutores
         context['featured_instructors'] = Instructor.objects.filter(is_active=True, is_featured=True)[:4]
@@ -43,7 +47,7 @@ class HomeView(TemplateView):
         return context
 
 
-class AboutView(TemplateView):
+class AboutView(PublicPageCacheMixin, TemplateView):
     """Página sobre"""
     template_name = 'core/sobre.html'
 
@@ -54,15 +58,12 @@ class AboutView(TemplateView):
         context['instructors'] = Instructor.objects.filter(is_active=True)
         
         # Configurações do site
-        try:
-            context['site_settings'] = SiteSettings.objects.first()
-        except:
-            context['site_settings'] = None
+        context['site_settings'] = SiteSettings.load()
         
         return context
 
 
-class ServicesView(TemplateView):
+class ServicesView(PublicPageCacheMixin, TemplateView):
     """Página de serviços"""
     template_name = 'core/servicos.html'
 
@@ -70,10 +71,7 @@ class ServicesView(TemplateView):
         context = super().get_context_data(**kwargs)
         
         # Configurações do site
-        try:
-            context['site_settings'] = SiteSettings.objects.first()
-        except:
-            context['site_settings'] = None
+        context['site_settings'] = SiteSettings.load()
         
         return context
 
@@ -84,6 +82,14 @@ class ContactView(FormView):
     form_class = ContactForm
     success_url = reverse_lazy('core:contact')
 
+    def get_initial(self):
+        initial = super().get_initial()
+        # E-mail vindo do formulário de newsletter do rodapé
+        email = self.request.GET.get('email')
+        if email:
+            initial['email'] = email
+        return initial
+
     def form_valid(self, form):
         # Salvar a mensagem
         contact_message = form.save(commit=False)
@@ -175,19 +181,119 @@ def healthz(request):
     })
 
 
-class GalleryListView(ListView):
-    """Galeria de fotos"""
+@require_http_methods(["GET"])
+def healthz_live(request):
+    """Vivacidade: o processo responde (não consulta dependências)"""
+    return JsonResponse({'status': 'ok'})
+
+
+@require_http_methods(["GET"])
+def healthz_ready(request):
+    """Prontidão: banco, cache, broker e mídia, com latência de cada um"""
+    healthy, checks, age = health.readiness()
+    return JsonResponse(
+        {'status': 'ok' if healthy else 'error', 'checks': checks, 'age': age},
+        status=200 if healthy else 503,
+    )
+
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """Métricas no formato de texto do Prometheus"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponse('Não autorizado', status=401, content_type='text/plain')
+    elif not settings.DEBUG and request.META.get('REMOTE_ADDR') not in getattr(settings, 'METRICS_ALLOWED_IPS', []):
+        # Sem token configurado: só IPs internos liberados (contagens financeiras e filas)
+        raise Http404
+    if not metrics.ENABLED:
+        return HttpResponse('prometheus_client não instalado', status=503, content_type='text/plain')
+    return HttpResponse(metrics.generate_latest(), content_type=metrics.CONTENT_TYPE_LATEST)
+
+
+@require_http_methods(["GET"])
+def service_worker_view(request):
+    """
+    Service worker na raiz (escopo do site inteiro). Serve o arquivo gerado por
+    ``build_service_worker``; sem ele (desenvolvimento), gera na hora.
+    """
+    path = service_worker.service_worker_path()
+    content = path.read_text() if path.exists() else service_worker.build_service_worker()
+    response = HttpResponse(content, content_type='application/javascript; charset=utf-8')
+    # O navegador revalida a cada navegação e instala a versão nova logo após o deploy
+    response['Cache-Control'] = 'no-cache'
+    response['Service-Worker-Allowed'] = '/'
+    return response
+
+
+@require_http_methods(["GET"])
+def offline_view(request):
+    """Página genérica exibida pelo service worker sem conexão (sem dados de usuário)"""
+    return render(request, 'core/offline.html')
+
+
+GALLERY_PAGE_SIZE = 24
+GALLERY_ORDERING = ['order', '-created_at', '-id']
+
+
+def gallery_queryset(request):
+    queryset = Gallery.objects.all()
+    category = request.GET.get('categoria')
+    if category:
+        queryset = queryset.filter(category=category)
+    return queryset
+
+
+def gallery_item_data(item):
+    """Item do feed da galeria: dimensões, prévia e versões para montar o <picture>"""
+    asset = item.image.asset
+    return {
+        'id': item.id,
+        'title': item.title,
+        'category': item.category,
+        'width': item.width,
+        'height': item.height,
+        'placeholder': item.placeholder,
+        'src': item.image.url,
+        'srcset': {image_format: asset.srcset(image_format) for image_format in asset.variants} if asset else {},
+        'large': image_variant(item.image, 1280),
+    }
+
+
+class GalleryListView(PublicPageCacheMixin, KeysetPaginationMixin, ListView):
+    """
+    Galeria de fotos: a primeira página vem no HTML só com as prévias
+    (imagens com ``loading="lazy"``); as seguintes chegam pelo feed JSON
+    (``gallery_feed``) conforme a rolagem.
+    """
     model = Gallery
     template_name = 'core/galeria.html'
     context_object_name = 'images'
-    paginate_by = 24
+    paginate_by = GALLERY_PAGE_SIZE
+    keyset_ordering = GALLERY_ORDERING
 
     def get_queryset(self):
-        queryset = Gallery.objects.all().order_by('order', '-created_at')
-        category = self.request.GET.get('categoria')
-        if category:
-            queryset = queryset.filter(category=category)
-        return queryset
+        return gallery_queryset(self.request)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        prefetch_image_assets(context['images'], 'image')
+        return context
+
+
+@query_budget(2)
+@require_http_methods(["GET"])
+def gallery_feed(request):
+    """Feed JSON da galeria por categoria (?categoria=), paginado por cursor (?cursor=)"""
+    page = paginate_keyset(request, gallery_queryset(request), GALLERY_ORDERING, GALLERY_PAGE_SIZE)
+    prefetch_image_assets(page.object_list, 'image')
+    response = JsonResponse({
+        'results': [gallery_item_data(item) for item in page],
+        'next_cursor': page.next_cursor,
+    })
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
 
 
 class BlogListView(ListView):
@@ -204,9 +310,14 @@ class BlogListView(ListView):
             queryset = queryset.filter(category=category)
         search = self.request.GET.get('q')
         if search:
-            queryset = queryset.filter(Q(title__icontains=search) | Q(content__icontains=search))
+            queryset = filter_queryset(queryset, search)
         return queryset
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        prefetch_image_assets(context['posts'], 'featured_image')
+        return context
+
 
 class BlogDetailView(DetailView):
     """Detalhe do post do blog"""
@@ -310,11 +421,11 @@ class EnrollmentApplicationView(FormView):
         return super().form_valid(form)
 
 
-class CalendarView(TemplateView):
+class CalendarView(PublicPageCacheMixin, TemplateView):
     """Calendário de eventos/competições"""
     template_name = 'core/calendario.html'
 
 
-class ShopView(TemplateView):
+class ShopView(PublicPageCacheMixin, TemplateView):
     """Página simples de merchandising/loja"""
     template_name = 'core/loja.html'
\ No newline at end of file
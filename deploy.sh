@@ -52,9 +52,14 @@ pip install -r requirements.txt
 print_status "Executando migrações..."
 python manage.py migrate --noinput
 
+# Search index (posts, classes and testimonials that already exist)
+print_status "Reconstruindo o índice de busca..."
+python manage.py rebuild_search_index
+
 # Collect static files
 print_status "Coletando arquivos estáticos..."
 python manage.py collectstatic --noinput
+python manage.py build_service_worker
 
 # Create superuser if it doesn't exist
 print_status "Verificando superusuário..."
@@ -0,0 +1,21 @@
+"""
+Configuração do gunicorn (carregada automaticamente a partir da raiz do projeto).
+
+Com ``PROMETHEUS_MULTIPROC_DIR`` definido, os arquivos de métricas de cada
+worker encerrado são marcados como mortos. O diretório é compartilhado com os
+workers do Celery e deve ser esvaziado pelo deploy antes de iniciar os serviços.
+"""
+
+import os
+
+
+# Sync por padrão; para o modo ASGI use projeto.asgi:application com
+# GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker (veja projeto/asgi.py)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,32 @@
+"""Exportação CSV dos logs de e-mail (mesmos filtros das demais exportações)"""
+
+from core.exports import CSVExporter
+
+
+def filter_email_logs(queryset, params):
+    status_filter = params.get('status', '')
+    date_from = params.get('date_from', '')
+    date_to = params.get('date_to', '')
+
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    if date_from:
+        queryset = queryset.filter(sent_at__date__gte=date_from)
+
+    if date_to:
+        queryset = queryset.filter(sent_at__date__lte=date_to)
+
+    return queryset
+
+
+EMAIL_LOG_EXPORT = CSVExporter([
+    ('Destinatário', 'recipient_email'),
+    ('Assunto', 'subject'),
+    ('Campanha', 'campaign__title'),
+    ('Status', 'status'),
+    ('Enviado em', 'sent_at'),
+    ('Aberto em', 'opened_at'),
+    ('Clicado em', 'clicked_at'),
+    ('Motivo do Retorno', 'bounce_reason'),
+], 'logs_email')
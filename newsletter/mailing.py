@@ -0,0 +1,242 @@
+"""
+Envio em lote das newsletters.
+
+O conteúdo da campanha é renderizado uma única vez com marcadores no lugar
+dos dados do assinante (``%%SUBSCRIBER_NAME%%``, ``%%UNSUBSCRIBE_URL%%``...)
+e compilado em uma lista de trechos fixos e posições variáveis
+(``core.placeholders.CompiledTemplate``). Cada e-mail é montado juntando os
+trechos, sem passar pelo motor de templates; marcadores desconhecidos ficam no
+texto como foram escritos. Os destinatários são divididos em lotes e cada lote
+é enviado por uma única conexão SMTP (``send_messages``).
+"""
+
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from core.metrics import record_emails
+from core.placeholders import CompiledTemplate, token
+
+from .models import NewsletterCampaign, NewsletterSubscriber
+
+
+WEEKLY_NEWSLETTER_SUBJECT = 'Newsletter Semanal ASBJJ - Novidades e Dicas'
+
+# Marcadores substituídos por assinante
+TOKEN_NAMES = ('SUBSCRIBER_NAME', 'FIRST_NAME', 'EMAIL', 'UNSUBSCRIBE_URL')
+NAME_TOKEN = token('SUBSCRIBER_NAME')
+FIRST_NAME_TOKEN = token('FIRST_NAME')
+EMAIL_TOKEN = token('EMAIL')
+UNSUBSCRIBE_TOKEN = token('UNSUBSCRIBE_URL')
+
+# Contexto com os marcadores, usado na renderização única da campanha
+TOKEN_CONTEXT = {
+    'subscriber_name': NAME_TOKEN,
+    'first_name': FIRST_NAME_TOKEN,
+    'email': EMAIL_TOKEN,
+    'unsubscribe_url': UNSUBSCRIBE_TOKEN,
+}
+
+
+def get_batch_size():
+    return getattr(settings, 'NEWSLETTER_BATCH_SIZE', 200)
+
+
+def weekly_recipients():
+    """Assinantes ativos e verificados que recebem a newsletter semanal"""
+    return NewsletterSubscriber.objects.filter(
+        is_active=True,
+        is_verified=True,
+        frequency__in=['weekly', 'monthly'],
+    )
+
+
+def iter_recipient_batches(queryset, batch_size=None):
+    """Percorre os IDs dos destinatários em lotes, sem carregar tudo na memória"""
+    batch_size = batch_size or get_batch_size()
+    batch = []
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    for pk in ids.iterator(chunk_size=batch_size):
+        batch.append(pk)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def unsubscribe_url(subscriber):
+    return f"{settings.SITE_URL}/newsletter/descadastrar/{subscriber.unsubscribe_token}/"
+
+
+def recipient_values(subscriber, html=False):
+    """Valores dos marcadores para um assinante (escapados no HTML)"""
+    values = {
+        'SUBSCRIBER_NAME': subscriber.full_name or 'Prezado(a)',
+        'FIRST_NAME': subscriber.first_name or 'Prezado(a)',
+        'EMAIL': subscriber.email,
+        'UNSUBSCRIBE_URL': unsubscribe_url(subscriber),
+    }
+    if html:
+        values = {key: escape(value) for key, value in values.items()}
+    return values
+
+
+class CompiledCampaign:
+    """Campanha compilada: assunto, texto e HTML prontos para montagem por assinante"""
+
+    def __init__(self, subject, html, text):
+        self.subject = CompiledTemplate(subject, TOKEN_NAMES)
+        self.html = CompiledTemplate(html, TOKEN_NAMES)
+        self.text = CompiledTemplate(text, TOKEN_NAMES)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Recria a campanha a partir do dicionário enviado às tarefas"""
+        return cls(data['subject'], data['html'], data['text'])
+
+    def build_message(self, subscriber, connection=None):
+        values = recipient_values(subscriber)
+        msg = EmailMultiAlternatives(
+            self.subject.render(values),
+            self.text.render(values),
+            settings.DEFAULT_FROM_EMAIL,
+            [subscriber.email],
+            connection=connection,
+        )
+        msg.attach_alternative(self.html.render(recipient_values(subscriber, html=True)), "text/html")
+        return msg
+
+
+def render_campaign(campaign, template=None):
+    """
+    Renderiza uma ``NewsletterCampaign`` uma única vez, opcionalmente dentro
+    de um ``NewsletterTemplate`` (que recebe ``content`` e ``css_styles``).
+    Retorna o dicionário aceito por ``CompiledCampaign.from_dict``.
+    """
+    context = dict(TOKEN_CONTEXT, campaign=campaign, site_url=settings.SITE_URL)
+    content = Template(campaign.content).render(Context(context))
+    if template is not None:
+        content = Template(template.html_template).render(Context(dict(
+            context,
+            content=mark_safe(content),
+            css_styles=mark_safe(template.css_styles),
+        )))
+    text = campaign.plain_content or ''
+    if text:
+        text = Template(text).render(Context(context, autoescape=False))
+    return {'subject': campaign.subject, 'html': content, 'text': text}
+
+
+def campaign_recipients():
+    """Assinantes ativos e verificados que recebem as campanhas"""
+    return NewsletterSubscriber.objects.filter(is_active=True, is_verified=True)
+
+
+def due_campaigns():
+    """Campanhas agendadas cuja data de envio já chegou"""
+    return NewsletterCampaign.objects.filter(
+        status='scheduled',
+        scheduled_date__lte=timezone.now(),
+    ).order_by('scheduled_date')
+
+
+def is_segmented(campaign):
+    """A segmentação ainda não é aplicada: campanhas segmentadas não são enviadas"""
+    return bool(campaign.target_segments or campaign.exclude_segments)
+
+
+def dispatch_campaign(campaign, enqueue):
+    """
+    Reserva a campanha, renderiza uma única vez e agenda os lotes com
+    ``enqueue(dados, ids)`` depois do commit. Tudo na mesma transação: se a
+    renderização falhar, a campanha continua agendada e nenhum lote sai.
+    Retorna False se outro worker já a pegou.
+    """
+    with transaction.atomic():
+        claimed = NewsletterCampaign.objects.filter(pk=campaign.pk, status='scheduled').update(
+            status='sent',
+            sent_at=timezone.now(),
+            total_sent=0,
+        )
+        if not claimed:
+            return False
+        data = render_campaign(campaign)
+        for subscriber_ids in iter_recipient_batches(campaign_recipients()):
+            transaction.on_commit(partial(enqueue, data, subscriber_ids))
+    return True
+
+
+def record_campaign_sent(campaign_id, sent):
+    """Soma os e-mails efetivamente enviados por um lote"""
+    if sent:
+        NewsletterCampaign.objects.filter(pk=campaign_id).update(total_sent=F('total_sent') + sent)
+
+
+def build_weekly_campaign():
+    """Renderiza a newsletter semanal uma vez, com marcadores por assinante"""
+    from core.models import BlogPost
+
+    week_ago = timezone.now() - timedelta(days=7)
+    posts = list(BlogPost.objects.filter(
+        status='published',
+        published_at__gte=week_ago,
+    ).order_by('-published_at')[:3])
+
+    html_content = render_to_string('emails/weekly_newsletter.html', dict(
+        TOKEN_CONTEXT,
+        posts=posts,
+        site_url=settings.SITE_URL,
+    ))
+
+    text_content = f"""
+Olá {NAME_TOKEN},
+
+Confira as novidades desta semana na ASBJJ:
+
+"""
+    for post in posts:
+        text_content += f"- {post.title}\n  {post.excerpt}\n  Leia mais: {settings.SITE_URL}{post.get_absolute_url()}\n\n"
+
+    text_content += f"""
+Para se descadastrar, acesse: {UNSUBSCRIBE_TOKEN}
+
+Atenciosamente,
+Equipe ASBJJ
+    """
+
+    return {
+        'subject': WEEKLY_NEWSLETTER_SUBJECT,
+        'html': html_content,
+        'text': text_content,
+    }
+
+
+def send_batch(campaign, subscriber_ids):
+    """Envia a campanha para um lote de assinantes usando uma única conexão SMTP"""
+    compiled = CompiledCampaign.from_dict(campaign)
+    subscribers = NewsletterSubscriber.objects.filter(
+        pk__in=subscriber_ids,
+        is_active=True,
+    ).only('email', 'first_name', 'last_name', 'unsubscribe_token')
+
+    connection = get_connection()
+    messages = [compiled.build_message(subscriber, connection) for subscriber in subscribers]
+    if not messages:
+        return 0
+    try:
+        sent = connection.send_messages(messages) or 0
+    except Exception:
+        record_emails(connection, failed=len(messages))
+        raise
+    record_emails(connection, sent, len(messages) - sent)
+    return sent
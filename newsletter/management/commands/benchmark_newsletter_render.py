@@ -0,0 +1,53 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from newsletter.mailing import CompiledCampaign, TOKEN_CONTEXT, recipient_values, unsubscribe_url
+from newsletter.models import NewsletterSubscriber
+
+
+class Command(BaseCommand):
+    help = 'Compara a montagem de e-mails da newsletter: render_to_string por assinante x campanha compilada'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=2000, help='Quantidade de destinatários simulados')
+
+    def handle(self, *args, **options):
+        total = options['recipients']
+        # Assinantes em memória: mede apenas a renderização, sem banco nem SMTP
+        subscribers = [
+            NewsletterSubscriber(
+                email=f'aluno{i}@example.com',
+                first_name=f'Aluno {i}',
+                last_name='Teste',
+                unsubscribe_token=uuid.uuid4(),
+            )
+            for i in range(total)
+        ]
+        template_name = 'emails/weekly_newsletter.html'
+        posts = []
+
+        start = time.perf_counter()
+        for subscriber in subscribers:
+            render_to_string(template_name, {
+                'subscriber_name': subscriber.full_name or 'Prezado(a)',
+                'posts': posts,
+                'site_url': settings.SITE_URL,
+                'unsubscribe_url': unsubscribe_url(subscriber),
+            })
+        baseline = time.perf_counter() - start
+
+        start = time.perf_counter()
+        html = render_to_string(template_name, dict(TOKEN_CONTEXT, posts=posts, site_url=settings.SITE_URL))
+        campaign = CompiledCampaign('', html, '')
+        for subscriber in subscribers:
+            campaign.html.render(recipient_values(subscriber, html=True))
+        compiled = time.perf_counter() - start
+
+        self.stdout.write(f'Destinatários: {total}')
+        self.stdout.write(f'render_to_string por assinante: {total / baseline:,.0f} e-mails/s ({baseline:.3f}s)')
+        self.stdout.write(f'Campanha compilada:             {total / compiled:,.0f} e-mails/s ({compiled:.3f}s)')
+        self.stdout.write(self.style.SUCCESS(f'Ganho: {baseline / compiled:.1f}x'))
@@ -49,6 +49,10 @@ class NewsletterSubscriber(models.Model):
         verbose_name = 'Assinante da Newsletter'
         verbose_name_plural = 'Assinantes da Newsletter'
         ordering = ['-subscription_date']
+        indexes = [
+            # Seleção de destinatários das newsletters
+            models.Index(fields=['is_active', 'is_verified', 'frequency'], name='subscriber_active_freq_idx'),
+        ]
 
     def __str__(self):
         if self.first_name and self.last_name:
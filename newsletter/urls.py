@@ -8,4 +8,6 @@ urlpatterns = [
     path('confirmar/<str:token>/', views.NewsletterConfirmView.as_view(), name='confirm'),
     path('descadastrar/<str:token>/', views.NewsletterUnsubscribeView.as_view(), name='unsubscribe'),
     path('preferencias/<str:token>/', views.NewsletterPreferencesView.as_view(), name='preferences'),
+    path('exportar/logs/', views.export_email_logs, name='export_email_logs'),
+    path('api/estatisticas/', views.newsletter_stats_api, name='stats_api'),
 ]
@@ -7,8 +7,12 @@ from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractMonth, ExtractYear
 
 from .models import NewsletterSubscriber, NewsletterCampaign, EmailLog
+from .exports import EMAIL_LOG_EXPORT, filter_email_logs
 from core.forms import NewsletterForm
 
 
@@ -297,46 +301,45 @@ class NewsletterUnsubscribeSuccessView(TemplateView):
     template_name = 'newsletter/unsubscribe_success.html'
 
 
-def newsletter_stats_api(request):
-    """API para estatísticas da newsletter"""
+async def newsletter_stats_api(request):
+    """API para estatísticas da newsletter (assíncrona)"""
     if request.method == 'GET':
         try:
-            # Total de assinantes
-            total_subscribers = NewsletterSubscriber.objects.filter(is_active=True).count()
-            verified_subscribers = NewsletterSubscriber.objects.filter(
-                is_active=True, 
-                is_verified=True
-            ).count()
+            active = NewsletterSubscriber.objects.filter(is_active=True)
+            frequencies = [frequency for frequency, _ in NewsletterSubscriber._meta.get_field('frequency').choices]
             
-            # Assinantes por frequência
-            frequency_stats = {}
-            for frequency, _ in NewsletterSubscriber._meta.get_field('frequency').choices:
-                count = NewsletterSubscriber.objects.filter(
-                    is_active=True,
-                    frequency=frequency
-                ).count()
-                frequency_stats[frequency] = count
+            # Totais e assinantes por frequência em uma única consulta
+            totals = await active.aaggregate(
+                total_subscribers=Count('id'),
+                verified_subscribers=Count('id', filter=Q(is_verified=True)),
+                **{f'frequency_{frequency}': Count('id', filter=Q(frequency=frequency)) for frequency in frequencies},
+            )
+            total_subscribers = totals['total_subscribers']
+            verified_subscribers = totals['verified_subscribers']
+            frequency_stats = {frequency: totals[f'frequency_{frequency}'] for frequency in frequencies}
             
-            # Assinantes por mês (últimos 12 meses)
-            monthly_stats = []
-            for i in range(12):
-                month = timezone.now().replace(day=1) - timezone.timedelta(days=30*i)
-                count = NewsletterSubscriber.objects.filter(
-                    subscription_date__year=month.year,
-                    subscription_date__month=month.month,
-                    is_active=True
-                ).count()
-                monthly_stats.append({
-                    'month': month.strftime('%m/%Y'),
-                    'count': count
-                })
+            # Assinantes por mês (últimos 12 meses), agrupados no banco
+            months = [timezone.now().replace(day=1) - timezone.timedelta(days=30*i) for i in range(12)]
+            per_month = {
+                (row['year'], row['month']): row['count']
+                async for row in active.filter(
+                    subscription_date__gte=months[-1].replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+                ).annotate(
+                    year=ExtractYear('subscription_date'),
+                    month=ExtractMonth('subscription_date'),
+                ).values('year', 'month').annotate(count=Count('id')).order_by()
+            }
+            monthly_stats = [
+                {'month': month.strftime('%m/%Y'), 'count': per_month.get((month.year, month.month), 0)}
+                for month in months
+            ]
             
             monthly_stats.reverse()
             
             # Campanhas recentes
             recent_campaigns = NewsletterCampaign.objects.order_by('-created_at')[:5]
             campaigns_data = []
-            for campaign in recent_campaigns:
+            async for campaign in recent_campaigns:
                 campaigns_data.append({
                     'title': campaign.title,
                     'status': campaign.get_status_display(),
@@ -360,3 +363,9 @@ def newsletter_stats_api(request):
             return JsonResponse({'error': str(e)}, status=500)
     
     return JsonResponse({'error': 'Método não permitido'}, status=405)
+
+
+@staff_member_required
+def export_email_logs(request):
+    """Exportar logs de e-mail em CSV (filtros: status, date_from, date_to)"""
+    return EMAIL_LOG_EXPORT.response(filter_email_logs(EmailLog.objects.all(), request.GET))
@@ -3,6 +3,15 @@ ASGI config for projeto project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Modo assíncrono (views ``async def`` e ORM assíncrono sem prender um worker
+enquanto esperam banco/SMTP)::
+
+    gunicorn projeto.asgi:application -k uvicorn_worker.UvicornWorker --workers 2
+
+ou ``make run-asgi``. Sob ASGI os arquivos estáticos devem ser servidos pelo
+nginx: defina ``WHITENOISE_MIDDLEWARE=False`` (o WhiteNoise só funciona de
+forma síncrona e obrigaria cada requisição a passar por uma thread).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import task_failure, task_postrun, task_prerun
 
 # Configurar o Django antes de importar os apps
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'projeto.settings')
@@ -26,6 +27,14 @@ app.conf.update(
     worker_max_tasks_per_child=1000,
 )
 
+# Métricas das tarefas (duração e falhas por nome) para o /metrics
+from core import metrics  # noqa: E402
+
+task_prerun.connect(metrics.task_started, weak=False)
+task_postrun.connect(metrics.task_finished, weak=False)
+task_failure.connect(metrics.task_failed, weak=False)
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
@@ -14,6 +14,12 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': crontab(hour=9, minute=0, day_of_week=1),
     },
     
+    # Campanhas de newsletter agendadas, a cada 5 minutos
+    'send-scheduled-campaigns': {
+        'task': 'core.tasks.send_scheduled_campaigns',
+        'schedule': crontab(minute='*/5'),
+    },
+    
     # Backup do banco de dados diariamente às 3:00
     'database-backup': {
         'task': 'core.tasks.database_backup',
@@ -32,6 +38,48 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': crontab(hour=10, minute=0, day=1),  # Todo dia 1 do mês às 10:00
     },
     
+    # Fila de e-mails de saída a cada minuto
+    'dispatch-outbound-emails': {
+        'task': 'core.tasks.dispatch_outbound_emails',
+        'schedule': crontab(minute='*'),
+    },
+    
+    # Consolidado financeiro diário (incremental) a cada 5 minutos
+    'update-daily-finance-rollup': {
+        'task': 'core.tasks.update_daily_finance_rollup',
+        'schedule': crontab(minute='*/5'),
+    },
+    
+    # Conferência dos snapshots do painel do aluno, diariamente às 4:00
+    'check-dashboard-snapshots': {
+        'task': 'core.tasks.check_dashboard_snapshots',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    
+    # Ocorrências das aulas das próximas semanas, diariamente às 0:30
+    'generate-class-occurrences': {
+        'task': 'core.tasks.generate_class_occurrences',
+        'schedule': crontab(hour=0, minute=30),
+    },
+    
+    # QR Codes das cobranças PIX criadas nas requisições, a cada minuto
+    'generate-pix-qr-codes': {
+        'task': 'core.tasks.generate_pix_qr_codes',
+        'schedule': crontab(minute='*'),
+    },
+    
+    # Cobranças PIX (e QR Codes) de todos os pagamentos do mês, no dia 1 às 6:00
+    'prepare-monthly-pix-charges': {
+        'task': 'core.tasks.prepare_monthly_pix_charges',
+        'schedule': crontab(hour=6, minute=0, day_of_month=1),
+    },
+    
+    # Versões responsivas das imagens enviadas, a cada minuto
+    'process-image-derivatives': {
+        'task': 'core.tasks.process_image_derivatives',
+        'schedule': crontab(minute='*'),
+    },
+    
     # Estatísticas mensais
     'generate-monthly-stats': {
         'task': 'core.tasks.generate_monthly_stats',
@@ -5,6 +5,7 @@ Configurações otimizadas para produção e desenvolvimento.
 """
 
 import os
+import sys
 from pathlib import Path
 import environ
 
@@ -37,6 +38,7 @@ DJANGO_APPS = [
     'django.contrib.staticfiles',
     'django.contrib.sitemaps',
     'django.contrib.sites',
+    'django.contrib.postgres',  # lookups de trigramas (pg_trgm) na busca de alunos
 ]
 
 THIRD_PARTY_APPS = [
@@ -56,8 +58,10 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 SITE_ID = 1
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -66,6 +70,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Sob ASGI o nginx serve /static/ e o WhiteNoise (somente síncrono) sai da pilha
+if not env.bool('WHITENOISE_MIDDLEWARE', default=True):
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'projeto.urls'
 
 TEMPLATES = [
@@ -120,7 +128,12 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Minifica, empacota (core.staticfiles.STATIC_BUNDLES), otimiza imagens e grava
+# nomes com hash + .br/.gz no collectstatic (Brotli instalado gera os .br)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.staticfiles.OptimizedStaticFilesStorage'},
+}
 
 # Media files
 MEDIA_URL = '/media/'
@@ -136,15 +149,28 @@ LOGIN_REDIRECT_URL = '/'
 
 # Configurações de email
 if env.bool('EMAIL_CONSOLE', default=False) or DEBUG:
-    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+    OUTBOUND_EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 else:
-    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    OUTBOUND_EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Com EMAIL_QUEUE=True os e-mails são apenas gravados na fila (core.OutboundEmail)
+# e enviados pelo despachante (tarefa/comando dispatch_outbound_emails)
+if env.bool('EMAIL_QUEUE', default=False):
+    EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+else:
+    EMAIL_BACKEND = OUTBOUND_EMAIL_BACKEND
+OUTBOUND_EMAIL_BATCH_SIZE = env.int('OUTBOUND_EMAIL_BATCH_SIZE', default=50)
+OUTBOUND_EMAIL_RATE_LIMIT = env.int('OUTBOUND_EMAIL_RATE_LIMIT', default=60)  # e-mails por minuto
+OUTBOUND_EMAIL_MAX_ATTEMPTS = env.int('OUTBOUND_EMAIL_MAX_ATTEMPTS', default=5)
+OUTBOUND_EMAIL_RETRY_DELAY = env.int('OUTBOUND_EMAIL_RETRY_DELAY', default=60)  # segundos, dobra a cada falha
+OUTBOUND_EMAIL_LOCK_TIMEOUT = env.int('OUTBOUND_EMAIL_LOCK_TIMEOUT', default=600)
 EMAIL_HOST = env('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = env.int('EMAIL_PORT', default=587)
 EMAIL_USE_TLS = env.bool('EMAIL_USE_TLS', default=True)
 EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='noreply@asbjj.com.br')
+# Assinantes por lote (uma tarefa e uma conexão SMTP por lote) no envio da newsletter
+NEWSLETTER_BATCH_SIZE = env.int('NEWSLETTER_BATCH_SIZE', default=200)
 
 # Crispy Forms
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
@@ -236,6 +262,55 @@ else:
     }
     SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 
+# Tempo de vida das configurações do site no cache compartilhado (invalidadas por sinal)
+SITE_SETTINGS_CACHE_TIMEOUT = env.int('SITE_SETTINGS_CACHE_TIMEOUT', default=60 * 60 * 24)
+SITE_SETTINGS_LOCAL_TTL = env.int('SITE_SETTINGS_LOCAL_TTL', default=5)  # segundos sem conferir a versão
+
+# Cache de páginas públicas para visitantes anônimos (invalidado por sinal)
+PAGE_CACHE_ENABLED = env.bool('PAGE_CACHE_ENABLED', default=not DEBUG)
+PAGE_CACHE_TIMEOUT = env.int('PAGE_CACHE_TIMEOUT', default=60 * 10)
+
+# Snapshot dos indicadores do dashboard administrativo
+DASHBOARD_STATS_CACHE_TIMEOUT = env.int('DASHBOARD_STATS_CACHE_TIMEOUT', default=60)
+
+# Consolidado financeiro: margem da marca d'água para transações que confirmam atrasadas
+FINANCE_ROLLUP_WATERMARK_OVERLAP = env.int('FINANCE_ROLLUP_WATERMARK_OVERLAP', default=600)  # segundos
+
+# Métricas por requisição (consultas, SQL, templates) e orçamentos de consultas
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+REQUEST_METRICS_ENABLED = env.bool('REQUEST_METRICS_ENABLED', default=True)
+# Server-Timing expõe consultas e tempos: em produção só para os IPs de METRICS_ALLOWED_IPS
+SERVER_TIMING_HEADER = env.bool('SERVER_TIMING_HEADER', default=DEBUG)
+# Estourar o orçamento de @query_budget gera erro (testes/dev) ou apenas aviso no log
+QUERY_BUDGET_STRICT = env.bool('QUERY_BUDGET_STRICT', default=DEBUG or TESTING)
+
+# Testes não dependem do manifest do collectstatic e sempre conferem a versão
+# das configurações do site (o cache é limpo entre os testes)
+if TESTING:
+    STORAGES['staticfiles'] = {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
+    SITE_SETTINGS_LOCAL_TTL = 0
+
+# Versões das imagens enviadas também em AVIF (Pillow >= 11.2 ou pillow-avif-plugin)
+IMAGE_DERIVATIVE_AVIF = env.bool('IMAGE_DERIVATIVE_AVIF', default=False)
+
+# Semanas à frente com ocorrências de aulas geradas (classes.ClassOccurrence)
+CLASS_OCCURRENCE_WEEKS = env.int('CLASS_OCCURRENCE_WEEKS', default=4)
+
+# API de horários das aulas: cache no servidor e max-age para navegador/nginx (segundos)
+SCHEDULES_CACHE_TIMEOUT = env.int('SCHEDULES_CACHE_TIMEOUT', default=60 * 60)
+SCHEDULES_API_MAX_AGE = env.int('SCHEDULES_API_MAX_AGE', default=60)
+
+# /healthz/ready: tempo limite de cada verificação e validade do resultado (segundos)
+HEALTHCHECK_TIMEOUT = env.float('HEALTHCHECK_TIMEOUT', default=2)
+HEALTHCHECK_CACHE_SECONDS = env.float('HEALTHCHECK_CACHE_SECONDS', default=5)
+
+# Métricas do Prometheus em /metrics (PROMETHEUS_MULTIPROC_DIR deve estar no
+# ambiente dos processos do gunicorn/Celery, veja gunicorn.conf.py). Fechado por
+# padrão: exige o token ou um IP da lista (acesso direto ao gunicorn, sem o nginx)
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+METRICS_ALLOWED_IPS = env.list('METRICS_ALLOWED_IPS', default=[])
+METRICS_CELERY_QUEUES = env.list('METRICS_CELERY_QUEUES', default=['celery'])
+
 # Configurações do Celery (desabilitado temporariamente)
 # CELERY_BROKER_URL = env('REDIS_URL', default='redis://127.0.0.1:6379/0')
 # CELERY_RESULT_BACKEND = env('REDIS_URL', default='redis://127.0.0.1:6379/0')
@@ -279,6 +354,14 @@ LOGGING = {
         'handlers': ['console', 'file'],
         'level': LOG_LEVEL,
     },
+    'loggers': {
+        # Uma linha JSON por requisição (core.middleware.RequestMetricsMiddleware)
+        'core.requests': {
+            'handlers': ['file'],
+            'level': env('REQUEST_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
 }
 
 # Configurações do Sentry (apenas em produção)
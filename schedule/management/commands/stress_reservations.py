@@ -0,0 +1,95 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import F
+
+from classes.models import ClassOccurrence
+from schedule.models import TrialClassBooking
+from schedule.reservations import ClassFull, reserve_trial_class
+
+
+class Command(BaseCommand):
+    help = (
+        'Dispara reservas simultâneas em uma ocorrência e verifica que a capacidade '
+        'nunca é ultrapassada e que reenvios da mesma chave não criam reservas. '
+        'Use em um banco de homologação (PostgreSQL).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('occurrence', type=int, help='ID da ClassOccurrence')
+        parser.add_argument('--attempts', type=int, default=300, help='Total de tentativas')
+        parser.add_argument('--workers', type=int, default=50, help='Threads simultâneas')
+        parser.add_argument(
+            '--duplicate-every', type=int, default=5,
+            help='A cada N tentativas, reenvia a chave da anterior (0 desativa)',
+        )
+        parser.add_argument('--keep', action='store_true', help='Não remove as reservas de teste ao final')
+
+    def attempt(self, occurrence, key):
+        try:
+            _, created = reserve_trial_class(
+                occurrence_id=occurrence.pk,
+                idempotency_key=key,
+                first_name='Carga',
+                last_name=key[:12],
+                email=f'{key[:12]}@example.com',
+                phone='0000000000',
+                class_obj_id=occurrence.class_obj_id,
+                preferred_date=occurrence.date,
+            )
+            return 'created' if created else 'duplicate'
+        except ClassFull:
+            return 'full'
+        except Exception as e:
+            return f'erro: {type(e).__name__}: {e}'
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        try:
+            occurrence = ClassOccurrence.objects.get(pk=options['occurrence'])
+        except ClassOccurrence.DoesNotExist:
+            raise CommandError('Ocorrência não encontrada.')
+
+        prefix = f'stress-{uuid.uuid4().hex[:8]}-'
+        keys = []
+        for i in range(options['attempts']):
+            every = options['duplicate_every']
+            if every and i and i % every == 0:
+                keys.append(keys[-1])
+            else:
+                keys.append(f'{prefix}{i}')
+
+        before = occurrence.enrolled
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            outcomes = list(executor.map(lambda key: self.attempt(occurrence, key), keys))
+
+        occurrence.refresh_from_db()
+        bookings = TrialClassBooking.objects.filter(idempotency_key__startswith=prefix)
+        created = outcomes.count('created')
+        summary = {outcome: outcomes.count(outcome) for outcome in set(outcomes)}
+        self.stdout.write(f'Resultados: {summary}')
+        self.stdout.write(
+            f'Ocupação: {before} -> {occurrence.enrolled} de {occurrence.capacity}; '
+            f'reservas criadas: {bookings.count()}'
+        )
+
+        problems = []
+        if occurrence.enrolled > occurrence.capacity:
+            problems.append('capacidade ultrapassada')
+        if occurrence.enrolled - before != created:
+            problems.append('contador diferente do número de reservas criadas')
+        if bookings.count() != created:
+            problems.append('reservas gravadas diferentes das confirmadas')
+        if bookings.values('idempotency_key').distinct().count() != bookings.count():
+            problems.append('chave de idempotência duplicada')
+
+        if not options['keep']:
+            removed = bookings.delete()[0]
+            ClassOccurrence.objects.filter(pk=occurrence.pk).update(enrolled=F('enrolled') - removed)
+
+        if problems:
+            raise CommandError('Invariantes violadas: ' + ', '.join(problems))
+        self.stdout.write(self.style.SUCCESS('Invariantes mantidas.'))
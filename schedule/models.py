@@ -1,7 +1,7 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
-from classes.models import Class, ClassSchedule
+from classes.models import Class, ClassOccurrence, ClassSchedule
 
 
 class TrialClassBooking(models.Model):
@@ -47,11 +47,23 @@ class TrialClassBooking(models.Model):
     )
     preferred_date = models.DateField('Data Preferida')
     preferred_time = models.TimeField('Horário Preferido', null=True, blank=True)
+    occurrence = models.ForeignKey(
+        ClassOccurrence,
+        on_delete=models.SET_NULL,
+        related_name='trial_bookings',
+        verbose_name='Aula Reservada',
+        null=True,
+        blank=True
+    )
+    # Chave do formulário: reenvios (duplo clique, F5) não criam outra reserva
+    idempotency_key = models.CharField('Chave de Idempotência', max_length=64, unique=True, null=True, blank=True)
     
     # Status e observações
     status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='pending')
     notes = models.TextField('Observações', blank=True)
     admin_notes = models.TextField('Observações Administrativas', blank=True)
+    ip_address = models.GenericIPAddressField('Endereço IP', null=True, blank=True)
+    user_agent = models.TextField('User Agent', blank=True)
     
     # Metadados
     created_at = models.DateTimeField('Criado em', auto_now_add=True)
@@ -126,6 +138,7 @@ class RegularBooking(models.Model):
     )
     
     # Metadados
+    idempotency_key = models.CharField('Chave de Idempotência', max_length=64, unique=True, null=True, blank=True)
     created_at = models.DateTimeField('Criado em', auto_now_add=True)
     updated_at = models.DateTimeField('Atualizado em', auto_now=True)
 
@@ -0,0 +1,115 @@
+"""
+Reserva de vagas com controle de concorrência.
+
+A vaga é ocupada por um ``UPDATE ... SET enrolled = enrolled + 1 WHERE
+enrolled < capacity`` na própria ocorrência: o banco serializa as escritas na
+linha e nunca passa da capacidade (há ainda a constraint
+``occurrence_enrolled_lte_capacity``). A reserva e o contador são gravados na
+mesma transação; se a criação falhar, a vaga volta.
+
+Cada envio de formulário traz uma chave de idempotência (única na tabela):
+reenvios da mesma chave devolvem a reserva já existente sem ocupar outra vaga.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from classes import timetable
+from classes.models import ClassOccurrence
+from classes.occurrences import decrement, regular_booking_occurrences
+
+from .models import RegularBooking, TrialClassBooking
+
+
+class ReservationError(Exception):
+    pass
+
+
+class ClassFull(ReservationError):
+    """Não há vaga na aula (ou ela foi cancelada)"""
+
+
+def _existing(model, idempotency_key):
+    if not idempotency_key:
+        return None
+    return model.objects.filter(idempotency_key=idempotency_key).first()
+
+
+def reserve_trial_class(occurrence_id=None, idempotency_key=None, **fields):
+    """
+    Cria um agendamento experimental, ocupando uma vaga em ``occurrence_id``
+    quando informado. Retorna ``(agendamento, criado)``; ``criado`` é False
+    para reenvios da mesma chave. Levanta ``ClassFull`` sem vaga.
+    """
+    existing = _existing(TrialClassBooking, idempotency_key)
+    if existing is not None:
+        return existing, False
+
+    try:
+        with transaction.atomic():
+            if occurrence_id is not None:
+                occurrence = ClassOccurrence.objects.filter(pk=occurrence_id, is_cancelled=False)
+                if fields.get('class_obj_id'):
+                    occurrence = occurrence.filter(class_obj_id=fields['class_obj_id'])
+                taken = occurrence.filter(enrolled__lt=F('capacity')).update(enrolled=F('enrolled') + 1)
+                if not taken:
+                    raise ClassFull('Não há vagas para esta aula.')
+            booking = TrialClassBooking.objects.create(
+                occurrence_id=occurrence_id,
+                idempotency_key=idempotency_key or None,
+                **fields,
+            )
+    except IntegrityError:
+        # Reenvio simultâneo com a mesma chave: a transação (e a vaga) foi desfeita
+        existing = _existing(TrialClassBooking, idempotency_key)
+        if existing is None:
+            raise
+        return existing, False
+
+    if occurrence_id is not None:
+        transaction.on_commit(timetable.invalidate)
+    return booking, True
+
+
+def cancel_trial_booking(booking):
+    """Cancela o agendamento e devolve a vaga (uma única vez)"""
+    with transaction.atomic():
+        cancelled = TrialClassBooking.objects.filter(pk=booking.pk).exclude(status='cancelled').update(
+            status='cancelled', updated_at=timezone.now(),
+        )
+        if cancelled and booking.occurrence_id:
+            decrement(ClassOccurrence.objects.filter(pk=booking.occurrence_id))
+    booking.status = 'cancelled'
+    return bool(cancelled)
+
+
+def enroll_regular(idempotency_key=None, **fields):
+    """
+    Cria uma matrícula regular ativa se houver vaga em todas as ocorrências
+    futuras da aula. As ocorrências ficam travadas (``select_for_update``,
+    em ordem de id) até o fim da transação; o sinal da matrícula ocupa as vagas
+    e, se alguma estiver lotada, a matrícula é desfeita.
+    """
+    existing = _existing(RegularBooking, idempotency_key)
+    if existing is not None:
+        return existing, False
+
+    booking = RegularBooking(idempotency_key=idempotency_key or None, **fields)
+    try:
+        with transaction.atomic():
+            occurrences = (
+                regular_booking_occurrences(booking).filter(is_cancelled=False)
+                .select_for_update().order_by('pk')
+            )
+            if any(occurrence.enrolled >= occurrence.capacity for occurrence in occurrences):
+                raise ClassFull('A turma está lotada em pelo menos uma das próximas aulas.')
+            booking.save()
+            if getattr(booking, 'full_occurrences', None):
+                raise ClassFull('A turma está lotada em pelo menos uma das próximas aulas.')
+    except IntegrityError:
+        existing = _existing(RegularBooking, idempotency_key)
+        if existing is None:
+            raise
+        return existing, False
+    return booking, True
@@ -0,0 +1,161 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time as clock
+from unittest import skipUnless
+
+from django.apps import apps
+from django.db import OperationalError, connection
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+
+@skipUnless(apps.is_installed('schedule') and apps.is_installed('classes'), 'Apps de aulas e agenda inativos')
+class ReservationInvariantsTestCase(TransactionTestCase):
+    """Invariantes das reservas sob concorrência (o mesmo que o comando stress_reservations verifica)"""
+
+    CAPACITY = 5
+
+    def setUp(self):
+        from classes.models import Class, ClassCategory, ClassOccurrence, ClassSchedule
+
+        category = ClassCategory.objects.create(name='Jiu-Jitsu', slug='jiu-jitsu')
+        self.class_obj = Class.objects.create(
+            category=category, name='Iniciantes', slug='iniciantes',
+            description='Aula', short_description='Aula',
+        )
+        # O sinal do horário gera as ocorrências das próximas semanas
+        schedule = ClassSchedule.objects.create(
+            class_obj=self.class_obj, day_of_week=0,
+            start_time=clock(19, 0), end_time=clock(20, 0), max_capacity=self.CAPACITY,
+        )
+        self.occurrence = ClassOccurrence.objects.filter(schedule=schedule).first()
+
+    def reserve(self, key):
+        from schedule.reservations import ClassFull, reserve_trial_class
+
+        try:
+            # SQLite recusa escritas simultâneas ("database is locked"): tenta de novo
+            for _ in range(50):
+                try:
+                    _, created = reserve_trial_class(
+                        occurrence_id=self.occurrence.pk,
+                        idempotency_key=key,
+                        first_name='Teste',
+                        last_name=key[:12],
+                        email=f'{key[:12]}@example.com',
+                        phone='0000000000',
+                        class_obj_id=self.class_obj.pk,
+                        preferred_date=self.occurrence.date,
+                    )
+                    return 'created' if created else 'duplicate'
+                except ClassFull:
+                    return 'full'
+                except OperationalError:
+                    time.sleep(0.01)
+            return 'locked'
+        finally:
+            connection.close()
+
+    def run_parallel(self, keys, workers=10):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.reserve, keys))
+
+    def test_capacity_is_never_exceeded(self):
+        """Teste de que reservas simultâneas nunca passam da capacidade"""
+        from schedule.models import TrialClassBooking
+
+        outcomes = self.run_parallel([uuid.uuid4().hex for _ in range(4 * self.CAPACITY)])
+        self.occurrence.refresh_from_db()
+
+        self.assertNotIn('locked', outcomes)
+        self.assertEqual(outcomes.count('created'), self.CAPACITY)
+        self.assertLessEqual(self.occurrence.enrolled, self.occurrence.capacity)
+        self.assertEqual(self.occurrence.enrolled, TrialClassBooking.objects.count())
+
+    def test_same_key_creates_one_booking(self):
+        """Teste de que envios simultâneos da mesma chave criam uma única reserva e ocupam uma vaga"""
+        from schedule.models import TrialClassBooking
+
+        key = uuid.uuid4().hex
+        outcomes = self.run_parallel([key] * 8)
+        self.occurrence.refresh_from_db()
+
+        self.assertEqual(outcomes.count('created'), 1)
+        self.assertEqual(outcomes.count('duplicate'), 7)
+        self.assertEqual(TrialClassBooking.objects.filter(idempotency_key=key).count(), 1)
+        self.assertEqual(self.occurrence.enrolled, 1)
+
+    def test_double_cancel_releases_seat_once(self):
+        """Teste de que cancelar duas vezes (serviço e admin) devolve a vaga uma única vez"""
+        from schedule.models import TrialClassBooking
+        from schedule.reservations import cancel_trial_booking
+
+        self.run_parallel([uuid.uuid4().hex for _ in range(2)])
+        booking = TrialClassBooking.objects.first()
+
+        self.assertTrue(cancel_trial_booking(booking))
+        self.assertFalse(cancel_trial_booking(TrialClassBooking.objects.get(pk=booking.pk)))
+        booking = TrialClassBooking.objects.get(pk=booking.pk)
+        booking.status = 'cancelled'
+        booking.save()
+
+        self.occurrence.refresh_from_db()
+        self.assertEqual(self.occurrence.enrolled, 1)
+
+
+@skipUnless(apps.is_installed('schedule') and apps.is_installed('classes'), 'Apps de aulas e agenda inativos')
+class RegularBookingOccupancyTestCase(TestCase):
+    """Ocupação das ocorrências pelas matrículas regulares"""
+
+    def setUp(self):
+        from classes.models import Class, ClassCategory, ClassOccurrence, ClassSchedule
+
+        category = ClassCategory.objects.create(name='Jiu-Jitsu', slug='jiu-jitsu')
+        self.class_obj = Class.objects.create(
+            category=category, name='Iniciantes', slug='iniciantes',
+            description='Aula', short_description='Aula',
+        )
+        schedule = ClassSchedule.objects.create(
+            class_obj=self.class_obj, day_of_week=0,
+            start_time=clock(19, 0), end_time=clock(20, 0), max_capacity=2,
+        )
+        self.occurrences = ClassOccurrence.objects.filter(schedule=schedule).order_by('date')
+        self.user = User.objects.create_user(username='aluno', password='senha-teste-123')
+
+    def create_booking(self):
+        from schedule.models import RegularBooking
+
+        return RegularBooking.objects.create(
+            user=self.user, class_obj=self.class_obj,
+            start_date=timezone.localdate(), monthly_fee='150.00',
+        )
+
+    def test_full_occurrences_are_reported(self):
+        """Teste de que a matrícula ativada numa aula lotada informa as ocorrências sem vaga"""
+        full = self.occurrences.first()
+        self.occurrences.filter(pk=full.pk).update(enrolled=F('capacity'))
+
+        with self.assertLogs('classes.occurrences', 'WARNING'):
+            booking = self.create_booking()
+
+        self.assertEqual(booking.full_occurrences, [full.pk])
+        enrolled = dict(self.occurrences.values_list('pk', 'enrolled'))
+        self.assertEqual(enrolled.pop(full.pk), 2)
+        self.assertEqual(set(enrolled.values()), {1})
+
+    def test_enroll_regular_rejects_full_class(self):
+        """Teste de que enroll_regular não cria a matrícula se alguma aula estiver lotada"""
+        from schedule.models import RegularBooking
+        from schedule.reservations import ClassFull, enroll_regular
+
+        self.assertEqual(self.create_booking().full_occurrences, [])
+        self.create_booking()
+        with self.assertRaises(ClassFull):
+            enroll_regular(
+                user=self.user, class_obj=self.class_obj,
+                start_date=timezone.localdate(), monthly_fee='150.00',
+            )
+        self.assertEqual(RegularBooking.objects.count(), 2)
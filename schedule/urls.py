@@ -9,4 +9,5 @@ urlpatterns = [
     path('cancelar/<int:booking_id>/', views.CancelBookingView.as_view(), name='cancel_booking'),
     path('presenca/', views.AttendanceListView.as_view(), name='attendance_list'),
     path('pagamentos/', views.PaymentListView.as_view(), name='payment_list'),
+    path('api/estatisticas/', views.booking_stats_api, name='booking_stats_api'),
 ]
@@ -3,13 +3,14 @@ from django.views.generic import ListView, DetailView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.http import JsonResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
 
 from .models import TrialClassBooking, RegularBooking, Attendance, Payment
 from classes.models import Class, ClassSchedule
+from core.pagination import KeysetPaginationMixin
 
 
 class MyBookingsView(LoginRequiredMixin, ListView):
@@ -141,12 +142,13 @@ Cancelado por: {self.request.user.get_full_name()}
         )
 
 
-class AttendanceListView(LoginRequiredMixin, ListView):
+class AttendanceListView(KeysetPaginationMixin, LoginRequiredMixin, ListView):
     """Lista de presenças do usuário"""
     model = Attendance
     template_name = 'schedule/attendance_list.html'
     context_object_name = 'attendances'
     paginate_by = 20
+    keyset_ordering = ['-date', '-id']
 
     def get_queryset(self):
         return Attendance.objects.filter(
@@ -154,12 +156,13 @@ class AttendanceListView(LoginRequiredMixin, ListView):
         ).select_related('booking', 'schedule').order_by('-date')
 
 
-class PaymentListView(LoginRequiredMixin, ListView):
+class PaymentListView(KeysetPaginationMixin, LoginRequiredMixin, ListView):
     """Lista de pagamentos do usuário"""
     model = Payment
     template_name = 'schedule/payment_list.html'
     context_object_name = 'payments'
     paginate_by = 20
+    keyset_ordering = ['-payment_date', '-id']
 
     def get_queryset(self):
         return Payment.objects.filter(
@@ -167,29 +170,27 @@ class PaymentListView(LoginRequiredMixin, ListView):
         ).select_related('booking').order_by('-payment_date')
 
 
-def booking_stats_api(request):
-    """API para estatísticas de agendamentos"""
-    if not request.user.is_authenticated:
+async def booking_stats_api(request):
+    """API para estatísticas de agendamentos (assíncrona)"""
+    user = await request.auser()
+    if not user.is_authenticated:
         return JsonResponse({'error': 'Não autorizado'}, status=401)
     
     if request.method == 'GET':
         try:
             # Agendamentos ativos
-            active_bookings = RegularBooking.objects.filter(
-                user=request.user,
+            active_bookings = await RegularBooking.objects.filter(
+                user=user,
                 status='active'
-            ).count()
+            ).acount()
             
-            # Total de aulas assistidas
-            total_attended = Attendance.objects.filter(
-                booking__user=request.user,
-                attended=True
-            ).count()
-            
-            # Taxa de presença
-            total_classes = Attendance.objects.filter(
-                booking__user=request.user
-            ).count()
+            # Total de aulas e aulas assistidas em uma consulta
+            attendance = await Attendance.objects.filter(booking__user=user).aaggregate(
+                total_classes=Count('id'),
+                total_attended=Count('id', filter=Q(attended=True)),
+            )
+            total_attended = attendance['total_attended']
+            total_classes = attendance['total_classes']
             
             attendance_rate = 0
             if total_classes > 0:
@@ -200,13 +201,15 @@ def booking_stats_api(request):
             next_week = today + timedelta(days=7)
             
             upcoming_classes = Attendance.objects.filter(
-                booking__user=request.user,
+                booking__user=user,
                 date__gte=today,
                 date__lte=next_week
-            ).select_related('booking', 'schedule').order_by('date', 'schedule__start_time')
+            ).select_related(
+                'booking__class_obj', 'schedule__instructor'
+            ).order_by('date', 'schedule__start_time')
             
             upcoming_data = []
-            for attendance in upcoming_classes:
+            async for attendance in upcoming_classes:
                 upcoming_data.append({
                     'date': attendance.date.strftime('%d/%m/%Y'),
                     'time': attendance.schedule.start_time.strftime('%H:%M'),
@@ -217,12 +220,12 @@ def booking_stats_api(request):
             
             # Pagamentos pendentes
             pending_payments = Payment.objects.filter(
-                booking__user=request.user,
+                booking__user=user,
                 payment_date__isnull=True
-            ).select_related('booking').order_by('due_date')
+            ).select_related('booking__class_obj').order_by('due_date')
             
             pending_data = []
-            for payment in pending_payments:
+            async for payment in pending_payments:
                 pending_data.append({
                     'id': payment.id,
                     'amount': float(payment.amount),
@@ -1,21 +1,14 @@
-const CACHE_NAME = 'asbjj-v1';
-const URLS_TO_CACHE = [
-  '/',
-  '/static/css/style.css',
-  '/static/js/main.js',
-  '/static/img/logo.png'
-];
-
-self.addEventListener('install', (event) => {
+/*
+ * Service worker antigo (escopo /static/js/). O atual é gerado por
+ * "manage.py build_service_worker" e servido em /sw.js; este só limpa os
+ * caches da versão anterior e se remove.
+ */
+self.addEventListener('install', () => self.skipWaiting());
+
+self.addEventListener('activate', (event) => {
   event.waitUntil(
-    caches.open(CACHE_NAME).then((cache) => cache.addAll(URLS_TO_CACHE))
-  );
-});
-
-self.addEventListener('fetch', (event) => {
-  event.respondWith(
-    caches.match(event.request).then((response) => response || fetch(event.request))
+    caches.keys()
+      .then((keys) => Promise.all(keys.filter((key) => key.startsWith('asbjj-v')).map((key) => caches.delete(key))))
+      .then(() => self.registration.unregister())
   );
 });
-
-
@@ -6,9 +6,11 @@ from django.db.models import Count, Sum, Avg
 from django.utils import timezone
 from .models import (
     Student, PaymentPlan, StudentSubscription, 
-    Payment, PaymentReceipt, Attendance
+    Payment, PaymentReceipt, Attendance, StudentDashboardSnapshot
 )
-from .payment_models import PIXPayment, PaymentNotification, PaymentReport
+from .payment_models import PIXPayment, PaymentNotification, PaymentReport, DailyFinanceRollup
+from .dashboard_stats import DashboardStats
+from .exports import STUDENT_EXPORT, PAYMENT_EXPORT, ATTENDANCE_EXPORT
 
 
 @admin.register(Student)
@@ -17,6 +19,7 @@ class StudentAdmin(admin.ModelAdmin):
     list_filter = ['belt_color', 'is_active', 'enrollment_date', 'city', 'state']
     search_fields = ['first_name', 'last_name', 'email', 'cpf', 'phone']
     readonly_fields = ['created_at', 'updated_at', 'age']
+    actions = [STUDENT_EXPORT.admin_action()]
     
     fieldsets = (
         ('Informações Pessoais', {
@@ -70,6 +73,7 @@ class PaymentAdmin(admin.ModelAdmin):
     search_fields = ['student__first_name', 'student__last_name', 'student__email', 'payment_id']
     readonly_fields = ['payment_id', 'final_amount', 'created_at', 'updated_at']
     date_hierarchy = 'due_date'
+    actions = [PAYMENT_EXPORT.admin_action()]
     
     fieldsets = (
         ('Informações do Pagamento', {
@@ -108,6 +112,7 @@ class AttendanceAdmin(admin.ModelAdmin):
     list_filter = ['status', 'class_date', 'instructor']
     search_fields = ['student__first_name', 'student__last_name']
     date_hierarchy = 'class_date'
+    actions = [ATTENDANCE_EXPORT.admin_action()]
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('student', 'instructor')
@@ -146,6 +151,22 @@ class PaymentReportAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('created_by')
 
 
+@admin.register(DailyFinanceRollup)
+class DailyFinanceRollupAdmin(admin.ModelAdmin):
+    list_display = ['day', 'payment_method', 'due_count', 'due_paid_count', 'due_pending_count', 'paid_count', 'revenue', 'discount_total']
+    list_filter = ['payment_method', 'is_stale']
+    date_hierarchy = 'day'
+    readonly_fields = ['source_updated_at', 'refreshed_at']
+
+
+@admin.register(StudentDashboardSnapshot)
+class StudentDashboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['student', 'updated_at']
+    search_fields = ['student__first_name', 'student__last_name', 'student__email']
+    readonly_fields = ['student', 'data', 'updated_at']
+    list_select_related = ['student']
+
+
 # Personalização do Admin Site
 class CustomAdminSite(admin.AdminSite):
     site_header = "ASBJJ - Administração"
@@ -172,45 +193,8 @@ class CustomAdminSite(admin.AdminSite):
         """
         extra_context = extra_context or {}
         
-        # Estatísticas gerais
-        total_students = Student.objects.count()
-        active_students = Student.objects.filter(is_active=True).count()
-        total_payments = Payment.objects.count()
-        paid_payments = Payment.objects.filter(payment_status='paid').count()
-        
-        # Pagamentos do mês atual
-        current_month = timezone.now().date().replace(day=1)
-        monthly_payments = Payment.objects.filter(
-            paid_date__gte=current_month,
-            payment_status='paid'
-        ).aggregate(
-            total_amount=Sum('final_amount'),
-            count=Count('id')
-        )
-        
-        # Pagamentos pendentes
-        pending_payments = Payment.objects.filter(
-            payment_status='pending',
-            due_date__lt=timezone.now().date()
-        ).count()
-        
-        # Assinaturas ativas
-        active_subscriptions = StudentSubscription.objects.filter(
-            status='active',
-            start_date__lte=timezone.now().date(),
-            end_date__gte=timezone.now().date()
-        ).count()
-        
-        extra_context.update({
-            'total_students': total_students,
-            'active_students': active_students,
-            'total_payments': total_payments,
-            'paid_payments': paid_payments,
-            'monthly_revenue': monthly_payments['total_amount'] or 0,
-            'monthly_payments_count': monthly_payments['count'] or 0,
-            'pending_payments': pending_payments,
-            'active_subscriptions': active_subscriptions,
-        })
+        # Estatísticas gerais (snapshot compartilhado com o dashboard)
+        extra_context.update(DashboardStats.snapshot())
         
         return super().index(request, extra_context)
 
@@ -227,4 +211,5 @@ custom_admin_site.register(PaymentReceipt, PaymentReceiptAdmin)
 custom_admin_site.register(Attendance, AttendanceAdmin)
 custom_admin_site.register(PIXPayment, PIXPaymentAdmin)
 custom_admin_site.register(PaymentNotification, PaymentNotificationAdmin)
-custom_admin_site.register(PaymentReport, PaymentReportAdmin)
\ No newline at end of file
+custom_admin_site.register(PaymentReport, PaymentReportAdmin)
+custom_admin_site.register(DailyFinanceRollup, DailyFinanceRollupAdmin)
\ No newline at end of file
@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, Exists, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.metrics import record_cache
+
+from .models import Student, Payment
+from .payment_models import DailyFinanceRollup
+
+
+DASHBOARD_STATS_CACHE_KEY = 'students:dashboard_stats'
+
+
+class DashboardStats:
+    """
+    Indicadores do painel administrativo.
+
+    Os totais vêm de duas consultas com agregação condicional (uma sobre
+    alunos/assinaturas e outra sobre pagamentos) e a receita do mês vem do
+    consolidado diário; as listas usam uma consulta cada, com o valor
+    pendente por aluno calculado em subconsulta.
+    Usado por ``payment_views.dashboard_view`` e ``CustomAdminSite.index``.
+    """
+
+    def __init__(self, today=None):
+        self.today = today or timezone.localdate()
+        self.month_start = self.today.replace(day=1)
+
+    @classmethod
+    def snapshot(cls):
+        """Retorna os indicadores a partir do cache de curta duração"""
+        timeout = getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 60)
+        stats = cache.get(DASHBOARD_STATS_CACHE_KEY)
+        record_cache('dashboard_stats', stats is not None)
+        if stats is None:
+            stats = cls().as_dict()
+            cache.set(DASHBOARD_STATS_CACHE_KEY, stats, timeout)
+        return stats
+
+    @classmethod
+    def invalidate(cls):
+        cache.delete(DASHBOARD_STATS_CACHE_KEY)
+
+    def student_totals(self):
+        """Totais de alunos e assinaturas ativas em uma única consulta"""
+        return Student.objects.aggregate(
+            total_students=Count('id', distinct=True),
+            active_students=Count('id', filter=Q(is_active=True), distinct=True),
+            active_subscriptions=Count(
+                'subscriptions',
+                filter=Q(
+                    subscriptions__status='active',
+                    subscriptions__start_date__lte=self.today,
+                    subscriptions__end_date__gte=self.today,
+                ),
+                distinct=True,
+            ),
+        )
+
+    def payment_totals(self):
+        """Totais de pagamentos em uma única consulta"""
+        return Payment.objects.aggregate(
+            total_payments=Count('id'),
+            paid_payments=Count('id', filter=Q(payment_status='paid')),
+            pending_payments=Count('id', filter=Q(payment_status='pending', due_date__lt=self.today)),
+        )
+
+    def monthly_totals(self):
+        """Receita do mês lida do consolidado diário (atualizado pela tarefa periódica)"""
+        revenue, count = DailyFinanceRollup.revenue_since(self.month_start)
+        return {'monthly_revenue': revenue, 'monthly_payments_count': count}
+
+    def recent_payments(self, limit=10):
+        return list(Payment.objects.select_related('student').order_by('-created_at')[:limit])
+
+    def overdue_students(self, limit=5):
+        """Alunos com pagamentos vencidos, já anotados com o valor pendente"""
+        overdue = Payment.objects.filter(
+            student=OuterRef('pk'),
+            payment_status='pending',
+            due_date__lt=self.today,
+        )
+        pending_amount = (
+            Payment.objects.filter(student=OuterRef('pk'), payment_status='pending')
+            .values('student')
+            .annotate(total=Sum('final_amount'))
+            .values('total')
+        )
+        amount_field = DecimalField(max_digits=12, decimal_places=2)
+        return list(
+            Student.objects.filter(Exists(overdue))
+            .annotate(pending_amount=Coalesce(
+                Subquery(pending_amount, output_field=amount_field),
+                Value(Decimal('0')),
+                output_field=amount_field,
+            ))[:limit]
+        )
+
+    def as_dict(self):
+        data = {}
+        data.update(self.student_totals())
+        data.update(self.payment_totals())
+        data.update(self.monthly_totals())
+        data['recent_payments'] = self.recent_payments()
+        data['overdue_students'] = self.overdue_students()
+        return data
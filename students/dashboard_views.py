@@ -1,3 +1,4 @@
+from django.apps import apps
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
@@ -9,51 +10,30 @@ from django.contrib.auth import logout
 from datetime import datetime, timedelta
 from django.views.decorators.csrf import csrf_protect
 
-from .models import Student, Payment, PaymentPlan, StudentSubscription, Attendance
+from core.instrumentation import query_budget
+
+from .models import Student, Payment, PaymentPlan, StudentSubscription, Attendance, StudentDashboardSnapshot
 from .user_models import UserProfile
 from .decorators import admin_required, student_required, instructor_required
 
 
 @login_required
 @student_required
+@query_budget(10)  # sem snapshot: monta e grava na hora (5 com ele)
 def student_dashboard_view(request):
     """Dashboard do aluno"""
     try:
         profile = request.user.student_profile
-        student = profile.student_profile
-        
-        # Pagamentos do aluno
-        payments = student.payments.all().order_by('-created_at')
-        pending_payments = payments.filter(payment_status='pending')
-        paid_payments = payments.filter(payment_status='paid')
-        
-        # Assinatura atual
-        current_subscription = student.subscriptions.filter(
-            status='active',
-            start_date__lte=timezone.now().date(),
-            end_date__gte=timezone.now().date()
-        ).first()
-        
-        # Presenças recentes
-        recent_attendances = student.attendances.all().order_by('-class_date')[:10]
         
-        # Próximas aulas (simulado - você pode criar um modelo de aulas)
-        today = timezone.now().date()
-        next_classes = [
-            {'date': today + timedelta(days=1), 'time': '19:00', 'instructor': 'Prof. Alexandre'},
-            {'date': today + timedelta(days=3), 'time': '19:00', 'instructor': 'Prof. Alexandre'},
-            {'date': today + timedelta(days=5), 'time': '19:00', 'instructor': 'Prof. Alexandre'},
-        ]
+        # Painel já montado (StudentDashboardSnapshot): uma consulta pela chave primária
+        snapshot = StudentDashboardSnapshot.for_student(profile.student_profile_id)
+        context = snapshot.get_context()
         
-        context = {
-            'student': student,
-            'payments': payments,
-            'pending_payments': pending_payments,
-            'paid_payments': paid_payments,
-            'current_subscription': current_subscription,
-            'recent_attendances': recent_attendances,
-            'next_classes': next_classes,
-        }
+        # Próximas aulas (ocorrências pré-geradas, quando o app de aulas está ativo)
+        context['next_classes'] = []
+        if apps.is_installed('classes'):
+            from classes.occurrences import next_classes_for
+            context['next_classes'] = next_classes_for(request.user)
         
         return render(request, 'students/student_dashboard.html', context)
         
@@ -237,4 +217,7 @@ def logout_view(request):
     
     logout(request)
     messages.success(request, 'Logout realizado com sucesso!')
-    return redirect('/')
+    response = redirect('/')
+    # Remove as páginas do aluno do cache HTTP do navegador (o service worker não as guarda)
+    response['Clear-Site-Data'] = '"cache"'
+    return response
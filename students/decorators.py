@@ -28,7 +28,7 @@ def student_required(view_func):
         
         try:
             profile = request.user.student_profile
-            if not profile.is_student or not profile.student_profile:
+            if not profile.is_student or not profile.student_profile_id:
                 messages.error(request, 'Acesso negado. Você não é um aluno.')
                 return redirect('login')
         except:
@@ -0,0 +1,117 @@
+"""
+Filtros das listagens e exportadores CSV de alunos, pagamentos e presenças.
+
+Os filtros recebem os mesmos parâmetros GET das telas de listagem
+(``status``, ``method``, ``date_from``, ``date_to``...), para que a
+exportação traga exatamente o que a tela mostra.
+"""
+
+from core.exports import CSVExporter
+
+from .lookup import match_students
+
+
+def filter_students(queryset, params):
+    search = params.get('search', '')
+    belt_filter = params.get('belt', '')
+    status_filter = params.get('status', '')
+    date_from = params.get('date_from', '')
+    date_to = params.get('date_to', '')
+
+    if search:
+        queryset = match_students(queryset, search)
+
+    if belt_filter:
+        queryset = queryset.filter(belt_color=belt_filter)
+
+    if status_filter == 'active':
+        queryset = queryset.filter(is_active=True)
+    elif status_filter == 'inactive':
+        queryset = queryset.filter(is_active=False)
+
+    if date_from:
+        queryset = queryset.filter(enrollment_date__gte=date_from)
+
+    if date_to:
+        queryset = queryset.filter(enrollment_date__lte=date_to)
+
+    return queryset
+
+
+def filter_payments(queryset, params):
+    status_filter = params.get('status', '')
+    method_filter = params.get('method', '')
+    date_from = params.get('date_from', '')
+    date_to = params.get('date_to', '')
+
+    if status_filter:
+        queryset = queryset.filter(payment_status=status_filter)
+
+    if method_filter:
+        queryset = queryset.filter(payment_method=method_filter)
+
+    if date_from:
+        queryset = queryset.filter(due_date__gte=date_from)
+
+    if date_to:
+        queryset = queryset.filter(due_date__lte=date_to)
+
+    return queryset
+
+
+def filter_attendances(queryset, params):
+    status_filter = params.get('status', '')
+    date_from = params.get('date_from', '')
+    date_to = params.get('date_to', '')
+
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    if date_from:
+        queryset = queryset.filter(class_date__gte=date_from)
+
+    if date_to:
+        queryset = queryset.filter(class_date__lte=date_to)
+
+    return queryset
+
+
+STUDENT_EXPORT = CSVExporter([
+    ('ID', 'id'),
+    ('Nome', 'first_name'),
+    ('Sobrenome', 'last_name'),
+    ('E-mail', 'email'),
+    ('Telefone', 'phone'),
+    ('CPF', 'cpf'),
+    ('Cidade', 'city'),
+    ('Estado', 'state'),
+    ('Faixa', 'belt_color'),
+    ('Data de Matrícula', 'enrollment_date'),
+    ('Data de Nascimento', 'birth_date'),
+    ('Ativo', 'is_active'),
+], 'alunos')
+
+PAYMENT_EXPORT = CSVExporter([
+    ('ID do Pagamento', 'payment_id'),
+    ('Aluno', 'student__first_name'),
+    ('Sobrenome', 'student__last_name'),
+    ('E-mail', 'student__email'),
+    ('Valor', 'amount'),
+    ('Desconto', 'discount_amount'),
+    ('Valor Final', 'final_amount'),
+    ('Método', 'payment_method'),
+    ('Status', 'payment_status'),
+    ('Vencimento', 'due_date'),
+    ('Data do Pagamento', 'paid_date'),
+    ('Criado em', 'created_at'),
+], 'pagamentos')
+
+ATTENDANCE_EXPORT = CSVExporter([
+    ('Aluno', 'student__first_name'),
+    ('Sobrenome', 'student__last_name'),
+    ('Data da Aula', 'class_date'),
+    ('Horário', 'class_time'),
+    ('Instrutor', 'instructor__username'),
+    ('Status', 'status'),
+    ('Observações', 'notes'),
+], 'presencas')
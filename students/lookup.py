@@ -0,0 +1,97 @@
+"""
+Busca aproximada de alunos (recepção/autocomplete).
+
+O nome e o e-mail são guardados normalizados em ``Student.search_text``
+(minúsculas, sem acentos) e telefone/CPF apenas com dígitos. No PostgreSQL
+a busca usa ``pg_trgm`` (operador ``%>`` e ``LIKE`` servidos por índices GIN)
+e ordena por ``word_similarity``, tolerando erros de digitação. Em outros
+bancos os candidatos vêm de ``LIKE`` nos campos normalizados e a ordenação
+é feita em Python. A aproximação vale só para o autocomplete: o filtro das
+listas e exportações (``match_students``) exige cada termo inteiro.
+"""
+
+import difflib
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .models import Student
+
+
+AUTOCOMPLETE_LIMIT = 10
+MIN_DIGITS = 3
+
+
+def normalize_text(value):
+    """Minúsculas, sem acentos e com espaços simples"""
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return ' '.join(value.lower().split())
+
+
+def digits_only(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def student_search_text(student):
+    return normalize_text(f'{student.first_name} {student.last_name} {student.email}')
+
+
+def _search_condition(text, digits, fuzzy=False):
+    """
+    Condição da busca. Exata (cada termo inteiro contido no texto normalizado)
+    para filtrar listas; aproximada (``fuzzy``) só para o autocomplete, que
+    ordena os candidatos por semelhança.
+    """
+    if fuzzy and connection.vendor == 'postgresql':
+        condition = Q(search_text__trigram_word_similar=text)
+    else:
+        condition = Q()
+        for term in text.split():
+            # Prefixo do termo: tolera erro de digitação no final da palavra
+            condition &= Q(search_text__contains=term[:3] if fuzzy else term)
+    if len(digits) >= MIN_DIGITS:
+        condition |= Q(phone_digits__contains=digits) | Q(cpf_digits__contains=digits)
+    return condition
+
+
+def match_students(queryset, query):
+    """Filtra um queryset de alunos pelo texto digitado (nome, e-mail, telefone ou CPF)"""
+    text = normalize_text(query)
+    if not text:
+        return queryset
+    return queryset.filter(_search_condition(text, digits_only(query)))
+
+
+def lookup_students(query, limit=AUTOCOMPLETE_LIMIT):
+    """Retorna até ``limit`` alunos mais parecidos com ``query``, anotados com ``score``"""
+    text = normalize_text(query)
+    if not text:
+        return []
+    digits = digits_only(query)
+    queryset = Student.objects.filter(_search_condition(text, digits, fuzzy=True)).only(
+        'id', 'first_name', 'last_name', 'email', 'phone', 'search_text', 'phone_digits', 'cpf_digits',
+    )
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        score = TrigramWordSimilarity(text, 'search_text')
+        if len(digits) >= MIN_DIGITS:
+            score = Greatest(score, Case(
+                When(Q(phone_digits__contains=digits) | Q(cpf_digits__contains=digits), then=Value(1.0)),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ))
+        return list(queryset.annotate(score=score).order_by('-score', 'first_name', 'id')[:limit])
+
+    candidates = list(queryset[:limit * 50])
+    for student in candidates:
+        student.score = difflib.SequenceMatcher(None, text, student.search_text[:len(text) + 10]).ratio()
+        if len(digits) >= MIN_DIGITS and (digits in student.phone_digits or digits in student.cpf_digits):
+            student.score = 1.0
+    candidates.sort(key=lambda student: (-student.score, student.first_name, student.pk))
+    return candidates[:limit]
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students.models import StudentDashboardSnapshot
+
+
+class Command(BaseCommand):
+    help = 'Compara os snapshots do painel do aluno com os dados reais'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Refaz os snapshots divergentes ou ausentes')
+        parser.add_argument('--batch-size', type=int, default=500, help='Alunos por lote')
+
+    def handle(self, *args, **options):
+        drift = StudentDashboardSnapshot.find_drift(fix=options['fix'], batch_size=options['batch_size'])
+        for student_id, keys in drift:
+            self.stdout.write(f'Aluno {student_id}: {", ".join(keys)}')
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Snapshots consistentes'))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'{len(drift)} snapshots refeitos'))
+        else:
+            raise CommandError(f'{len(drift)} snapshots divergentes (use --fix para refazer)')
@@ -0,0 +1,119 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+class _Rollback(Exception):
+    pass
+
+
+def hot_queries():
+    """Consultas mais frequentes do projeto: (descrição, queryset)"""
+    from core.models import BlogPost
+    from students.models import Payment, StudentSubscription, Attendance
+
+    today = timezone.localdate()
+    month_start = timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    queries = [
+        ('Pagamentos vencidos (dashboard)',
+         Payment.objects.filter(payment_status='pending', due_date__lt=today).values('id')),
+        ('Receita do mês (dashboard/admin)',
+         Payment.objects.filter(payment_status='paid', paid_date__gte=month_start).values('final_amount')),
+        ('Pendências de um aluno (alunos inadimplentes)',
+         Payment.objects.filter(student_id=1, payment_status='pending').values('final_amount')),
+        ('Pagamentos alterados desde a marca d\'água (consolidado)',
+         Payment.objects.filter(updated_at__gt=month_start).values('due_date', 'paid_date')),
+        ('Assinaturas ativas hoje',
+         StudentSubscription.objects.filter(status='active', start_date__lte=today, end_date__gte=today).values('id')),
+        ('Presenças recentes de um aluno',
+         Attendance.objects.filter(student_id=1).order_by('-class_date')[:10]),
+        ('Posts publicados recentes',
+         BlogPost.objects.filter(status='published').order_by('-published_at')[:3]),
+    ]
+    if apps.is_installed('newsletter'):
+        from newsletter.models import NewsletterSubscriber
+        queries.append((
+            'Destinatários da newsletter semanal',
+            NewsletterSubscriber.objects.filter(
+                is_active=True, is_verified=True, frequency__in=['weekly', 'monthly']
+            ).values('id'),
+        ))
+    return queries
+
+
+def project_indexes():
+    """Índices declarados em Meta.indexes nos modelos das consultas"""
+    labels = ['students.Payment', 'students.StudentSubscription', 'core.BlogPost']
+    if apps.is_installed('newsletter'):
+        labels.append('newsletter.NewsletterSubscriber')
+    for label in labels:
+        model = apps.get_model(label)
+        for index in model._meta.indexes:
+            yield model, index
+
+
+class Command(BaseCommand):
+    help = 'Mostra o plano de execução (EXPLAIN) das consultas principais, antes e depois dos índices'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before-after',
+            action='store_true',
+            help=(
+                'Também mostra o plano sem os índices do projeto (removidos dentro de uma transação '
+                'desfeita ao final). Só em desenvolvimento (DEBUG): no PostgreSQL o DROP INDEX trava '
+                'as tabelas (ACCESS EXCLUSIVE) até o fim da transação'
+            ),
+        )
+        parser.add_argument('--analyze', action='store_true', help='Usa EXPLAIN ANALYZE no PostgreSQL')
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options['analyze'] and connection.vendor == 'postgresql':
+            explain_options['analyze'] = True
+
+        if options['before_after']:
+            if not settings.DEBUG:
+                raise CommandError('--before-after remove índices e trava as tabelas: use apenas com DEBUG=True.')
+            self.stdout.write(self.style.MIGRATE_HEADING('=== ANTES (sem índices do projeto) ==='))
+            # No SQLite as checagens de FK precisam ser desligadas fora da transação
+            try:
+                with connection.constraint_checks_disabled(), transaction.atomic():
+                    with connection.schema_editor(atomic=False) as schema_editor:
+                        for model, index in project_indexes():
+                            schema_editor.remove_index(model, index)
+                    self.explain_all(explain_options)
+                    raise _Rollback
+            except _Rollback:
+                pass
+            self.stdout.write(self.style.MIGRATE_HEADING('=== DEPOIS (com índices) ==='))
+
+        scans = self.explain_all(explain_options)
+        if scans:
+            self.stdout.write(self.style.WARNING(f'{scans} consulta(s) ainda com leitura sequencial.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Nenhuma leitura sequencial nas tabelas principais.'))
+
+    def explain_all(self, explain_options):
+        scans = 0
+        for description, queryset in hot_queries():
+            plan = queryset.explain(**explain_options)
+            has_scan = self.is_sequential_scan(plan)
+            scans += has_scan
+            label = self.style.WARNING('[SCAN] ') if has_scan else self.style.SUCCESS('[INDEX] ')
+            self.stdout.write(label + description)
+            for line in plan.splitlines():
+                self.stdout.write(f'    {line}')
+        return scans
+
+    @staticmethod
+    def is_sequential_scan(plan):
+        if connection.vendor == 'postgresql':
+            return 'Seq Scan' in plan
+        # SQLite: "SCAN <tabela>" sem índice (não conta "SCAN ... USING INDEX")
+        return any(
+            ' SCAN ' in f' {line} ' and 'USING' not in line
+            for line in plan.splitlines()
+        )
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.pix import generate_qr_codes, prepare_monthly_charges
+
+
+class Command(BaseCommand):
+    help = 'Gera os QR Codes PIX pendentes; com --month cria antes as cobranças PIX do mês inteiro'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Mês das cobranças (AAAA-MM), ex.: 2026-11')
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                month = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('Use o formato AAAA-MM em --month.')
+            created, generated = prepare_monthly_charges(month)
+            self.stdout.write(f'{created} cobranças PIX criadas')
+        else:
+            generated = generate_qr_codes()
+        self.stdout.write(self.style.SUCCESS(f'{generated} QR Codes gerados'))
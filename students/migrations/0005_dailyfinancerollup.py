@@ -0,0 +1,37 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0004_userprofile_must_change_password'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyFinanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dia')),
+                ('payment_method', models.CharField(max_length=20, verbose_name='Método de Pagamento')),
+                ('due_count', models.PositiveIntegerField(default=0, verbose_name='Pagamentos com Vencimento')),
+                ('due_paid_count', models.PositiveIntegerField(default=0, verbose_name='Vencimentos Pagos')),
+                ('due_pending_count', models.PositiveIntegerField(default=0, verbose_name='Vencimentos Pendentes')),
+                ('due_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Receita dos Vencimentos')),
+                ('discount_total', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Total de Descontos')),
+                ('paid_count', models.PositiveIntegerField(default=0, verbose_name='Pagamentos Recebidos')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Receita Recebida')),
+                ('source_updated_at', models.DateTimeField(blank=True, null=True, verbose_name='Última Alteração Processada')),
+                ('is_stale', models.BooleanField(default=False, verbose_name='Desatualizado')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Consolidado Financeiro Diário',
+                'verbose_name_plural': 'Consolidados Financeiros Diários',
+                'ordering': ['-day', 'payment_method'],
+                'unique_together': {('day', 'payment_method')},
+            },
+        ),
+    ]
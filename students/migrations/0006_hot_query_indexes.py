@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0005_dailyfinancerollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_status', 'due_date'], name='payment_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_status', 'paid_date'], name='payment_status_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('payment_status', 'pending')), fields=['due_date', 'student'], name='payment_pending_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['updated_at'], name='payment_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentsubscription',
+            index=models.Index(fields=['status', 'start_date', 'end_date'], name='subscription_status_dates_idx'),
+        ),
+    ]
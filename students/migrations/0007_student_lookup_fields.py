@@ -0,0 +1,75 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:55
+
+import re
+import unicodedata
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def _normalize(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return ' '.join(value.lower().split())
+
+
+def fill_lookup_fields(apps, schema_editor):
+    Student = apps.get_model('students', 'Student')
+    students = list(Student.objects.only('first_name', 'last_name', 'email', 'phone', 'cpf'))
+    for student in students:
+        student.search_text = _normalize(f'{student.first_name} {student.last_name} {student.email}')
+        student.phone_digits = re.sub(r'\D', '', student.phone or '')
+        student.cpf_digits = re.sub(r'\D', '', student.cpf or '')
+    Student.objects.bulk_update(students, ['search_text', 'phone_digits', 'cpf_digits'], batch_size=500)
+
+
+# Índices GIN de trigramas (apenas PostgreSQL)
+TRIGRAM_INDEXES = [
+    ('student_search_text_trgm', 'search_text'),
+    ('student_phone_digits_trgm', 'phone_digits'),
+    ('student_cpf_digits_trgm', 'cpf_digits'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON students_student USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='cpf_digits',
+            field=models.CharField(blank=True, editable=False, max_length=11, verbose_name='CPF (dígitos)'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='phone_digits',
+            field=models.CharField(blank=True, editable=False, max_length=20, verbose_name='Telefone (dígitos)'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='search_text',
+            field=models.CharField(blank=True, editable=False, max_length=400, verbose_name='Texto de Busca'),
+        ),
+        migrations.RunPython(fill_lookup_fields, migrations.RunPython.noop),
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:27
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_student_lookup_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentDashboardSnapshot',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard_snapshot', serialize=False, to='students.student', verbose_name='Aluno')),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Dados')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Snapshot do Painel do Aluno',
+                'verbose_name_plural': 'Snapshots do Painel do Aluno',
+            },
+        ),
+    ]
@@ -1,8 +1,11 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import RegexValidator
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
+from datetime import date, time
 from decimal import Decimal
+import json
 import uuid
 
 
@@ -78,6 +81,11 @@ class Student(models.Model):
         verbose_name='Criado por'
     )
 
+    # Campos normalizados para a busca aproximada (students.lookup)
+    search_text = models.CharField('Texto de Busca', max_length=400, blank=True, editable=False)
+    phone_digits = models.CharField('Telefone (dígitos)', max_length=20, blank=True, editable=False)
+    cpf_digits = models.CharField('CPF (dígitos)', max_length=11, blank=True, editable=False)
+
     class Meta:
         verbose_name = 'Aluno'
         verbose_name_plural = 'Alunos'
@@ -86,6 +94,17 @@ class Student(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    def save(self, *args, **kwargs):
+        from .lookup import digits_only, student_search_text
+
+        self.search_text = student_search_text(self)
+        self.phone_digits = digits_only(self.phone)
+        self.cpf_digits = digits_only(self.cpf)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'search_text', 'phone_digits', 'cpf_digits'}
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -149,6 +168,10 @@ class StudentSubscription(models.Model):
         verbose_name = 'Assinatura'
         verbose_name_plural = 'Assinaturas'
         ordering = ['-created_at']
+        indexes = [
+            # Assinaturas ativas no dia (dashboards)
+            models.Index(fields=['status', 'start_date', 'end_date'], name='subscription_status_dates_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.full_name} - {self.payment_plan.name}"
@@ -216,6 +239,18 @@ class Payment(models.Model):
         verbose_name = 'Pagamento'
         verbose_name_plural = 'Pagamentos'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['payment_status', 'due_date'], name='payment_status_due_idx'),
+            models.Index(fields=['payment_status', 'paid_date'], name='payment_status_paid_idx'),
+            # Índice parcial: apenas pendentes (vencidos/inadimplentes), bem menor que a tabela
+            models.Index(
+                fields=['due_date', 'student'],
+                condition=models.Q(payment_status='pending'),
+                name='payment_pending_due_idx',
+            ),
+            # Marca d'água do consolidado financeiro diário
+            models.Index(fields=['updated_at'], name='payment_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.full_name} - R$ {self.final_amount} - {self.get_payment_status_display()}"
@@ -299,4 +334,173 @@ class Attendance(models.Model):
         unique_together = ['student', 'class_date', 'class_time']
 
     def __str__(self):
-        return f"{self.student.full_name} - {self.class_date} {self.class_time}"
\ No newline at end of file
+        return f"{self.student.full_name} - {self.class_date} {self.class_time}"
+
+
+class StudentDashboardSnapshot(models.Model):
+    """
+    Dados do painel do aluno já montados (modelo de leitura).
+
+    Guarda em JSON o que ``student_dashboard_view`` exibe: assinaturas
+    vigentes ou futuras, pagamentos pendentes e as últimas presenças. Os
+    sinais de ``Payment``, ``StudentSubscription`` e ``Attendance`` refazem o
+    snapshot do aluno após o commit, e o painel abre com uma consulta pela
+    chave primária. A assinatura atual é escolhida na leitura, pela data do
+    dia, para que o vencimento não dependa de uma nova gravação. O comando
+    ``check_dashboard_snapshots`` compara os snapshots com os dados reais.
+    """
+    
+    RECENT_ATTENDANCES = 10
+    
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='dashboard_snapshot',
+        verbose_name='Aluno'
+    )
+    data = models.JSONField('Dados', default=dict, encoder=DjangoJSONEncoder)
+    updated_at = models.DateTimeField('Atualizado em', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Snapshot do Painel do Aluno'
+        verbose_name_plural = 'Snapshots do Painel do Aluno'
+
+    def __str__(self):
+        return f"Painel - {self.data.get('student', {}).get('full_name', self.student_id)}"
+
+    @classmethod
+    def build_data(cls, student_id, today=None):
+        """Dados atuais do painel (já no formato do JSON), ou None se o aluno não existe"""
+        today = today or timezone.localdate()
+        student = Student.objects.filter(pk=student_id).values('first_name', 'last_name').first()
+        if student is None:
+            return None
+        subscriptions = (
+            StudentSubscription.objects.filter(student_id=student_id, status='active', end_date__gte=today)
+            .select_related('payment_plan')
+        )
+        pending_payments = (
+            Payment.objects.filter(student_id=student_id, payment_status='pending')
+            .values('id', 'final_amount', 'due_date')
+        )
+        attendances = Attendance.objects.filter(student_id=student_id)[:cls.RECENT_ATTENDANCES]
+        statuses = dict(Attendance.STATUS_CHOICES)
+        data = {
+            'student': {
+                'first_name': student['first_name'],
+                'full_name': f"{student['first_name']} {student['last_name']}",
+            },
+            'subscriptions': [
+                {
+                    'id': subscription.id,
+                    'start_date': subscription.start_date,
+                    'end_date': subscription.end_date,
+                    'payment_plan': {
+                        'name': subscription.payment_plan.name,
+                        'price': subscription.payment_plan.price,
+                    },
+                }
+                for subscription in subscriptions
+            ],
+            'pending_payments': list(pending_payments),
+            'recent_attendances': [
+                {
+                    'id': attendance.id,
+                    'class_date': attendance.class_date,
+                    'class_time': attendance.class_time,
+                    'status': attendance.status,
+                    'status_display': statuses.get(attendance.status, attendance.status),
+                }
+                for attendance in attendances
+            ],
+        }
+        # Mesmo formato do que volta do banco (datas e decimais como texto)
+        return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+
+    @classmethod
+    def rebuild(cls, student_id):
+        """Refaz o snapshot do aluno; remove o snapshot se o aluno não existe mais"""
+        data = cls.build_data(student_id)
+        if data is None:
+            cls.objects.filter(pk=student_id).delete()
+            return None
+        return cls.save_data(student_id, data)
+
+    @classmethod
+    def save_data(cls, student_id, data):
+        """Grava o snapshot com um único INSERT ... ON CONFLICT"""
+        snapshot = cls(student_id=student_id, data=data)
+        cls.objects.bulk_create(
+            [snapshot], update_conflicts=True, unique_fields=['student'], update_fields=['data', 'updated_at']
+        )
+        return snapshot
+
+    @classmethod
+    def for_student(cls, student_id):
+        """Snapshot do aluno (uma consulta); monta na hora se ainda não existe"""
+        snapshot = cls.objects.filter(pk=student_id).first()
+        return snapshot if snapshot is not None else cls.rebuild(student_id)
+
+    @classmethod
+    def find_drift(cls, fix=False, batch_size=500):
+        """
+        Compara os snapshots com os dados reais, em lotes de alunos.
+        Retorna [(id do aluno, chaves divergentes)]; com ``fix`` refaz os divergentes.
+        """
+        drift = []
+        student_ids = list(Student.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+            snapshots = cls.objects.in_bulk(batch)
+            for student_id in batch:
+                live = cls.build_data(student_id)
+                snapshot = snapshots.get(student_id)
+                if live is None:
+                    continue
+                stored = snapshot.data if snapshot is not None else {}
+                keys = sorted(key for key in live.keys() | stored.keys() if live.get(key) != stored.get(key))
+                if keys:
+                    drift.append((student_id, keys))
+                    if fix:
+                        cls.save_data(student_id, live)
+        return drift
+
+    def get_context(self, today=None):
+        """Contexto do template, com datas e valores convertidos de volta"""
+        today = today or timezone.localdate()
+        data = self.data
+        subscriptions = [
+            {
+                **subscription,
+                'start_date': date.fromisoformat(subscription['start_date']),
+                'end_date': date.fromisoformat(subscription['end_date']),
+                'payment_plan': {
+                    **subscription['payment_plan'],
+                    'price': Decimal(subscription['payment_plan']['price']),
+                },
+            }
+            for subscription in data['subscriptions']
+        ]
+        return {
+            'student': data['student'],
+            'current_subscription': next(
+                (s for s in subscriptions if s['start_date'] <= today <= s['end_date']), None
+            ),
+            'pending_payments': [
+                {
+                    **payment,
+                    'final_amount': Decimal(payment['final_amount']),
+                    'due_date': date.fromisoformat(payment['due_date']),
+                }
+                for payment in data['pending_payments']
+            ],
+            'recent_attendances': [
+                {
+                    **attendance,
+                    'class_date': date.fromisoformat(attendance['class_date']),
+                    'class_time': time.fromisoformat(attendance['class_time']),
+                }
+                for attendance in data['recent_attendances']
+            ],
+        }
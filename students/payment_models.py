@@ -1,11 +1,9 @@
 from django.db import models
 from django.conf import settings
+from django.urls import reverse
 from django.utils import timezone
 from decimal import Decimal
 import uuid
-import qrcode
-import io
-from django.core.files.base import ContentFile
 
 
 class PIXPayment(models.Model):
@@ -56,31 +54,27 @@ class PIXPayment(models.Model):
         return f"PIX - {self.payment.student.full_name} - R$ {self.amount}"
 
     def generate_qr_code(self):
-        """Gera QR Code para o pagamento PIX"""
+        """Associa o QR Code (PNG endereçado pelo conteúdo) sem salvar o pagamento"""
+        from .pix import store_qr_code
+
         if not self.pix_copy_paste:
             return None
-        
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(self.pix_copy_paste)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Salvar imagem
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        filename = f"pix_qr_{self.pix_payment_id}.png"
-        self.pix_qr_code.save(filename, ContentFile(buffer.getvalue()), save=False)
-        
+        self.pix_qr_code.name = store_qr_code(self.pix_copy_paste)
         return self.pix_qr_code
 
+    @property
+    def qr_code_digest(self):
+        from .pix import payload_digest
+
+        return payload_digest(self.pix_copy_paste)
+
+    def get_qr_code_url(self):
+        """URL do PNG sob demanda; o hash na URL permite cache longo no navegador"""
+        return '%s?v=%s' % (
+            reverse('students:pix_qr_code', args=[self.pk]),
+            self.qr_code_digest[:16],
+        )
+
     def save(self, *args, **kwargs):
         if not self.external_id:
             self.external_id = f"ASBJJ_{self.pix_payment_id}"
@@ -88,12 +82,8 @@ class PIXPayment(models.Model):
         if not self.expires_at:
             self.expires_at = timezone.now() + timezone.timedelta(hours=24)
         
+        # O QR Code é gerado fora da requisição (students.pix)
         super().save(*args, **kwargs)
-        
-        # Gerar QR Code se não existir
-        if not self.pix_qr_code and self.pix_copy_paste:
-            self.generate_qr_code()
-            super().save(*args, **kwargs)
 
 
 class PaymentNotification(models.Model):
@@ -190,3 +180,182 @@ class PaymentReport(models.Model):
         if self.total_payments > 0:
             return (self.paid_payments / self.total_payments) * 100
         return 0
+
+
+class DailyFinanceRollup(models.Model):
+    """
+    Consolidado financeiro diário por método de pagamento.
+
+    Cada linha guarda duas visões do mesmo dia: os pagamentos com vencimento
+    no dia (usados nos relatórios) e os pagamentos quitados no dia (receita
+    do mês). É atualizado de forma incremental por ``refresh()`` (tarefa
+    ``core.tasks.update_daily_finance_rollup``), que só recalcula os dias
+    tocados por pagamentos alterados desde a última marca d'água
+    (``Payment.updated_at``), menos uma margem para transações que confirmam
+    depois com um ``updated_at`` mais antigo. As views apenas leem as linhas.
+    """
+    
+    day = models.DateField('Dia')
+    payment_method = models.CharField('Método de Pagamento', max_length=20)
+    
+    # Pagamentos com vencimento no dia
+    due_count = models.PositiveIntegerField('Pagamentos com Vencimento', default=0)
+    due_paid_count = models.PositiveIntegerField('Vencimentos Pagos', default=0)
+    due_pending_count = models.PositiveIntegerField('Vencimentos Pendentes', default=0)
+    due_revenue = models.DecimalField('Receita dos Vencimentos', max_digits=12, decimal_places=2, default=0)
+    discount_total = models.DecimalField('Total de Descontos', max_digits=12, decimal_places=2, default=0)
+    
+    # Pagamentos quitados no dia
+    paid_count = models.PositiveIntegerField('Pagamentos Recebidos', default=0)
+    revenue = models.DecimalField('Receita Recebida', max_digits=12, decimal_places=2, default=0)
+    
+    # Controle da atualização incremental
+    source_updated_at = models.DateTimeField('Última Alteração Processada', null=True, blank=True)
+    is_stale = models.BooleanField('Desatualizado', default=False)
+    refreshed_at = models.DateTimeField('Atualizado em', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Consolidado Financeiro Diário'
+        verbose_name_plural = 'Consolidados Financeiros Diários'
+        ordering = ['-day', 'payment_method']
+        unique_together = ['day', 'payment_method']
+
+    # Campos regravados pelo upsert de ``refresh()``
+    ROLLUP_FIELDS = [
+        'due_count', 'due_paid_count', 'due_pending_count', 'due_revenue', 'discount_total',
+        'paid_count', 'revenue', 'source_updated_at', 'is_stale', 'refreshed_at',
+    ]
+
+    def __str__(self):
+        return f"{self.day} - {self.payment_method} - R$ {self.revenue}"
+
+    @classmethod
+    def mark_stale(cls, days):
+        """Marca dias para recálculo (ex.: pagamento excluído ou movido de data)"""
+        days = {day for day in days if day}
+        if days:
+            cls.objects.filter(day__in=days).update(is_stale=True)
+
+    @classmethod
+    def refresh(cls, full=False):
+        """
+        Recalcula os dias alterados desde a última execução.
+
+        As linhas são gravadas com upsert em (dia, método) e as combinações
+        que deixaram de existir são removidas: duas execuções simultâneas não
+        entram em conflito. Retorna o número de dias recalculados.
+        """
+        from datetime import timedelta
+
+        from django.conf import settings
+        from django.db import transaction
+        from django.db.models import Count, Max, Q, Sum
+        from django.db.models.functions import TruncDate
+        from .models import Payment
+
+        payments = Payment.objects.all()
+        watermark = None if full else cls.objects.aggregate(Max('source_updated_at'))['source_updated_at__max']
+        if watermark is not None:
+            overlap = getattr(settings, 'FINANCE_ROLLUP_WATERMARK_OVERLAP', 600)
+            payments = payments.filter(updated_at__gt=watermark - timedelta(seconds=overlap))
+
+        local_tz = timezone.get_current_timezone()
+        days = set()
+        for due_date, paid_date in payments.values_list('due_date', 'paid_date').iterator(chunk_size=2000):
+            days.add(due_date)
+            if paid_date:
+                days.add(timezone.localtime(paid_date, local_tz).date())
+        days.update(cls.objects.filter(is_stale=True).values_list('day', flat=True))
+        if not days:
+            return 0
+
+        rows = {}
+
+        def row(day, method):
+            if (day, method) not in rows:
+                rows[(day, method)] = cls(day=day, payment_method=method)
+            return rows[(day, method)]
+
+        days = sorted(days)
+        for start in range(0, len(days), 500):
+            chunk = days[start:start + 500]
+            due = (
+                Payment.objects.filter(due_date__in=chunk)
+                .values('due_date', 'payment_method')
+                .annotate(
+                    due_count=Count('id'),
+                    due_paid_count=Count('id', filter=Q(payment_status='paid')),
+                    due_pending_count=Count('id', filter=Q(payment_status='pending')),
+                    due_revenue=Sum('final_amount', filter=Q(payment_status='paid')),
+                    discount_total=Sum('discount_amount'),
+                    last_update=Max('updated_at'),
+                )
+            )
+            for item in due:
+                obj = row(item['due_date'], item['payment_method'])
+                obj.due_count = item['due_count']
+                obj.due_paid_count = item['due_paid_count']
+                obj.due_pending_count = item['due_pending_count']
+                obj.due_revenue = item['due_revenue'] or 0
+                obj.discount_total = item['discount_total'] or 0
+                obj.source_updated_at = item['last_update']
+
+            paid = (
+                Payment.objects.filter(payment_status='paid', paid_date__isnull=False)
+                .annotate(paid_day=TruncDate('paid_date', tzinfo=local_tz))
+                .filter(paid_day__in=chunk)
+                .values('paid_day', 'payment_method')
+                .annotate(paid_count=Count('id'), revenue=Sum('final_amount'), last_update=Max('updated_at'))
+            )
+            for item in paid:
+                obj = row(item['paid_day'], item['payment_method'])
+                obj.paid_count = item['paid_count']
+                obj.revenue = item['revenue'] or 0
+                if obj.source_updated_at is None or item['last_update'] > obj.source_updated_at:
+                    obj.source_updated_at = item['last_update']
+
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                rows.values(),
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['day', 'payment_method'],
+                update_fields=cls.ROLLUP_FIELDS,
+            )
+            existing = cls.objects.filter(day__in=days).values_list('pk', 'day', 'payment_method')
+            gone = [pk for pk, day, method in existing if (day, method) not in rows]
+            if gone:
+                cls.objects.filter(pk__in=gone).delete()
+        return len(days)
+
+    @classmethod
+    def totals(cls, start_date=None, end_date=None, today=None):
+        """Totais de vencimentos no período (mesmos números do PaymentReport)"""
+        from django.db.models import Q, Sum
+
+        today = today or timezone.now().date()
+        rollups = cls.objects.all()
+        if start_date:
+            rollups = rollups.filter(day__gte=start_date)
+        if end_date:
+            rollups = rollups.filter(day__lte=end_date)
+        totals = rollups.aggregate(
+            total_revenue=Sum('due_revenue'),
+            total_payments=Sum('due_count'),
+            paid_payments=Sum('due_paid_count'),
+            pending_payments=Sum('due_pending_count'),
+            overdue_payments=Sum('due_pending_count', filter=Q(day__lt=today)),
+            discount_total=Sum('discount_total'),
+        )
+        return {key: value or 0 for key, value in totals.items()}
+
+    @classmethod
+    def revenue_since(cls, start_date):
+        """Receita recebida e quantidade de pagamentos quitados a partir da data"""
+        from django.db.models import Sum
+
+        totals = cls.objects.filter(day__gte=start_date).aggregate(
+            revenue=Sum('revenue'),
+            paid_count=Sum('paid_count'),
+        )
+        return totals['revenue'] or 0, totals['paid_count'] or 0
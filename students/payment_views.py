@@ -1,112 +1,68 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, Http404
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from django.db.models import Sum, Count, Q
 from django.template.loader import render_to_string
 from django.core.mail import send_mail
 from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.http import parse_etags
 import json
 import uuid
 from decimal import Decimal
 
 from .models import Student, Payment, PaymentPlan, StudentSubscription, Attendance
-from .payment_models import PIXPayment, PaymentNotification, PaymentReport
+from .payment_models import PIXPayment, PaymentNotification, PaymentReport, DailyFinanceRollup
+from .user_models import UserProfile
 from .decorators import admin_required
+from .dashboard_stats import DashboardStats
+from core.instrumentation import query_budget
+from core.pagination import paginate_keyset
+from .lookup import lookup_students
+from .pix import pix_payload, store_qr_code
+from .exports import (
+    filter_students, filter_payments, filter_attendances,
+    STUDENT_EXPORT, PAYMENT_EXPORT, ATTENDANCE_EXPORT,
+)
 
 
+LIST_PAGE_SIZE = 50
+PIX_QR_CODE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+@query_budget(18)  # cache frio: recalcula o snapshot
 @login_required
 @admin_required
 def dashboard_view(request):
     """Dashboard principal com estatísticas"""
-    
-    # Estatísticas gerais
-    total_students = Student.objects.count()
-    active_students = Student.objects.filter(is_active=True).count()
-    
-    # Pagamentos
-    total_payments = Payment.objects.count()
-    paid_payments = Payment.objects.filter(payment_status='paid').count()
-    pending_payments = Payment.objects.filter(
-        payment_status='pending',
-        due_date__lt=timezone.now().date()
-    ).count()
-    
-    # Receita do mês atual
-    current_month = timezone.now().date().replace(day=1)
-    monthly_revenue = Payment.objects.filter(
-        paid_date__gte=current_month,
-        payment_status='paid'
-    ).aggregate(total=Sum('final_amount'))['total'] or 0
-    
-    # Assinaturas ativas
-    active_subscriptions = StudentSubscription.objects.filter(
-        status='active',
-        start_date__lte=timezone.now().date(),
-        end_date__gte=timezone.now().date()
-    ).count()
-    
-    # Pagamentos recentes
-    recent_payments = Payment.objects.select_related('student').order_by('-created_at')[:10]
-    
-    # Alunos com pagamentos pendentes
-    overdue_students = Student.objects.filter(
-        payments__payment_status='pending',
-        payments__due_date__lt=timezone.now().date()
-    ).distinct()[:5]
-    
-    # Calcular valores pendentes para cada aluno
-    for student in overdue_students:
-        student.pending_amount = student.payments.filter(
-            payment_status='pending'
-        ).aggregate(total=Sum('final_amount'))['total'] or 0
-    
-    context = {
-        'total_students': total_students,
-        'active_students': active_students,
-        'total_payments': total_payments,
-        'paid_payments': paid_payments,
-        'pending_payments': pending_payments,
-        'monthly_revenue': monthly_revenue,
-        'active_subscriptions': active_subscriptions,
-        'recent_payments': recent_payments,
-        'overdue_students': overdue_students,
-    }
+    context = DashboardStats.snapshot()
     
     return render(request, 'students/dashboard.html', context)
 
 
+@query_budget(6)
 @login_required
 @admin_required
 def student_list_view(request):
     """Lista de alunos"""
-    students = Student.objects.all().order_by('first_name', 'last_name')
+    students = filter_students(Student.objects.all().order_by('first_name', 'last_name'), request.GET)
     
     # Filtros
     search = request.GET.get('search', '')
     belt_filter = request.GET.get('belt', '')
     status_filter = request.GET.get('status', '')
     
-    if search:
-        students = students.filter(
-            Q(first_name__icontains=search) |
-            Q(last_name__icontains=search) |
-            Q(email__icontains=search) |
-            Q(phone__icontains=search)
-        )
-    
-    if belt_filter:
-        students = students.filter(belt_color=belt_filter)
-    
-    if status_filter == 'active':
-        students = students.filter(is_active=True)
-    elif status_filter == 'inactive':
-        students = students.filter(is_active=False)
+    page = paginate_keyset(request, students, ['first_name', 'last_name', 'id'], LIST_PAGE_SIZE)
     
     context = {
-        'students': students,
+        'students': page,
+        'page_obj': page,
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
         'search': search,
         'belt_filter': belt_filter,
         'status_filter': status_filter,
@@ -115,6 +71,26 @@ def student_list_view(request):
     return render(request, 'students/student_list.html', context)
 
 
+@query_budget(4)
+@login_required
+@admin_required
+def student_autocomplete_view(request):
+    """Autocomplete de alunos (JSON): os 10 mais parecidos com ?q="""
+    results = [
+        {
+            'id': student.id,
+            'name': student.full_name,
+            'email': student.email,
+            'phone': student.phone,
+            'score': round(float(student.score), 3),
+            'url': reverse('students:student_detail', args=[student.id]),
+        }
+        for student in lookup_students(request.GET.get('q', ''))
+    ]
+    return JsonResponse({'results': results})
+
+
+@query_budget(10)
 @login_required
 @admin_required
 def student_detail_view(request, student_id):
@@ -151,11 +127,15 @@ def student_detail_view(request, student_id):
     return render(request, 'students/student_detail.html', context)
 
 
+@query_budget(6)
 @login_required
 @admin_required
 def payment_list_view(request):
     """Lista de pagamentos"""
-    payments = Payment.objects.select_related('student', 'subscription').order_by('-created_at')
+    payments = filter_payments(
+        Payment.objects.select_related('student', 'subscription').order_by('-created_at'),
+        request.GET,
+    )
     
     # Filtros
     status_filter = request.GET.get('status', '')
@@ -163,20 +143,13 @@ def payment_list_view(request):
     date_from = request.GET.get('date_from', '')
     date_to = request.GET.get('date_to', '')
     
-    if status_filter:
-        payments = payments.filter(payment_status=status_filter)
-    
-    if method_filter:
-        payments = payments.filter(payment_method=method_filter)
-    
-    if date_from:
-        payments = payments.filter(due_date__gte=date_from)
-    
-    if date_to:
-        payments = payments.filter(due_date__lte=date_to)
+    page = paginate_keyset(request, payments, ['-created_at', '-id'], LIST_PAGE_SIZE)
     
     context = {
-        'payments': payments,
+        'payments': page,
+        'page_obj': page,
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
         'status_filter': status_filter,
         'method_filter': method_filter,
         'date_from': date_from,
@@ -186,18 +159,40 @@ def payment_list_view(request):
     return render(request, 'students/payment_list.html', context)
 
 
+@login_required
+@admin_required
+def export_students_view(request):
+    """Exportar alunos em CSV (mesmos filtros da listagem)"""
+    return STUDENT_EXPORT.response(filter_students(Student.objects.all(), request.GET))
+
+
+@login_required
+@admin_required
+def export_payments_view(request):
+    """Exportar pagamentos em CSV (mesmos filtros da listagem)"""
+    return PAYMENT_EXPORT.response(filter_payments(Payment.objects.all(), request.GET))
+
+
+@login_required
+@admin_required
+def export_attendances_view(request):
+    """Exportar presenças em CSV"""
+    return ATTENDANCE_EXPORT.response(filter_attendances(Attendance.objects.all(), request.GET))
+
+
 @login_required
 def create_pix_payment(request, payment_id):
     """Criar pagamento PIX"""
     payment = get_object_or_404(Payment, id=payment_id)
     
     if request.method == 'POST':
-        # Simular criação de PIX (em produção, integrar com gateway de pagamento)
+        # Simular criação de PIX (em produção, integrar com gateway de pagamento);
+        # o QR Code é gerado fora da requisição (students.pix)
         pix_payment = PIXPayment.objects.create(
             payment=payment,
             amount=payment.final_amount,
-            pix_key=settings.PIX_KEY if hasattr(settings, 'PIX_KEY') else 'contato@asbjj.com.br',
-            pix_copy_paste=f"00020126580014BR.GOV.BCB.PIX0114+5511999999999520400005303986540{payment.final_amount:.2f}5802BR5913ASBJJ ACADEMY6009SAO PAULO62070503***6304{payment.payment_id}",
+            pix_key=getattr(settings, 'PIX_KEY', 'contato@asbjj.com.br'),
+            pix_copy_paste=pix_payload(payment),
             expires_at=timezone.now() + timezone.timedelta(hours=24)
         )
         
@@ -207,10 +202,19 @@ def create_pix_payment(request, payment_id):
     return render(request, 'students/create_pix_payment.html', {'payment': payment})
 
 
+def visible_pix_payments(user):
+    """PIX que o usuário pode ver: todos para a equipe, só os próprios para o aluno"""
+    queryset = PIXPayment.objects.all()
+    if user.is_staff:
+        return queryset
+    student_id = UserProfile.objects.filter(user=user).values_list('student_profile_id', flat=True).first()
+    return queryset.filter(payment__student_id=student_id) if student_id else queryset.none()
+
+
 @login_required
 def pix_payment_detail(request, pix_payment_id):
     """Detalhes do pagamento PIX"""
-    pix_payment = get_object_or_404(PIXPayment, id=pix_payment_id)
+    pix_payment = get_object_or_404(visible_pix_payments(request.user), id=pix_payment_id)
     
     context = {
         'pix_payment': pix_payment,
@@ -219,6 +223,31 @@ def pix_payment_detail(request, pix_payment_id):
     return render(request, 'students/pix_payment_detail.html', context)
 
 
+@login_required
+def pix_qr_code_view(request, pix_payment_id):
+    """PNG do QR Code PIX, gerado sob demanda se a tarefa ainda não o gerou"""
+    pix_payment = get_object_or_404(
+        visible_pix_payments(request.user).only('pk', 'pix_copy_paste', 'pix_qr_code'), id=pix_payment_id
+    )
+    if not pix_payment.pix_copy_paste:
+        raise Http404
+    
+    etag = '"%s"' % pix_payment.qr_code_digest
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        name = store_qr_code(pix_payment.pix_copy_paste)
+        if pix_payment.pix_qr_code.name != name:
+            PIXPayment.objects.filter(pk=pix_payment.pk).update(pix_qr_code=name)
+        with default_storage.open(name, 'rb') as image:
+            response = HttpResponse(image.read(), content_type='image/png')
+        response['Content-Disposition'] = f'inline; filename="pix_{pix_payment.pk}.png"'
+    response['ETag'] = etag
+    # Privado (exige login); a URL de get_qr_code_url muda junto com o código
+    response['Cache-Control'] = f'private, max-age={PIX_QR_CODE_MAX_AGE}, immutable'
+    return response
+
+
 @login_required
 def payment_reports_view(request):
     """Relatórios de pagamento"""
@@ -239,24 +268,8 @@ def generate_payment_report(request):
         end_date = request.POST.get('end_date')
         report_type = request.POST.get('report_type', 'custom')
         
-        # Buscar pagamentos no período
-        payments = Payment.objects.filter(
-            due_date__gte=start_date,
-            due_date__lte=end_date
-        )
-        
-        # Calcular estatísticas
-        total_revenue = payments.filter(payment_status='paid').aggregate(
-            total=Sum('final_amount')
-        )['total'] or 0
-        
-        total_payments = payments.count()
-        paid_payments = payments.filter(payment_status='paid').count()
-        pending_payments = payments.filter(payment_status='pending').count()
-        overdue_payments = payments.filter(
-            payment_status='pending',
-            due_date__lt=timezone.now().date()
-        ).count()
+        # Estatísticas do período a partir do consolidado diário
+        totals = DailyFinanceRollup.totals(start_date, end_date)
         
         # Criar relatório
         report = PaymentReport.objects.create(
@@ -264,11 +277,11 @@ def generate_payment_report(request):
             title=f"Relatório de Pagamentos - {start_date} a {end_date}",
             start_date=start_date,
             end_date=end_date,
-            total_revenue=total_revenue,
-            total_payments=total_payments,
-            paid_payments=paid_payments,
-            pending_payments=pending_payments,
-            overdue_payments=overdue_payments,
+            total_revenue=totals['total_revenue'],
+            total_payments=totals['total_payments'],
+            paid_payments=totals['paid_payments'],
+            pending_payments=totals['pending_payments'],
+            overdue_payments=totals['overdue_payments'],
             created_by=request.user
         )
         
@@ -0,0 +1,137 @@
+"""
+Cobranças PIX e seus QR Codes.
+
+O PNG do QR Code não é mais gerado dentro do ``save()``: a tarefa
+``core.tasks.generate_pix_qr_codes`` (a cada minuto) preenche em lote os
+pagamentos sem imagem, e ``pix_qr_code_view`` gera sob demanda se o cliente
+chegar antes dela. O armazenamento é endereçado pelo conteúdo: o arquivo se
+chama pelo SHA-256 do código copia e cola, então códigos idênticos reaproveitam
+a mesma imagem e a URL (com o hash) pode ser guardada pelo navegador para
+sempre.
+
+``prepare_monthly_charges`` cria as cobranças PIX pendentes de um mês inteiro
+e os QR Codes delas de uma vez (tarefa mensal ``prepare_monthly_pix_charges``).
+"""
+
+import hashlib
+import io
+from datetime import datetime, time, timedelta
+
+import qrcode
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Payment
+from .payment_models import PIXPayment
+
+
+QR_CODE_DIR = 'pix/qr_codes'
+
+
+def pix_payload(payment):
+    """Código PIX copia e cola de um pagamento (simulado; em produção vem do gateway)"""
+    return (
+        f"00020126580014BR.GOV.BCB.PIX0114+5511999999999520400005303986540{payment.final_amount:.2f}"
+        f"5802BR5913ASBJJ ACADEMY6009SAO PAULO62070503***6304{payment.payment_id}"
+    )
+
+
+def payload_digest(payload):
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def qr_code_name(payload):
+    digest = payload_digest(payload)
+    return f'{QR_CODE_DIR}/{digest[:2]}/{digest}.png'
+
+
+def render_png(payload):
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    qr.make_image(fill_color='black', back_color='white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def store_qr_code(payload):
+    """Nome do PNG no storage, gerando-o só se ainda não existir"""
+    name = qr_code_name(payload)
+    if not default_storage.exists(name):
+        # O nome é determinístico: se outro processo gravou antes, o conteúdo é o mesmo
+        saved = default_storage.save(name, ContentFile(render_png(payload)))
+        if saved != name:
+            default_storage.delete(saved)
+    return name
+
+
+def generate_qr_codes(queryset=None, batch_size=500):
+    """
+    Gera os QR Codes que faltam (uma imagem por código distinto) e grava os
+    caminhos com ``bulk_update``. Retorna quantos pagamentos foram atualizados.
+    """
+    if queryset is None:
+        queryset = PIXPayment.objects.filter(status='pending')
+    pending = list(
+        queryset.filter(Q(pix_qr_code='') | Q(pix_qr_code__isnull=True)).exclude(pix_copy_paste='')
+        .only('pk', 'pix_copy_paste', 'pix_qr_code')
+    )
+    names = {}
+    for pix_payment in pending:
+        payload = pix_payment.pix_copy_paste
+        if payload not in names:
+            names[payload] = store_qr_code(payload)
+        pix_payment.pix_qr_code.name = names[payload]
+    PIXPayment.objects.bulk_update(pending, ['pix_qr_code'], batch_size=batch_size)
+    return len(pending)
+
+
+def _expires_at(payment):
+    """Fim do dia de vencimento (ou 24h a partir de agora, o que vier depois)"""
+    due = timezone.make_aware(datetime.combine(payment.due_date, time.max))
+    return max(due, timezone.now() + timedelta(hours=24))
+
+
+def prepare_monthly_charges(month=None):
+    """
+    Cria de uma vez as cobranças PIX dos pagamentos pendentes com vencimento no
+    mês (``date`` de qualquer dia do mês; padrão: mês atual) e gera os QR Codes.
+    Retorna ``(cobranças criadas, QR Codes gerados)``.
+    """
+    month = (month or timezone.localdate()).replace(day=1)
+    next_month = (month + timedelta(days=32)).replace(day=1)
+    payments = Payment.objects.filter(
+        payment_method='pix',
+        payment_status='pending',
+        due_date__gte=month,
+        due_date__lt=next_month,
+        pix_payment__isnull=True,
+    ).only('pk', 'payment_id', 'final_amount', 'due_date')
+
+    pix_key = getattr(settings, 'PIX_KEY', 'contato@asbjj.com.br')
+    charges = []
+    for payment in payments:
+        charge = PIXPayment(
+            payment=payment,
+            amount=payment.final_amount,
+            pix_key=pix_key,
+            pix_copy_paste=pix_payload(payment),
+            expires_at=_expires_at(payment),
+        )
+        # bulk_create não passa pelo save()
+        charge.external_id = f'ASBJJ_{charge.pix_payment_id}'
+        charges.append(charge)
+
+    with transaction.atomic():
+        PIXPayment.objects.bulk_create(charges, batch_size=500, ignore_conflicts=True)
+        generated = generate_qr_codes(PIXPayment.objects.filter(payment__in=[c.payment_id for c in charges]))
+    return len(charges), generated
@@ -0,0 +1,68 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Student, StudentSubscription, Payment, PaymentPlan, Attendance, StudentDashboardSnapshot
+from .payment_models import DailyFinanceRollup
+from .dashboard_stats import DashboardStats
+
+
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=StudentSubscription)
+@receiver([post_save, post_delete], sender=Payment)
+def invalidate_dashboard_stats(sender, **kwargs):
+    """Descarta o snapshot do dashboard quando alunos ou pagamentos mudam"""
+    DashboardStats.invalidate()
+
+
+def _rollup_days(due_date, paid_date):
+    days = {due_date}
+    if paid_date:
+        days.add(timezone.localtime(paid_date).date())
+    return days
+
+
+@receiver(pre_save, sender=Payment)
+def mark_moved_payment_days_stale(sender, instance, raw=False, **kwargs):
+    """Marca para recálculo os dias de onde o pagamento saiu"""
+    if raw or not instance.pk:
+        return
+    previous = Payment.objects.filter(pk=instance.pk).values_list('due_date', 'paid_date').first()
+    if previous:
+        DailyFinanceRollup.mark_stale(_rollup_days(*previous) - _rollup_days(instance.due_date, instance.paid_date))
+
+
+@receiver(post_delete, sender=Payment)
+def mark_deleted_payment_days_stale(sender, instance, **kwargs):
+    """Pagamentos excluídos não alteram updated_at; marca os dias manualmente"""
+    DailyFinanceRollup.mark_stale(_rollup_days(instance.due_date, instance.paid_date))
+
+
+@receiver([post_save, post_delete], sender=Payment)
+@receiver([post_save, post_delete], sender=StudentSubscription)
+@receiver([post_save, post_delete], sender=Attendance)
+def rebuild_student_dashboard_snapshot(sender, instance, raw=False, **kwargs):
+    """Refaz o painel do aluno após o commit (a exclusão do aluno já terá terminado)"""
+    if raw:
+        return
+    transaction.on_commit(partial(StudentDashboardSnapshot.rebuild, instance.student_id))
+
+
+@receiver(post_save, sender=Student)
+def rebuild_student_dashboard_snapshot_on_student_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(partial(StudentDashboardSnapshot.rebuild, instance.pk))
+
+
+@receiver(post_save, sender=PaymentPlan)
+def discard_plan_dashboard_snapshots(sender, instance, raw=False, **kwargs):
+    """Nome e preço do plano estão nos snapshots: descarta-os (refeitos na próxima abertura)"""
+    if raw or kwargs.get('created'):
+        return
+    StudentDashboardSnapshot.objects.filter(
+        student__in=StudentSubscription.objects.filter(payment_plan=instance).values('student_id')
+    ).delete()
@@ -1,3 +1,534 @@
-from django.test import TestCase
+from django.test import TestCase, Client, override_settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+import tempfile
 
-# Create your tests here.
+from core.exports import format_value
+
+from .models import Student, PaymentPlan, StudentSubscription, Payment, Attendance, StudentDashboardSnapshot
+from .payment_models import DailyFinanceRollup, PaymentReport, PIXPayment
+from .user_models import UserProfile
+from .dashboard_stats import DashboardStats
+from .lookup import lookup_students, match_students
+from .pix import generate_qr_codes, prepare_monthly_charges, qr_code_name
+
+
+def create_student(index=0, **kwargs):
+    """Cria um aluno de teste com dados únicos"""
+    data = {
+        'first_name': f'Aluno{index}',
+        'last_name': 'Teste',
+        'email': f'aluno{index}@example.com',
+        'phone': '+5511999999999',
+        'cpf': f'{index:03d}.000.000-00',
+        'address': 'Rua Teste, 123',
+        'city': 'São Paulo',
+        'state': 'SP',
+        'zip_code': '01000-000',
+        'birth_date': date(1990, 1, 1),
+        'emergency_contact_name': 'Contato',
+        'emergency_contact_phone': '+5511988888888',
+    }
+    data.update(kwargs)
+    return Student.objects.create(**data)
+
+
+def create_payment(student, subscription, amount='100.00', **kwargs):
+    """Cria um pagamento de teste"""
+    data = {
+        'student': student,
+        'subscription': subscription,
+        'amount': Decimal(amount),
+        'payment_method': 'pix',
+        'due_date': timezone.now().date(),
+    }
+    data.update(kwargs)
+    return Payment.objects.create(**data)
+
+
+class DashboardStatsTestCase(TestCase):
+    """Testes para os indicadores do dashboard administrativo"""
+    
+    def setUp(self):
+        cache.clear()
+        today = timezone.now().date()
+        self.plan = PaymentPlan.objects.create(name='Mensal', price=Decimal('100.00'))
+        self.students = []
+        for i in range(3):
+            student = create_student(i, is_active=(i != 2))
+            subscription = StudentSubscription.objects.create(
+                student=student,
+                payment_plan=self.plan,
+                start_date=today - timedelta(days=10),
+                end_date=today + timedelta(days=20),
+            )
+            create_payment(student, subscription, payment_status='paid', paid_date=timezone.now())
+            create_payment(student, subscription, amount='80.00', due_date=today - timedelta(days=5))
+            create_payment(student, subscription, amount='50.00', due_date=today + timedelta(days=5))
+            self.students.append(student)
+        # O consolidado é atualizado pela tarefa periódica, não pelo painel
+        DailyFinanceRollup.refresh()
+    
+    def test_totals(self):
+        """Teste dos totais agregados"""
+        stats = DashboardStats().as_dict()
+        self.assertEqual(stats['total_students'], 3)
+        self.assertEqual(stats['active_students'], 2)
+        self.assertEqual(stats['active_subscriptions'], 3)
+        self.assertEqual(stats['total_payments'], 9)
+        self.assertEqual(stats['paid_payments'], 3)
+        self.assertEqual(stats['pending_payments'], 3)
+        self.assertEqual(stats['monthly_revenue'], Decimal('300.00'))
+        self.assertEqual(stats['monthly_payments_count'], 3)
+    
+    def test_overdue_students_pending_amount(self):
+        """Teste do valor pendente calculado por subconsulta"""
+        overdue = DashboardStats().overdue_students()
+        self.assertEqual(len(overdue), 3)
+        for student in overdue:
+            self.assertEqual(student.pending_amount, Decimal('130.00'))
+    
+    def test_query_count_is_constant(self):
+        """Teste de que o número de consultas não cresce com os alunos"""
+        # alunos, pagamentos, receita do consolidado e duas listas
+        QUERIES = 5
+        with self.assertNumQueries(QUERIES):
+            DashboardStats().as_dict()
+        for i in range(3, 8):
+            student = create_student(i)
+            subscription = StudentSubscription.objects.create(
+                student=student,
+                payment_plan=self.plan,
+                start_date=timezone.now().date(),
+                end_date=timezone.now().date(),
+            )
+            create_payment(student, subscription, due_date=timezone.now().date() - timedelta(days=1))
+        DailyFinanceRollup.refresh()
+        with self.assertNumQueries(QUERIES):
+            DashboardStats().as_dict()
+    
+    def test_snapshot_is_cached_and_invalidated(self):
+        """Teste do snapshot em cache e da invalidação por sinal"""
+        DashboardStats.snapshot()
+        with self.assertNumQueries(0):
+            DashboardStats.snapshot()
+        create_student(10)
+        self.assertEqual(DashboardStats.snapshot()['total_students'], 4)
+    
+    def test_dashboard_view(self):
+        """Teste da view do dashboard usando o snapshot"""
+        User.objects.create_user(username='admin', password='adminpass123')
+        client = Client()
+        client.login(username='admin', password='adminpass123')
+        response = client.get(reverse('students:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_students'], 3)
+        self.assertContains(response, 'Aluno0 Teste')
+
+
+class DailyFinanceRollupTestCase(TestCase):
+    """Testes para o consolidado financeiro diário"""
+    
+    def setUp(self):
+        self.today = timezone.localdate()
+        plan = PaymentPlan.objects.create(name='Mensal', price=Decimal('100.00'))
+        self.student = create_student(1)
+        self.subscription = StudentSubscription.objects.create(
+            student=self.student,
+            payment_plan=plan,
+            start_date=self.today,
+            end_date=self.today + timedelta(days=30),
+        )
+        self.paid = create_payment(
+            self.student, self.subscription,
+            discount_amount=Decimal('10.00'),
+            payment_status='paid',
+            paid_date=timezone.now(),
+        )
+        self.overdue = create_payment(
+            self.student, self.subscription, amount='80.00',
+            payment_method='cash',
+            due_date=self.today - timedelta(days=3),
+        )
+    
+    def test_refresh_builds_rows_per_day_and_method(self):
+        """Teste da criação das linhas por dia e método"""
+        DailyFinanceRollup.refresh()
+        row = DailyFinanceRollup.objects.get(day=self.today, payment_method='pix')
+        self.assertEqual(row.due_count, 1)
+        self.assertEqual(row.due_paid_count, 1)
+        self.assertEqual(row.revenue, Decimal('90.00'))
+        self.assertEqual(row.discount_total, Decimal('10.00'))
+        row = DailyFinanceRollup.objects.get(day=self.today - timedelta(days=3), payment_method='cash')
+        self.assertEqual(row.due_pending_count, 1)
+    
+    def age(self):
+        """Última execução há 1 hora; pagamentos alterados bem antes dela"""
+        watermark = timezone.now() - timedelta(hours=1)
+        Payment.objects.update(updated_at=watermark - timedelta(hours=1))
+        DailyFinanceRollup.objects.update(source_updated_at=watermark)
+    
+    def test_refresh_is_incremental(self):
+        """Teste de que apenas os dias alterados são recalculados"""
+        DailyFinanceRollup.refresh()
+        self.age()
+        self.assertEqual(DailyFinanceRollup.refresh(), 0)
+        self.overdue.payment_status = 'paid'
+        self.overdue.paid_date = timezone.now()
+        self.overdue.save()
+        self.assertEqual(DailyFinanceRollup.refresh(), 2)
+        revenue, count = DailyFinanceRollup.revenue_since(self.today)
+        self.assertEqual(revenue, Decimal('170.00'))
+        self.assertEqual(count, 2)
+    
+    def test_refresh_picks_up_late_commits(self):
+        """Teste de que alterações confirmadas depois da marca d'água, com data anterior, entram"""
+        DailyFinanceRollup.refresh()
+        self.age()
+        # Transação que gravou antes da última execução, mas só confirmou depois
+        late = create_payment(self.student, self.subscription, amount='40.00', payment_method='card')
+        Payment.objects.filter(pk=late.pk).update(updated_at=timezone.now() - timedelta(hours=1, minutes=2))
+        self.assertEqual(DailyFinanceRollup.refresh(), 1)
+        self.assertTrue(DailyFinanceRollup.objects.filter(day=self.today, payment_method='card').exists())
+    
+    def test_refresh_upserts_existing_rows(self):
+        """Teste de que recalcular dias já consolidados atualiza as linhas sem conflito"""
+        DailyFinanceRollup.refresh()
+        ids = set(DailyFinanceRollup.objects.values_list('pk', flat=True))
+        self.assertEqual(DailyFinanceRollup.refresh(full=True), 2)
+        self.assertEqual(set(DailyFinanceRollup.objects.values_list('pk', flat=True)), ids)
+    
+    def test_deleted_payment_marks_day_stale(self):
+        """Teste de recálculo após exclusão de pagamento"""
+        DailyFinanceRollup.refresh()
+        self.overdue.delete()
+        DailyFinanceRollup.refresh()
+        self.assertFalse(DailyFinanceRollup.objects.filter(payment_method='cash').exists())
+    
+    def test_totals_match_report_semantics(self):
+        """Teste dos totais usados pelo relatório de pagamentos"""
+        DailyFinanceRollup.refresh()
+        totals = DailyFinanceRollup.totals(self.today - timedelta(days=30), self.today)
+        self.assertEqual(totals['total_payments'], 2)
+        self.assertEqual(totals['paid_payments'], 1)
+        self.assertEqual(totals['pending_payments'], 1)
+        self.assertEqual(totals['overdue_payments'], 1)
+        self.assertEqual(totals['total_revenue'], Decimal('90.00'))
+    
+    def test_generate_payment_report_view(self):
+        """Teste da geração de relatório lendo o consolidado"""
+        User.objects.create_user(username='admin', password='adminpass123')
+        client = Client()
+        client.login(username='admin', password='adminpass123')
+        DailyFinanceRollup.refresh()
+        response = client.post(reverse('students:generate_report'), {
+            'start_date': (self.today - timedelta(days=30)).isoformat(),
+            'end_date': self.today.isoformat(),
+        })
+        self.assertEqual(response.status_code, 302)
+        report = PaymentReport.objects.get()
+        self.assertEqual(report.total_payments, 2)
+        self.assertEqual(report.overdue_payments, 1)
+
+
+class ExportTestCase(TestCase):
+    """Testes das exportações CSV por streaming"""
+    
+    def setUp(self):
+        self.today = timezone.localdate()
+        User.objects.create_user(username='admin', password='adminpass123', is_staff=True)
+        self.client = Client()
+        self.client.login(username='admin', password='adminpass123')
+        plan = PaymentPlan.objects.create(name='Mensal', price=Decimal('100.00'))
+        self.student = create_student(1)
+        subscription = StudentSubscription.objects.create(
+            student=self.student,
+            payment_plan=plan,
+            start_date=self.today,
+            end_date=self.today + timedelta(days=30),
+        )
+        create_payment(self.student, subscription, payment_status='paid', paid_date=timezone.now())
+        create_payment(self.student, subscription, amount='80.00', payment_method='cash',
+                       due_date=self.today - timedelta(days=40))
+    
+    def read_csv(self, response):
+        import csv
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(content.splitlines()))
+    
+    def test_export_payments_streams_csv(self):
+        """Teste da exportação de pagamentos com rótulos legíveis"""
+        response = self.client.get(reverse('students:export_payments'))
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        rows = self.read_csv(response)
+        self.assertEqual(rows[0][0], 'ID do Pagamento')
+        self.assertEqual(len(rows), 3)
+        self.assertIn('Pago', rows[1])
+    
+    def test_export_payments_reuses_list_filters(self):
+        """Teste de que a exportação respeita os filtros da listagem"""
+        response = self.client.get(reverse('students:export_payments'), {
+            'method': 'cash',
+            'date_to': (self.today - timedelta(days=30)).isoformat(),
+        })
+        rows = self.read_csv(response)
+        self.assertEqual(len(rows), 2)
+        self.assertIn('80.00', rows[1])
+    
+    def test_export_students(self):
+        """Teste da exportação de alunos"""
+        rows = self.read_csv(self.client.get(reverse('students:export_students'), {'status': 'active'}))
+        self.assertEqual(len(rows), 2)
+        self.assertIn(self.student.email, rows[1])
+    
+    def test_export_neutralizes_formulas(self):
+        """Teste de que textos que começam como fórmula não viram fórmulas no Excel"""
+        Student.objects.filter(pk=self.student.pk).update(first_name='=HYPERLINK("http://x")', last_name='@SUM(A1)')
+        rows = self.read_csv(self.client.get(reverse('students:export_students')))
+        self.assertIn('\'=HYPERLINK("http://x")', rows[1])
+        self.assertIn("'@SUM(A1)", rows[1])
+        # Números formatados pela exportação não são alterados
+        self.assertEqual(format_value(Decimal('-10.00')), '-10.00')
+    
+    def test_export_requires_admin(self):
+        """Teste de que apenas administradores exportam"""
+        response = Client().get(reverse('students:export_payments'))
+        self.assertEqual(response.status_code, 302)
+
+
+class StudentLookupTestCase(TestCase):
+    """Testes da busca aproximada de alunos"""
+    
+    def setUp(self):
+        self.joao = create_student(1, first_name='João', last_name='Silvério', phone='+5521987654321')
+        self.maria = create_student(2, first_name='Maria', last_name='Souza', cpf='123.456.789-00')
+        for i in range(3, 15):
+            create_student(i, first_name=f'Aluno{i}', last_name='Silva')
+    
+    def test_normalized_fields_on_save(self):
+        """Teste dos campos normalizados gravados no save"""
+        self.assertEqual(self.joao.search_text, 'joao silverio aluno1@example.com')
+        self.assertEqual(self.joao.phone_digits, '5521987654321')
+        self.assertEqual(self.maria.cpf_digits, '12345678900')
+    
+    def test_lookup_ignores_accents_and_typos(self):
+        """Teste de busca sem acentos e com erro no final da palavra"""
+        self.assertEqual(lookup_students('joao')[0], self.joao)
+        self.assertEqual(lookup_students('Silverip')[0], self.joao)
+    
+    def test_list_filter_requires_whole_terms(self):
+        """Teste de que o filtro das listas não usa a aproximação do autocomplete"""
+        silva = set(match_students(Student.objects.all(), 'Silva').values_list('pk', flat=True))
+        self.assertEqual(len(silva), 12)
+        self.assertNotIn(self.joao.pk, silva)
+        self.assertEqual(list(match_students(Student.objects.all(), 'silverio joao')), [self.joao])
+    
+    def test_lookup_by_phone_and_cpf_digits(self):
+        """Teste de busca por parte do telefone ou CPF, com ou sem máscara"""
+        self.assertEqual(lookup_students('98765')[0], self.joao)
+        self.assertEqual(lookup_students('456.789')[0], self.maria)
+    
+    def test_autocomplete_endpoint(self):
+        """Teste do endpoint JSON limitado a 10 resultados"""
+        User.objects.create_user(username='admin', password='adminpass123')
+        self.client.login(username='admin', password='adminpass123')
+        response = self.client.get(reverse('students:student_autocomplete'), {'q': 'silva'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), 10)
+        self.assertIn('Silva', results[0]['name'])
+        self.assertEqual(self.client.get(reverse('students:student_autocomplete')).json(), {'results': []})
+
+
+class ExplainHotQueriesTestCase(TestCase):
+    """Testes do comando de EXPLAIN das consultas principais"""
+    
+    def test_hot_queries_use_indexes(self):
+        """Teste de que as consultas principais não fazem leitura sequencial"""
+        out = StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        output = out.getvalue()
+        self.assertIn('payment_status_due_idx', output)
+        self.assertNotIn('[SCAN]', output)
+    
+    def test_before_after_is_dev_only(self):
+        """Teste de que a comparação sem índices não roda fora do modo DEBUG"""
+        with self.assertRaises(CommandError):
+            call_command('explain_hot_queries', '--before-after', stdout=StringIO())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class PIXQRCodeTestCase(TestCase):
+    """Testes dos QR Codes PIX gerados fora da requisição"""
+    
+    def setUp(self):
+        self.today = timezone.localdate()
+        User.objects.create_user(username='admin', password='adminpass123', is_staff=True)
+        self.client = Client()
+        self.client.login(username='admin', password='adminpass123')
+        plan = PaymentPlan.objects.create(name='Mensal', price=Decimal('100.00'))
+        self.student = create_student(1)
+        self.subscription = StudentSubscription.objects.create(
+            student=self.student,
+            payment_plan=plan,
+            start_date=self.today,
+            end_date=self.today + timedelta(days=30),
+        )
+        self.payment = create_payment(self.student, self.subscription)
+    
+    def create_pix(self, payment=None, payload='00020126PIX-TESTE'):
+        return PIXPayment.objects.create(payment=payment or self.payment, amount=Decimal('100.00'),
+                                         pix_copy_paste=payload)
+    
+    def test_create_does_not_render_qr_code(self):
+        """Teste de que a criação é uma única escrita, sem gerar a imagem"""
+        with self.assertNumQueries(1):
+            pix_payment = self.create_pix()
+        self.assertFalse(pix_payment.pix_qr_code)
+        self.assertTrue(pix_payment.external_id.startswith('ASBJJ_'))
+    
+    def test_identical_payloads_share_image(self):
+        """Teste do armazenamento endereçado pelo conteúdo"""
+        other = create_payment(self.student, self.subscription)
+        first, second = self.create_pix(), self.create_pix(other)
+        with self.assertNumQueries(2):
+            self.assertEqual(generate_qr_codes(), 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.pix_qr_code.name, qr_code_name('00020126PIX-TESTE'))
+        self.assertEqual(first.pix_qr_code.name, second.pix_qr_code.name)
+        self.assertEqual(generate_qr_codes(), 0)
+    
+    def test_qr_code_endpoint(self):
+        """Teste do PNG inline gerado sob demanda, com ETag e cache longo"""
+        pix_payment = self.create_pix()
+        response = self.client.get(pix_payment.get_qr_code_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(response.content.startswith(b'\x89PNG'))
+        self.assertIn('inline;', response['Content-Disposition'])
+        self.assertIn('immutable', response['Cache-Control'])
+        pix_payment.refresh_from_db()
+        self.assertEqual(pix_payment.pix_qr_code.name, qr_code_name('00020126PIX-TESTE'))
+        
+        response = self.client.get(pix_payment.get_qr_code_url(), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_qr_code_is_scoped_to_own_payments(self):
+        """Teste de que o aluno só baixa o QR Code das próprias cobranças"""
+        pix_payment = self.create_pix()
+        other_student = create_student(2)
+        for student, status in ((other_student, 404), (self.student, 200)):
+            user = User.objects.create_user(username=f'aluno{student.pk}', password='senha-teste-123')
+            UserProfile.objects.create(user=user, role='student', student_profile=student)
+            client = Client()
+            client.force_login(user)
+            self.assertEqual(client.get(pix_payment.get_qr_code_url()).status_code, status)
+        other = Client()
+        other.force_login(User.objects.get(username=f'aluno{other_student.pk}'))
+        response = other.get(reverse('students:pix_payment_detail', args=[pix_payment.pk]))
+        self.assertEqual(response.status_code, 404)
+    
+    def test_prepare_monthly_charges(self):
+        """Teste do modo em lote: cobranças e QR Codes do mês de uma vez"""
+        create_payment(self.student, self.subscription, payment_method='cash')
+        create_payment(self.student, self.subscription, due_date=self.today + timedelta(days=40))
+        created, generated = prepare_monthly_charges(self.today)
+        self.assertEqual((created, generated), (1, 1))
+        pix_payment = PIXPayment.objects.get()
+        self.assertEqual(pix_payment.payment, self.payment)
+        self.assertTrue(pix_payment.pix_qr_code)
+        self.assertGreater(pix_payment.expires_at, timezone.now())
+        self.assertEqual(prepare_monthly_charges(self.today), (0, 0))
+
+
+class StudentDashboardSnapshotTestCase(TestCase):
+    """Testes do snapshot do painel do aluno (modelo de leitura)"""
+    
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.plan = PaymentPlan.objects.create(name='Mensal', price=Decimal('150.00'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student = create_student(1)
+            self.subscription = StudentSubscription.objects.create(
+                student=self.student,
+                payment_plan=self.plan,
+                start_date=self.today - timedelta(days=5),
+                end_date=self.today + timedelta(days=25),
+            )
+            self.pending = create_payment(self.student, self.subscription, due_date=self.today + timedelta(days=3))
+            create_payment(self.student, self.subscription, payment_status='paid', paid_date=timezone.now())
+    
+    def snapshot(self):
+        return StudentDashboardSnapshot.objects.get(pk=self.student.pk)
+    
+    def test_signals_rebuild_snapshot_on_write(self):
+        """Teste de que pagamentos, assinaturas e presenças refazem o snapshot após o commit"""
+        context = self.snapshot().get_context()
+        self.assertEqual(context['current_subscription']['payment_plan']['price'], Decimal('150.00'))
+        self.assertEqual([p['id'] for p in context['pending_payments']], [self.pending.id])
+        self.assertEqual(context['pending_payments'][0]['due_date'], self.today + timedelta(days=3))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(student=self.student, class_date=self.today, class_time=time(19, 0))
+            self.pending.payment_status = 'paid'
+            self.pending.save()
+        context = self.snapshot().get_context()
+        self.assertEqual(context['pending_payments'], [])
+        self.assertEqual(context['recent_attendances'][0]['class_time'], time(19, 0))
+        self.assertEqual(context['recent_attendances'][0]['status_display'], 'Presente')
+    
+    def test_current_subscription_is_chosen_at_read_time(self):
+        """Teste de que a assinatura vencida deixa de ser a atual sem nova gravação"""
+        later = self.subscription.end_date + timedelta(days=1)
+        self.assertIsNone(self.snapshot().get_context(today=later)['current_subscription'])
+    
+    def test_dashboard_renders_from_snapshot(self):
+        """Teste de que o painel abre a partir do snapshot, sem consultar pagamentos"""
+        user = User.objects.create_user('aluno1', password='senha-teste-123')
+        UserProfile.objects.create(user=user, role='student', student_profile=self.student)
+        self.client.force_login(user)
+        
+        with self.assertNumQueries(5):  # sessão, usuário, perfil, snapshot e configurações do site
+            response = self.client.get(reverse('student_dashboard'))
+        self.assertContains(response, 'Olá, Aluno1!')
+        self.assertContains(response, 'Mensal')
+        self.assertContains(response, f'{self.pending.due_date:%d/%m/%Y}')
+    
+    def test_plan_change_discards_snapshots(self):
+        """Teste de que alterar o plano descarta os snapshots (refeitos na próxima abertura)"""
+        self.plan.name = 'Mensal Plus'
+        self.plan.save()
+        self.assertFalse(StudentDashboardSnapshot.objects.filter(pk=self.student.pk).exists())
+        snapshot = StudentDashboardSnapshot.for_student(self.student.pk)
+        self.assertEqual(snapshot.get_context()['current_subscription']['payment_plan']['name'], 'Mensal Plus')
+    
+    def test_consistency_check_reports_and_fixes_drift(self):
+        """Teste do comando que compara os snapshots com os dados reais"""
+        call_command('check_dashboard_snapshots', stdout=StringIO())
+        
+        # Alteração que não dispara sinais (update em lote)
+        Payment.objects.filter(pk=self.pending.pk).update(payment_status='paid')
+        with self.assertRaises(CommandError):
+            call_command('check_dashboard_snapshots', stdout=StringIO())
+        
+        out = StringIO()
+        call_command('check_dashboard_snapshots', fix=True, stdout=out)
+        self.assertIn(f'Aluno {self.student.pk}: pending_payments', out.getvalue())
+        self.assertEqual(self.snapshot().data['pending_payments'], [])
+        self.assertEqual(StudentDashboardSnapshot.find_drift(), [])
+    
+    def test_deleting_student_removes_snapshot(self):
+        """Teste de que excluir o aluno não recria o snapshot pelos sinais em cascata"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.delete()
+        self.assertFalse(StudentDashboardSnapshot.objects.exists())
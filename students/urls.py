@@ -11,10 +11,15 @@ urlpatterns = [
     # Views personalizadas
     path('', payment_views.dashboard_view, name='dashboard'),
     path('students/', payment_views.student_list_view, name='student_list'),
+    path('students/export/', payment_views.export_students_view, name='export_students'),
+    path('students/autocomplete/', payment_views.student_autocomplete_view, name='student_autocomplete'),
     path('students/<int:student_id>/', payment_views.student_detail_view, name='student_detail'),
     path('payments/', payment_views.payment_list_view, name='payment_list'),
+    path('payments/export/', payment_views.export_payments_view, name='export_payments'),
+    path('attendances/export/', payment_views.export_attendances_view, name='export_attendances'),
     path('payments/<int:payment_id>/pix/', payment_views.create_pix_payment, name='create_pix_payment'),
     path('pix/<int:pix_payment_id>/', payment_views.pix_payment_detail, name='pix_payment_detail'),
+    path('pix/<int:pix_payment_id>/qrcode.png', payment_views.pix_qr_code_view, name='pix_qr_code'),
     path('reports/', payment_views.payment_reports_view, name='payment_reports'),
     path('reports/generate/', payment_views.generate_payment_report, name='generate_report'),
     path('webhook/payment/', payment_views.payment_webhook, name='payment_webhook'),
@@ -9,4 +9,5 @@ urlpatterns = [
     path('<int:pk>/', views.TestimonialDetailView.as_view(), name='detail'),
     path('avaliar/<int:class_id>/', views.ReviewCreateView.as_view(), name='create_review'),
     path('faq/', views.FAQView.as_view(), name='faq'),
+    path('api/estatisticas/', views.testimonial_stats_api, name='stats_api'),
 ]
@@ -2,12 +2,13 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView, TemplateView, CreateView
 from django.contrib import messages
 from django.urls import reverse_lazy
-from django.db.models import Q, Avg
+from django.db.models import Avg, Count, Q
 from django.http import JsonResponse
-from django.core.paginator import Paginator
 
 from .models import Testimonial, Review, FAQ
 from core.forms import TestimonialForm
+from core.pagination import paginate_keyset
+from core.search import filter_queryset
 from classes.models import Class
 
 
@@ -185,11 +186,7 @@ def search_testimonials(request):
         testimonials = Testimonial.objects.filter(status='approved')
         
         if query:
-            testimonials = testimonials.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(author_name__icontains=query)
-            )
+            testimonials = filter_queryset(testimonials, query, order_by_rank=False)
         
         if category:
             testimonials = testimonials.filter(class_related__category__slug=category)
@@ -197,15 +194,12 @@ def search_testimonials(request):
         if rating:
             testimonials = testimonials.filter(rating=int(rating))
         
-        testimonials = testimonials.order_by('-is_featured', '-approved_at')
-        
-        # Paginação
-        paginator = Paginator(testimonials, 12)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        # Paginação por cursor (approved_at pode ser nulo; created_at não)
+        page_obj = paginate_keyset(request, testimonials, ['-is_featured', '-created_at', '-id'], 12)
         
         context = {
             'testimonials': page_obj,
+            'page_obj': page_obj,
             'query': query,
             'selected_category': category,
             'selected_rating': rating,
@@ -217,42 +211,36 @@ def search_testimonials(request):
     return redirect('testimonials:list')
 
 
-def testimonial_stats_api(request):
-    """API para estatísticas de depoimentos"""
+async def testimonial_stats_api(request):
+    """API para estatísticas de depoimentos (assíncrona)"""
     if request.method == 'GET':
         try:
-            # Total de depoimentos
-            total_testimonials = Testimonial.objects.filter(status='approved').count()
-            
-            # Média de avaliações
-            average_rating = Testimonial.objects.filter(
-                status='approved'
-            ).aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
+            approved = Testimonial.objects.filter(status='approved')
             
-            # Distribuição por estrelas
-            rating_distribution = {}
-            for i in range(1, 6):
-                count = Testimonial.objects.filter(
-                    status='approved',
-                    rating=i
-                ).count()
-                rating_distribution[i] = count
+            # Total, média e distribuição por estrelas em uma única consulta
+            totals = await approved.aaggregate(
+                total_testimonials=Count('id'),
+                avg_rating=Avg('rating'),
+                **{f'rating_{i}': Count('id', filter=Q(rating=i)) for i in range(1, 6)},
+            )
+            total_testimonials = totals['total_testimonials']
+            average_rating = totals['avg_rating'] or 0
+            rating_distribution = {i: totals[f'rating_{i}'] for i in range(1, 6)}
             
             # Depoimentos por categoria de aula
-            category_stats = {}
-            for testimonial in Testimonial.objects.filter(status='approved', class_related__isnull=False):
-                category_name = testimonial.class_related.category.name
-                if category_name not in category_stats:
-                    category_stats[category_name] = 0
-                category_stats[category_name] += 1
+            category_stats = {
+                row['class_related__category__name']: row['count']
+                async for row in approved.filter(class_related__isnull=False)
+                .values('class_related__category__name')
+                .annotate(count=Count('id'))
+                .order_by()
+            }
             
             # Depoimentos recentes
-            recent_testimonials = Testimonial.objects.filter(
-                status='approved'
-            ).order_by('-approved_at')[:5]
+            recent_testimonials = approved.order_by('-approved_at')[:5]
             
             recent_data = []
-            for testimonial in recent_testimonials:
+            async for testimonial in recent_testimonials:
                 recent_data.append({
                     'id': testimonial.id,
                     'author_name': testimonial.author_name,